@@ -0,0 +1,41 @@
+from fastapi import APIRouter, HTTPException, Request
+import hmac
+
+from app.services.job_manager import job_manager
+
+router = APIRouter()
+
+
+@router.post("/kie/callback")
+async def kie_callback(request: Request, token: str = ""):
+    """
+    Completion callback from Kie.ai (enabled by setting KIE_CALLBACK_URL and KIE_CALLBACK_TOKEN).
+    The shared KIE_CALLBACK_TOKEN must be passed as the `token` query parameter.
+
+    The body is only used for its task ID: the callback triggers a status check
+    against Kie.ai, and results (video URLs) are taken from that response.
+    """
+    kie_client = job_manager.kie_client
+    if not kie_client.callbacks_enabled:
+        raise HTTPException(status_code=404, detail="Callbacks are not enabled")
+
+    if not token or not hmac.compare_digest(token, kie_client.callback_token):
+        raise HTTPException(status_code=403, detail="Invalid callback token")
+
+    try:
+        body = await request.json()
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid JSON body")
+
+    data = body.get("data") if isinstance(body, dict) else None
+    if not isinstance(data, dict):
+        data = body if isinstance(body, dict) else {}
+
+    task_id = data.get("taskId") or data.get("task_id")
+    if not task_id:
+        raise HTTPException(status_code=400, detail="Callback has no task ID")
+
+    if not isinstance(task_id, str) or not await job_manager.handle_task_callback(task_id):
+        raise HTTPException(status_code=404, detail="Unknown task ID")
+
+    return {"message": "Callback received"}
@@ -0,0 +1,17 @@
+from fastapi import APIRouter, Query
+import asyncio
+
+from app.services.job_manager import job_manager
+
+router = APIRouter()
+
+
+@router.get("/costs/summary")
+async def get_cost_summary(days: int = Query(30, ge=1, le=366)):
+    """
+    Estimated and final (billed) costs overall, per model and per day for the
+    last `days` days, each broken out by status: in progress, completed,
+    failed and timed out. Served from precomputed rollups, so the response
+    time doesn't depend on how many jobs have ever run.
+    """
+    return await asyncio.to_thread(job_manager.cost_ledger.summary, days)
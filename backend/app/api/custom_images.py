@@ -1,11 +1,10 @@
-from fastapi import APIRouter, UploadFile, File, HTTPException
+from fastapi import APIRouter, UploadFile, File, HTTPException, Query, Response
 from fastapi.responses import JSONResponse
 import os
-import shutil
 import subprocess
-from typing import List
-import uuid
-from datetime import datetime
+from typing import Dict, Iterable, Optional
+
+from app.services.image_library import image_library, ImageTooLarge
 
 router = APIRouter()
 
@@ -16,90 +15,141 @@ custom_images_path = f"{base_path}/custom-images"
 # Ensure directory exists
 os.makedirs(custom_images_path, exist_ok=True)
 
+# Room for the multipart boundaries and part headers around the image itself
+MULTIPART_OVERHEAD = 64 * 1024
 
-@router.post("/custom-images/upload")
-async def upload_custom_image(file: UploadFile = File(...)):
-    """Upload a custom image for video generation."""
 
-    # Validate file type
-    if not file.content_type.startswith("image/"):
-        raise HTTPException(status_code=400, detail="File must be an image")
+class UploadSizeLimit:
+    """
+    ASGI middleware capping request bodies on the upload endpoints.
 
-    # Generate unique filename
-    file_extension = os.path.splitext(file.filename)[1]
-    unique_filename = f"{uuid.uuid4()}{file_extension}"
-    file_path = os.path.join(custom_images_path, unique_filename)
+    FastAPI parses (and spools) the whole multipart form before the endpoint
+    runs, so the limit has to be enforced here: a Content-Length over it is
+    rejected before any of the body is read, and a body sent without one is
+    counted as it streams in and cut off with a 413 once it passes the limit.
+    """
 
-    # Save file
-    try:
-        with open(file_path, "wb") as buffer:
-            shutil.copyfileobj(file.file, buffer)
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to save file: {str(e)}")
+    def __init__(self, app, paths: Iterable[str], max_bytes: Optional[int] = None):
+        self.app = app
+        self.paths = frozenset(paths)
+        self.max_bytes = max_bytes if max_bytes is not None else image_library.max_upload_bytes + MULTIPART_OVERHEAD
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"] not in self.paths:
+            await self.app(scope, receive, send)
+            return
+
+        detail = f"Upload exceeds {image_library.max_upload_bytes} bytes"
+        content_length = dict(scope["headers"]).get(b"content-length")
+        if content_length is not None and (not content_length.isdigit() or int(content_length) > self.max_bytes):
+            await JSONResponse({"detail": detail}, status_code=413)(scope, receive, send)
+            return
 
+        received = 0
+
+        async def limited_receive():
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > self.max_bytes:
+                    # Re-raised by FastAPI's body parsing and answered by its exception handler
+                    raise HTTPException(status_code=413, detail=detail)
+            return message
+
+        await self.app(scope, limited_receive, send)
+
+
+def _image_response(record: Dict) -> Dict:
     return {
-        "id": unique_filename,
-        "filename": file.filename,
-        "url": f"/custom-images/{unique_filename}",
-        "uploadedAt": datetime.now().isoformat()
+        "id": record["id"],
+        "filename": record["filename"],
+        "url": f"/custom-images/{record['id']}",
+        "thumbnailUrl": f"/custom-images/thumbs/{record['thumbnail']}" if record.get("thumbnail") else None,
+        "size": record["size"],
+        "width": record.get("width"),
+        "height": record.get("height"),
+        "sha256": record.get("sha256"),
+        "uploadedAt": record["created_at"]
     }
 
 
-@router.get("/custom-images")
-async def list_custom_images():
-    """List all uploaded custom images."""
+@router.post("/custom-images/upload")
+async def upload_custom_image(file: UploadFile = File(...)):
+    """
+    Upload a custom image for video generation.
 
-    try:
-        files = os.listdir(custom_images_path)
-        images = []
+    Re-uploading an image that is already in the library returns the existing
+    image, with `duplicate: true`, instead of storing a copy.
+    """
+    record, created = await save_custom_image(file)
+    return {**_image_response(record), "duplicate": not created}
 
-        for filename in files:
-            # Only include image files
-            if filename.lower().endswith(('.png', '.jpg', '.jpeg', '.gif', '.webp')):
-                file_path = os.path.join(custom_images_path, filename)
-                stat = os.stat(file_path)
 
-                images.append({
-                    "id": filename,
-                    "filename": filename,
-                    "url": f"/custom-images/{filename}",
-                    "uploadedAt": datetime.fromtimestamp(stat.st_ctime).isoformat()
-                })
+async def save_custom_image(file: UploadFile):
+    """Store an upload through the image library, mapping its errors to HTTP errors."""
 
-        # Sort by upload date (newest first)
-        images.sort(key=lambda x: x["uploadedAt"], reverse=True)
+    if not (file.content_type or "").startswith("image/"):
+        raise HTTPException(status_code=400, detail="File must be an image")
 
-        return images
+    # The request body as a whole is capped by UploadSizeLimit before it is parsed;
+    # the image itself is held to MAX_UPLOAD_BYTES while it is streamed to disk
+    try:
+        return await image_library.save_upload(file)
+    except ImageTooLarge as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to save file: {str(e)}")
 
+
+@router.get("/custom-images")
+async def list_custom_images(
+    response: Response,
+    cursor: Optional[str] = None,
+    limit: Optional[int] = Query(None, ge=1, le=500),
+):
+    """
+    List uploaded custom images, newest first.
+
+    - `limit` pages the list; the next page's cursor is returned in the X-Next-Cursor header
+    """
+
+    try:
+        images, next_cursor = await image_library.page(cursor=cursor, limit=limit)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to list images: {str(e)}")
 
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return [_image_response(record) for record in images]
+
 
 @router.delete("/custom-images/{image_id}")
 async def delete_custom_image(image_id: str):
     """Delete a custom image."""
 
-    file_path = os.path.join(custom_images_path, image_id)
-
-    if not os.path.exists(file_path):
-        raise HTTPException(status_code=404, detail="Image not found")
-
     try:
-        os.remove(file_path)
-        return {"message": "Image deleted successfully"}
+        deleted = await image_library.remove(image_id)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to delete image: {str(e)}")
 
+    if not deleted:
+        raise HTTPException(status_code=404, detail="Image not found")
+    return {"message": "Image deleted successfully"}
+
 
 @router.post("/custom-images/{image_id}/reveal")
 async def reveal_in_finder(image_id: str):
     """Reveal an image in Finder (macOS)."""
 
-    file_path = os.path.join(custom_images_path, image_id)
-    abs_path = os.path.abspath(file_path)
-
-    if not os.path.exists(abs_path):
+    file_path = image_library.path_for(image_id)
+    if not file_path or not os.path.isfile(file_path):
         raise HTTPException(status_code=404, detail="Image not found")
+    abs_path = os.path.abspath(file_path)
 
     try:
         subprocess.run(["open", "-R", abs_path], check=True)
@@ -1,16 +1,19 @@
 from fastapi import APIRouter, HTTPException, UploadFile, File
 from pydantic import BaseModel
-from typing import Optional
+from typing import Optional, List, Dict
+import itertools
 import uuid
 import os
 
-from app.services.kie_client import KieClient
-from app.services.job_manager import JobManager
+from app.services.job_manager import job_manager
+from app.services.image_library import image_library
+from app.api.custom_images import save_custom_image
 from app.models.job import JobCreate, JobResponse
 
 router = APIRouter()
-kie_client = KieClient()
-job_manager = JobManager()
+
+# Most jobs a single batch request may create
+MAX_BATCH_JOBS = int(os.getenv("MAX_BATCH_JOBS", "200"))
 
 
 class GenerateRequest(BaseModel):
@@ -27,6 +30,81 @@ class GenerateRequest(BaseModel):
     aspectRatio: str = "16:9"
 
 
+class BatchSweep(BaseModel):
+    """Every combination of the listed values becomes one job."""
+    models: List[str] = ["sora2"]
+    prompts: List[str]
+    customImageIds: List[str]
+    durations: List[int] = [5]
+    qualities: List[str] = ["720p"]
+    aspectRatios: List[str] = ["16:9"]
+    fighter1: Optional[str] = None
+    fighter2: Optional[str] = None
+    music: bool = False
+    voices: bool = False
+    commentators: bool = False
+
+    def expand(self) -> List[GenerateRequest]:
+        shared = {
+            "fighter1": self.fighter1,
+            "fighter2": self.fighter2,
+            "music": self.music,
+            "voices": self.voices,
+            "commentators": self.commentators,
+        }
+        return [
+            GenerateRequest(
+                model=model, prompt=prompt, customImageId=image_id,
+                duration=duration, quality=quality, aspectRatio=aspect_ratio, **shared
+            )
+            for model, prompt, image_id, duration, quality, aspect_ratio in itertools.product(
+                self.models, self.prompts, self.customImageIds,
+                self.durations, self.qualities, self.aspectRatios
+            )
+        ]
+
+    def size(self) -> int:
+        size = 1
+        for values in (self.models, self.prompts, self.customImageIds,
+                       self.durations, self.qualities, self.aspectRatios):
+            size *= len(values)
+        return size
+
+
+class BatchGenerateRequest(BaseModel):
+    items: Optional[List[GenerateRequest]] = None  # explicit list of variants
+    sweep: Optional[BatchSweep] = None  # or a Cartesian product of parameters
+
+
+def _custom_image_path(custom_image_id: str) -> Optional[str]:
+    """Path of a stored custom image, or None for an unknown or malformed id."""
+    image_path = image_library.path_for(custom_image_id)
+    if not image_path or not os.path.isfile(image_path):
+        return None
+    return image_path
+
+
+def _job_spec(request: GenerateRequest) -> Dict:
+    """create_job keyword arguments for a generate request."""
+    return {
+        "model": request.model,
+        "fighter1": request.fighter1,
+        "fighter2": request.fighter2,
+        "prompt": request.prompt,
+        "image_source": "custom",
+        "options": {
+            "music": request.music,
+            "voices": request.voices,
+            "commentators": request.commentators,
+        },
+        "video_params": {
+            "duration": request.duration,
+            "quality": request.quality,
+            "aspectRatio": request.aspectRatio,
+        },
+    }
+
+
 @router.post("/generate", response_model=JobResponse)
 async def generate_video(request: GenerateRequest):
     """
@@ -38,12 +116,9 @@ async def generate_video(request: GenerateRequest):
     4. Create job to track progress
     """
     try:
-        # Get custom image path
-        base_path = os.getenv("DATA_PATH", "../data")
-        image_path = f"{base_path}/custom-images/{request.customImageId}"
-
-        # Verify image exists
-        if not os.path.exists(image_path):
+        # Get custom image path; ids are only ever plain filenames in the library
+        image_path = _custom_image_path(request.customImageId)
+        if not image_path:
             raise HTTPException(
                 status_code=404,
                 detail=f"Custom image not found: {request.customImageId}"
@@ -51,24 +126,7 @@ async def generate_video(request: GenerateRequest):
 
         # Create job
         job_id = str(uuid.uuid4())
-        job = await job_manager.create_job(
-            job_id=job_id,
-            model=request.model,
-            fighter1=request.fighter1,
-            fighter2=request.fighter2,
-            prompt=request.prompt,
-            image_source="custom",
-            options={
-                "music": request.music,
-                "voices": request.voices,
-                "commentators": request.commentators,
-            },
-            video_params={
-                "duration": request.duration,
-                "quality": request.quality,
-                "aspectRatio": request.aspectRatio,
-            }
-        )
+        job = await job_manager.create_job(job_id=job_id, **_job_spec(request))
 
         # Upload image and generate video (async background task)
         await job_manager.start_generation(job_id, image_path)
@@ -81,26 +139,59 @@ async def generate_video(request: GenerateRequest):
         raise HTTPException(status_code=500, detail=str(e))
 
 
-@router.post("/upload-custom-image")
-async def upload_custom_image(file: UploadFile = File(...)):
-    """Upload a custom fighter image for video generation."""
-    try:
-        base_path = os.getenv("DATA_PATH", "../data")
+@router.post("/generate/batch")
+async def generate_batch(request: BatchGenerateRequest):
+    """
+    Generate many video variants in one request, either from an explicit list
+    of items or from a sweep over prompts x images x parameters.
+
+    All jobs are created in one storage transaction. Each distinct image is
+    uploaded once, and submissions are paced by the per-model scheduler.
+    Returns the batch ID with its aggregate progress.
+    """
+    if (request.items is None) == (request.sweep is None):
+        raise HTTPException(status_code=400, detail="Provide exactly one of items or sweep")
 
-        # Generate unique filename
-        file_id = str(uuid.uuid4())
-        file_path = f"{base_path}/custom-images/{file_id}.jpg"
+    count = len(request.items) if request.items is not None else request.sweep.size()
+    if count == 0:
+        raise HTTPException(status_code=400, detail="Batch is empty")
+    if count > MAX_BATCH_JOBS:
+        raise HTTPException(status_code=400, detail=f"Batch has {count} jobs; the limit is {MAX_BATCH_JOBS}")
 
-        # Ensure directory exists
-        os.makedirs(f"{base_path}/custom-images", exist_ok=True)
+    items = request.items if request.items is not None else request.sweep.expand()
+
+    # Verify every distinct image exists before creating anything
+    image_paths = {image_id: _custom_image_path(image_id) for image_id in {item.customImageId for item in items}}
+    missing = sorted(image_id for image_id, path in image_paths.items() if not path)
+    if missing:
+        raise HTTPException(status_code=404, detail=f"Custom image not found: {', '.join(missing)}")
+
+    try:
+        specs = [{"job_id": str(uuid.uuid4()), **_job_spec(item)} for item in items]
+        batch_id, jobs = await job_manager.create_batch(specs)
 
-        # Save file
-        import aiofiles
-        async with aiofiles.open(file_path, 'wb') as f:
-            content = await file.read()
-            await f.write(content)
+        # Upload images and generate videos (async background tasks)
+        await job_manager.start_generations([
+            (job.id, image_paths[item.customImageId]) for job, item in zip(jobs, items)
+        ])
 
-        return {"fileId": file_id, "filePath": file_path}
+        return await job_manager.get_batch(batch_id)
 
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/generate/batch/{batch_id}")
+async def get_batch(batch_id: str):
+    """Aggregate progress of a batch."""
+    batch = await job_manager.get_batch(batch_id)
+    if not batch:
+        raise HTTPException(status_code=404, detail="Batch not found")
+    return batch
+
+
+@router.post("/upload-custom-image")
+async def upload_custom_image(file: UploadFile = File(...)):
+    """Upload a custom fighter image for video generation (same storage as /custom-images/upload)."""
+    record, _ = await save_custom_image(file)
+    return {"fileId": record["id"], "filePath": image_library.path_for(record["id"])}
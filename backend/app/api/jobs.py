@@ -1,23 +1,113 @@
-from fastapi import APIRouter, HTTPException
-from typing import List
+from fastapi import APIRouter, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
+from typing import List, Optional
+import asyncio
+import zlib
 
-from app.services.job_manager import JobManager
-from app.models.job import JobResponse
+from app.services.job_manager import job_manager
+from app.models.job import JobResponse, BulkCheckRequest
 
 router = APIRouter()
-job_manager = JobManager()
+
+# Seconds between keepalive comments on idle event streams
+SSE_HEARTBEAT_SECONDS = 15
+
+# Most jobs a single bulk status check may name
+MAX_BULK_CHECK_JOBS = 1000
 
 
 @router.get("/jobs", response_model=List[JobResponse])
-async def list_jobs():
-    """Get all jobs with their current status."""
+async def list_jobs(
+    request: Request,
+    response: Response,
+    status: Optional[str] = None,
+    model: Optional[str] = None,
+    since: Optional[str] = None,
+    cursor: Optional[str] = None,
+    limit: Optional[int] = Query(None, ge=1, le=500),
+):
+    """
+    Get jobs with their current status, most recent activity first.
+
+    - `status` / `model` filter the list
+    - `limit` pages the list; the next page's cursor is returned in the X-Next-Cursor header
+    - `since=<updatedAt>` returns only jobs changed after that time, plus ids of
+      jobs deleted since then in the X-Deleted-Jobs header
+    - Responses carry an ETag; a matching If-None-Match returns 304
+    """
     try:
-        jobs = await job_manager.get_all_jobs()
+        query = str(request.query_params)
+        etag = f'W/"{job_manager.version}-{zlib.crc32(query.encode()):08x}"'
+        headers = {"ETag": etag, "Cache-Control": "no-cache"}
+
+        if request.headers.get("if-none-match") == etag:
+            return Response(status_code=304, headers=headers)
+
+        try:
+            jobs, next_cursor, deleted = job_manager.query_jobs(
+                status=status, model=model, since=since, cursor=cursor, limit=limit
+            )
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+
+        response.headers.update(headers)
+        if next_cursor:
+            response.headers["X-Next-Cursor"] = next_cursor
+        if since is not None:
+            response.headers["X-Deleted-Jobs"] = ",".join(deleted)
         return jobs
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.get("/poller/metrics")
+async def get_poller_metrics():
+    """Polling metrics: polls per job, time-to-detect, observed generation times and Kie.ai circuit state."""
+    return {
+        "inFlight": len(job_manager.poller),
+        "kieCircuit": job_manager.kie_client.breaker.state,
+        **job_manager.poll_schedule.metrics(),
+    }
+
+
+@router.get("/jobs/stream")
+async def stream_jobs(request: Request, lastEventId: Optional[str] = None):
+    """
+    Server-Sent Events stream of job changes.
+
+    Events: `created` (full job), `updated` (id plus changed fields), `deleted` (id),
+    and `resync` when the client missed events and should refetch /api/jobs.
+    Reconnecting clients resume from the Last-Event-ID header (or `lastEventId`).
+    """
+    last_event_id = request.headers.get("last-event-id") or lastEventId
+    subscriber = job_manager.events.subscribe(last_event_id)
+
+    async def event_stream():
+        try:
+            # Tell the browser how long to wait before reconnecting
+            yield "retry: 3000\n\n"
+            while True:
+                try:
+                    event = await asyncio.wait_for(subscriber.queue.get(), timeout=SSE_HEARTBEAT_SECONDS)
+                except asyncio.TimeoutError:
+                    if await request.is_disconnected():
+                        break
+                    # Comment line keeps proxies from closing an idle connection
+                    yield ": keepalive\n\n"
+                    continue
+                yield event.to_sse()
+        finally:
+            job_manager.events.unsubscribe(subscriber)
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 @router.get("/jobs/{job_id}", response_model=JobResponse)
 async def get_job_status(job_id: str):
     """Get status of a specific job."""
@@ -53,6 +143,28 @@ async def delete_job(job_id: str):
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.post("/jobs/check-status")
+async def check_and_recover_jobs(request: Optional[BulkCheckRequest] = None):
+    """
+    Check many stuck jobs on Kie.ai at once and recover the finished ones.
+    Without `jobIds`, every active job with a task ID is checked.
+    """
+    job_ids = request.jobIds if request else None
+    if job_ids is not None and len(job_ids) > MAX_BULK_CHECK_JOBS:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_BULK_CHECK_JOBS} jobs can be checked at once")
+
+    try:
+        results = await job_manager.check_and_recover_jobs(job_ids)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+    summary: dict = {}
+    for result in results.values():
+        status = result.get("status", "error")
+        summary[status] = summary.get(status, 0) + 1
+    return {"checked": len(results), "summary": summary, "results": results}
+
+
 @router.post("/jobs/{job_id}/check-status")
 async def check_and_recover_job(job_id: str):
     """
@@ -0,0 +1,48 @@
+from fastapi import APIRouter, HTTPException, Request
+import asyncio
+import os
+
+from app.services.media_server import MediaServer
+
+router = APIRouter()
+
+base_path = os.getenv("DATA_PATH", "../data")
+media_server = MediaServer(
+    f"{base_path}/videos",
+    cache_bytes=int(os.getenv("MEDIA_CACHE_BYTES", str(16 * 1024 * 1024))),
+    cache_file_bytes=int(os.getenv("MEDIA_CACHE_FILE_BYTES", str(512 * 1024))),
+)
+
+
+async def _lookup(job_id: str, filename: str):
+    path = media_server.resolve(job_id, filename)
+    found = await asyncio.to_thread(media_server.lookup, path) if path else None
+    if not found:
+        raise HTTPException(status_code=404, detail="File not found")
+    return path, *found
+
+
+@router.get("/videos/{job_id}/{filename}")
+async def get_media(job_id: str, filename: str, request: Request):
+    """
+    Serve a generated video, thumbnail, preview or sprite with a content-hash
+    ETag and immutable caching. Videos support Range requests for seeking;
+    small images are served from an in-memory LRU.
+    """
+    path, stat_result, etag = await _lookup(job_id, filename)
+
+    body = None
+    if "range" not in request.headers and media_server.hot_files.cacheable(stat_result):
+        body = await asyncio.to_thread(media_server.hot_files.read, path, stat_result)
+
+    return media_server.respond(path, stat_result, etag, request.headers, body=body)
+
+
+@router.get("/api/download/{job_id}/{filename}")
+async def download_video(job_id: str, filename: str, request: Request):
+    """Download endpoint that forces file download with proper headers"""
+    path, stat_result, etag = await _lookup(job_id, filename)
+    return media_server.respond(
+        path, stat_result, etag, request.headers,
+        download_name=f"video-{job_id}.mp4", media_type="video/mp4"
+    )
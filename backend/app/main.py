@@ -1,16 +1,33 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse
 import os
 from dotenv import load_dotenv
 
 # Load environment variables from .env file
 load_dotenv()
 
-from app.api import generate, jobs, custom_images, env, claude
+from app.api import generate, jobs, custom_images, env, claude, callbacks, costs, media
+from app.api.custom_images import UploadSizeLimit
+from app.services.job_manager import job_manager
+from app.services.image_library import image_library
 
-app = FastAPI(title="Fight Video Generator API", version="1.0.0")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # One pooled HTTP session to Kie.ai for the whole process
+    await job_manager.kie_client.start()
+    await job_manager.start()
+    await image_library.start()
+    yield
+    # Flush pending job writes before shutdown
+    await job_manager.close()
+    await image_library.close()
+    await job_manager.kie_client.close()
+
+
+app = FastAPI(title="Fight Video Generator API", version="1.0.0", lifespan=lifespan)
 
 # CORS middleware for React frontend
 app.add_middleware(
@@ -19,15 +36,18 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag", "X-Next-Cursor", "X-Deleted-Jobs"],
 )
 
-# Mount static files for videos and custom images
+# Reject oversized uploads before FastAPI parses the multipart form
+app.add_middleware(UploadSizeLimit, paths=("/api/custom-images/upload", "/api/upload-custom-image"))
+
+# Mount static files for custom images; generated videos are served by the media router
 base_path = os.getenv("DATA_PATH", "../data")
 videos_path = f"{base_path}/videos"
 custom_images_path = f"{base_path}/custom-images"
 os.makedirs(videos_path, exist_ok=True)
 os.makedirs(custom_images_path, exist_ok=True)
-app.mount("/videos", StaticFiles(directory=videos_path), name="videos")
 app.mount("/custom-images", StaticFiles(directory=custom_images_path), name="custom_images")
 
 # Include routers
@@ -36,6 +56,9 @@ app.include_router(jobs.router, prefix="/api", tags=["jobs"])
 app.include_router(custom_images.router, prefix="/api", tags=["custom-images"])
 app.include_router(env.router, prefix="/api", tags=["env"])
 app.include_router(claude.router, prefix="/api", tags=["claude"])
+app.include_router(callbacks.router, prefix="/api", tags=["callbacks"])
+app.include_router(costs.router, prefix="/api", tags=["costs"])
+app.include_router(media.router, tags=["media"])
 
 
 @app.get("/")
@@ -50,21 +73,3 @@ async def root():
 @app.get("/health")
 async def health_check():
     return {"status": "healthy"}
-
-
-@app.get("/api/download/{job_id}/{filename}")
-async def download_video(job_id: str, filename: str):
-    """Download endpoint that forces file download with proper headers"""
-    file_path = os.path.join(videos_path, job_id, filename)
-
-    if not os.path.exists(file_path):
-        return {"error": "File not found"}, 404
-
-    return FileResponse(
-        path=file_path,
-        filename=f"video-{job_id}.mp4",
-        media_type="video/mp4",
-        headers={
-            "Content-Disposition": f"attachment; filename=video-{job_id}.mp4"
-        }
-    )
@@ -1,5 +1,5 @@
 from pydantic import BaseModel
-from typing import Optional, Dict
+from typing import Optional, Dict, List
 from datetime import datetime
 
 
@@ -20,19 +20,30 @@ class JobResponse(BaseModel):
     fighter2: Optional[str] = None
     prompt: str
     imageSource: str
-    status: str  # pending, uploading, generating, downloading, completed, failed
+    status: str  # pending, queued, uploading, generating, downloading, completed, failed
     options: Dict
     videoParams: Dict
     kieTaskId: Optional[str] = None
+    estimatedStartAt: Optional[str] = None  # when a queued job is expected to be submitted
+    batchId: Optional[str] = None  # set for jobs created by /api/generate/batch
     videoUrl: Optional[str] = None
     thumbnailUrl: Optional[str] = None
+    thumbnails: Optional[Dict[str, str]] = None  # size name (small, large) -> URL
+    previewUrl: Optional[str] = None  # animated WebP hover preview
+    spriteUrl: Optional[str] = None  # scrubbing sprite sheet
+    spriteIndexUrl: Optional[str] = None  # JSON layout/timestamps for spriteUrl
     cost: Optional[float] = None  # Cost in credits/dollars
     error: Optional[str] = None
+    failureReason: Optional[str] = None  # machine-readable cause of a failure, e.g. "timeout"
     createdAt: str
     updatedAt: str
     completedAt: Optional[str] = None
 
 
+class BulkCheckRequest(BaseModel):
+    jobIds: Optional[List[str]] = None  # None checks every active job with a task ID
+
+
 class JobStatus(BaseModel):
     status: str
     progress: Optional[int] = None
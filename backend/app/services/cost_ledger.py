@@ -0,0 +1,184 @@
+from datetime import datetime
+from typing import Optional, Dict, List, Tuple
+
+from app.services.sqlite_db import SQLiteDatabase
+
+# Cost outcome buckets a job moves through; "deleted" closes jobs deleted while still in progress
+COST_STATUSES = ("in_progress", "completed", "failed", "timed_out", "deleted")
+
+
+def cost_status(job_data: Dict) -> str:
+    """Bucket a job's status for cost accounting; timeouts (failureReason "timeout") are kept apart from other failures."""
+    status = job_data.get("status")
+    if status == "completed":
+        return "completed"
+    if status == "failed":
+        return "timed_out" if job_data.get("failureReason") == "timeout" else "failed"
+    return "in_progress"
+
+
+def final_cost(status: str, estimated: float) -> float:
+    """What a job in a cost status has actually been charged; only completed generations are billed."""
+    return estimated if status == "completed" else 0.0
+
+
+class CostEntry:
+    """One ledger row: a job entering the ledger or moving between cost statuses."""
+
+    __slots__ = ("job_id", "model", "duration", "day", "old_status", "new_status", "estimated")
+
+    def __init__(
+        self,
+        job_id: str,
+        model: str,
+        duration: int,
+        day: str,
+        old_status: Optional[str],
+        new_status: str,
+        estimated: float
+    ):
+        self.job_id = job_id
+        self.model = model
+        self.duration = duration
+        self.day = day
+        self.old_status = old_status
+        self.new_status = new_status
+        self.estimated = estimated
+
+
+class CostLedger(SQLiteDatabase):
+    """
+    Append-only ledger of job costs in SQLite, with rollups per day, model
+    and status that are updated in the same transaction as each append, so
+    summaries read a handful of rows no matter how long the history is.
+
+    A rollup row counts the jobs currently in a cost status and their
+    estimated and final (billed) costs. Moving a job between statuses
+    subtracts it from the old row and adds it to the new one.
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS cost_ledger (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            job_id TEXT NOT NULL,
+            model TEXT NOT NULL,
+            duration INTEGER NOT NULL,
+            day TEXT NOT NULL,
+            old_status TEXT,
+            new_status TEXT NOT NULL,
+            estimated_cost REAL NOT NULL,
+            final_cost REAL NOT NULL,
+            recorded_at TEXT NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS cost_rollups (
+            dimension TEXT NOT NULL,
+            key TEXT NOT NULL,
+            status TEXT NOT NULL,
+            jobs INTEGER NOT NULL,
+            estimated_cost REAL NOT NULL,
+            final_cost REAL NOT NULL,
+            PRIMARY KEY (dimension, key, status)
+        );
+    """
+
+    def is_empty(self) -> bool:
+        with self._lock:
+            return self._conn.execute("SELECT 1 FROM cost_ledger LIMIT 1").fetchone() is None
+
+    def append_many(self, entries: List[CostEntry]):
+        """Append entries and apply them to the rollups in one transaction."""
+        if not entries:
+            return
+        now = datetime.utcnow().isoformat()
+
+        # Net rollup change per (dimension, key, status), so each row is written once
+        deltas: Dict[Tuple[str, str, str], List[float]] = {}
+        for entry in entries:
+            for dimension, key in (("total", "all"), ("day", entry.day), ("model", entry.model)):
+                if entry.old_status is not None:
+                    delta = deltas.setdefault((dimension, key, entry.old_status), [0, 0.0, 0.0])
+                    delta[0] -= 1
+                    delta[1] -= entry.estimated
+                    delta[2] -= final_cost(entry.old_status, entry.estimated)
+                delta = deltas.setdefault((dimension, key, entry.new_status), [0, 0.0, 0.0])
+                delta[0] += 1
+                delta[1] += entry.estimated
+                delta[2] += final_cost(entry.new_status, entry.estimated)
+
+        with self._lock:
+            with self._transaction():
+                self._conn.executemany(
+                    "INSERT INTO cost_ledger (job_id, model, duration, day, old_status, new_status, "
+                    "estimated_cost, final_cost, recorded_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    [
+                        (e.job_id, e.model, e.duration, e.day, e.old_status, e.new_status,
+                         e.estimated, final_cost(e.new_status, e.estimated), now)
+                        for e in entries
+                    ],
+                )
+                self._conn.executemany(
+                    "INSERT INTO cost_rollups (dimension, key, status, jobs, estimated_cost, final_cost) "
+                    "VALUES (?, ?, ?, ?, ?, ?) "
+                    "ON CONFLICT (dimension, key, status) DO UPDATE SET "
+                    "jobs = jobs + excluded.jobs, "
+                    "estimated_cost = estimated_cost + excluded.estimated_cost, "
+                    "final_cost = final_cost + excluded.final_cost",
+                    [(dimension, key, status, *delta) for (dimension, key, status), delta in deltas.items()],
+                )
+
+    def in_progress_entries(self) -> List[CostEntry]:
+        """Each job whose latest ledger status is in_progress, as an entry to close it from."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT job_id, model, duration, day, new_status, estimated_cost FROM cost_ledger "
+                "WHERE id IN (SELECT MAX(id) FROM cost_ledger GROUP BY job_id) AND new_status = 'in_progress'"
+            ).fetchall()
+        return [
+            CostEntry(job_id, model, duration, day, None, status, estimated)
+            for job_id, model, duration, day, status, estimated in rows
+        ]
+
+    def summary(self, days: int = 30) -> Dict:
+        """Totals overall, per model and per day (most recent `days` days), broken out by status."""
+        with self._lock:
+            totals = self._conn.execute(
+                "SELECT dimension, key, status, jobs, estimated_cost, final_cost FROM cost_rollups "
+                "WHERE dimension IN ('total', 'model')"
+            ).fetchall()
+            recent_days = self._conn.execute(
+                "SELECT DISTINCT key FROM cost_rollups WHERE dimension = 'day' ORDER BY key DESC LIMIT ?",
+                (days,),
+            ).fetchall()
+            day_rows = []
+            if recent_days:
+                day_rows = self._conn.execute(
+                    "SELECT dimension, key, status, jobs, estimated_cost, final_cost FROM cost_rollups "
+                    "WHERE dimension = 'day' AND key >= ?",
+                    (recent_days[-1][0],),
+                ).fetchall()
+
+        groups: Dict[str, Dict[str, Dict]] = {"total": {}, "model": {}, "day": {}}
+        for dimension, key, status, jobs, estimated, final in totals + day_rows:
+            group = groups[dimension].setdefault(key, self._empty_group())
+            bucket = group["byStatus"][status]
+            bucket["jobs"] += jobs
+            bucket["estimatedCost"] = round(bucket["estimatedCost"] + estimated, 4)
+            bucket["finalCost"] = round(bucket["finalCost"] + final, 4)
+            group["jobs"] += jobs
+            group["estimatedCost"] = round(group["estimatedCost"] + estimated, 4)
+            group["finalCost"] = round(group["finalCost"] + final, 4)
+
+        return {
+            "total": groups["total"].get("all", self._empty_group()),
+            "byModel": groups["model"],
+            "byDay": dict(sorted(groups["day"].items(), reverse=True)),
+        }
+
+    @staticmethod
+    def _empty_group() -> Dict:
+        return {
+            "jobs": 0,
+            "estimatedCost": 0.0,
+            "finalCost": 0.0,
+            "byStatus": {status: {"jobs": 0, "estimatedCost": 0.0, "finalCost": 0.0} for status in COST_STATUSES},
+        }
@@ -0,0 +1,170 @@
+import hashlib
+import os
+import struct
+from typing import Optional, List
+
+# Boxes whose payload is a plain list of child boxes, on the path from moov to the chunk offset tables
+CONTAINER_BOXES = {b"moov", b"trak", b"mdia", b"minf", b"stbl"}
+
+COPY_CHUNK_SIZE = 1024 * 1024
+
+# The whole moov box is read into memory; anything bigger isn't a normal video index
+MAX_MOOV_SIZE = 64 * 1024 * 1024
+
+
+class Box:
+    """A box header: type, absolute offset, total size and header size."""
+
+    __slots__ = ("type", "offset", "size", "header_size")
+
+    def __init__(self, box_type: bytes, offset: int, size: int, header_size: int):
+        self.type = box_type
+        self.offset = offset
+        self.size = size
+        self.header_size = header_size
+
+    @property
+    def end(self) -> int:
+        return self.offset + self.size
+
+
+def _read_boxes(data: bytes, start: int, end: int) -> List[Box]:
+    """Parse consecutive box headers in data[start:end]."""
+    boxes = []
+    position = start
+    while position + 8 <= end:
+        size, box_type = struct.unpack(">I4s", data[position:position + 8])
+        header_size = 8
+        if size == 1:
+            if position + 16 > end:
+                raise ValueError("Truncated 64-bit box header")
+            size = struct.unpack(">Q", data[position + 8:position + 16])[0]
+            header_size = 16
+        elif size == 0:
+            size = end - position
+        if size < header_size or position + size > end:
+            raise ValueError(f"Invalid size for {box_type!r} box")
+        boxes.append(Box(box_type, position, size, header_size))
+        position += size
+    return boxes
+
+
+def _top_level_boxes(f, file_size: int) -> List[Box]:
+    """Parse the top-level box headers of a file without reading box payloads."""
+    boxes = []
+    position = 0
+    while position + 8 <= file_size:
+        f.seek(position)
+        header = f.read(16)
+        size, box_type = struct.unpack(">I4s", header[:8])
+        header_size = 8
+        if size == 1:
+            size = struct.unpack(">Q", header[8:16])[0]
+            header_size = 16
+        elif size == 0:
+            size = file_size - position
+        if size < header_size or position + size > file_size:
+            raise ValueError(f"Invalid size for top-level {box_type!r} box")
+        boxes.append(Box(box_type, position, size, header_size))
+        position += size
+    return boxes
+
+
+def _patch_chunk_offsets(moov: bytearray, shift: int, moved_from: int, moved_to: int):
+    """
+    Add `shift` to every stco/co64 chunk offset in [moved_from, moved_to),
+    i.e. every chunk of media data that ends up after the relocated moov.
+    """
+    def walk(start: int, end: int):
+        for box in _read_boxes(moov, start, end):
+            payload = box.offset + box.header_size
+            if box.type in CONTAINER_BOXES:
+                walk(payload, box.end)
+            elif box.type in (b"stco", b"co64"):
+                entry_size, fmt = (4, ">I") if box.type == b"stco" else (8, ">Q")
+                count = struct.unpack(">I", moov[payload + 4:payload + 8])[0]
+                position = payload + 8
+                if position + count * entry_size > box.end:
+                    raise ValueError(f"Truncated {box.type!r} box")
+                for _ in range(count):
+                    offset = struct.unpack(fmt, moov[position:position + entry_size])[0]
+                    if moved_from <= offset < moved_to:
+                        offset += shift
+                        if entry_size == 4 and offset > 0xFFFFFFFF:
+                            raise ValueError("Chunk offset overflows stco; file left as is")
+                        moov[position:position + entry_size] = struct.pack(fmt, offset)
+                    position += entry_size
+
+    walk(0, len(moov))
+
+
+def _copy_range(src, dst, start: int, length: int, digest):
+    src.seek(start)
+    while length > 0:
+        chunk = src.read(min(COPY_CHUNK_SIZE, length))
+        if not chunk:
+            raise ValueError("Unexpected end of file")
+        dst.write(chunk)
+        digest.update(chunk)
+        length -= len(chunk)
+
+
+def faststart(path: str) -> Optional[str]:
+    """
+    Move an MP4's moov box in front of its media data so playback can start
+    before the whole file has downloaded. Chunk offsets (stco/co64) are
+    patched; nothing is re-encoded. The media data is streamed in
+    COPY_CHUNK_SIZE pieces and the result replaces the file atomically.
+
+    Returns:
+        SHA-256 hex digest of the rewritten file, or None if the file was
+        left unchanged (already faststart, fragmented, or not an MP4 we can
+        safely rewrite)
+    """
+    file_size = os.path.getsize(path)
+    with open(path, 'rb') as f:
+        try:
+            boxes = _top_level_boxes(f, file_size)
+        except (ValueError, struct.error):
+            return None
+
+        types = [box.type for box in boxes]
+        if b"moov" not in types or b"mdat" not in types or b"moof" in types:
+            return None
+        moov_box = boxes[types.index(b"moov")]
+        first_mdat = boxes[types.index(b"mdat")]
+        if moov_box.offset < first_mdat.offset:
+            return None
+        if moov_box.size > MAX_MOOV_SIZE:
+            return None
+
+        f.seek(moov_box.offset)
+        moov = bytearray(f.read(moov_box.size))
+        try:
+            # Everything from the first mdat up to the old moov position moves back by the moov size
+            _patch_chunk_offsets(moov, moov_box.size, first_mdat.offset, moov_box.offset)
+        except (ValueError, struct.error):
+            return None
+
+        tmp_path = f"{path}.faststart"
+        digest = hashlib.sha256()
+        try:
+            with open(tmp_path, 'wb') as out:
+                # ftyp (and anything else before the media data), then moov, then the rest
+                _copy_range(f, out, 0, first_mdat.offset, digest)
+                out.write(moov)
+                digest.update(moov)
+                for box in boxes:
+                    if box.offset >= first_mdat.offset and box is not moov_box:
+                        _copy_range(f, out, box.offset, box.size, digest)
+                out.flush()
+                os.fsync(out.fileno())
+        except BaseException:
+            try:
+                os.remove(tmp_path)
+            except FileNotFoundError:
+                pass
+            raise
+
+    os.replace(tmp_path, path)
+    return digest.hexdigest()
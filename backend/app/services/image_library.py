@@ -0,0 +1,327 @@
+import asyncio
+import hashlib
+import mimetypes
+import os
+import uuid
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from datetime import datetime
+from typing import Optional, Dict, List, Tuple
+
+from fastapi import UploadFile
+from PIL import Image, ImageOps
+
+from app.services.pagination import encode_cursor, decode_cursor
+from app.services.sqlite_db import SQLiteDatabase
+from app.services.upload_cache import file_sha256
+
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.gif', '.webp')
+
+# Gallery thumbnails: longest side in pixels
+THUMBNAIL_SIZE = 256
+THUMBNAILS_DIR = "thumbs"
+
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+
+
+class ImageTooLarge(ValueError):
+    """An upload over the configured byte or pixel limit."""
+
+
+def describe_image(path: str, thumbnail_path: str, sha256: Optional[str] = None, max_pixels: int = 0) -> Dict:
+    """
+    Hash an image (unless the digest is already known), read its dimensions
+    and write a small WebP gallery thumbnail. Runs in a worker process, so it
+    only takes and returns plain values.
+    """
+    if sha256 is None:
+        sha256 = file_sha256(path)
+
+    with Image.open(path) as image:
+        width, height = image.size
+        # Checked from the header, before any pixel data is decoded
+        if max_pixels and width * height > max_pixels:
+            raise ImageTooLarge(f"Image is {width}x{height}; the limit is {max_pixels} pixels")
+        thumbnail = ImageOps.exif_transpose(image)
+        thumbnail.thumbnail((THUMBNAIL_SIZE, THUMBNAIL_SIZE))
+        if thumbnail.mode not in ("RGB", "RGBA"):
+            thumbnail = thumbnail.convert("RGBA" if "transparency" in thumbnail.info else "RGB")
+        thumbnail.save(thumbnail_path, format="WEBP", quality=80)
+
+    return {"width": width, "height": height, "sha256": sha256}
+
+
+class ImageIndex(SQLiteDatabase):
+    """SQLite index of uploaded custom images, newest first."""
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS images (
+            id TEXT PRIMARY KEY,
+            filename TEXT NOT NULL,
+            size INTEGER NOT NULL,
+            width INTEGER,
+            height INTEGER,
+            sha256 TEXT,
+            thumbnail TEXT,
+            created_at TEXT NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS idx_images_created ON images(created_at, id);
+        CREATE INDEX IF NOT EXISTS idx_images_sha256 ON images(sha256);
+    """
+
+    COLUMNS = ("id", "filename", "size", "width", "height", "sha256", "thumbnail", "created_at")
+
+    def _record(self, row) -> Dict:
+        return dict(zip(self.COLUMNS, row))
+
+    def put(self, record: Dict):
+        with self._lock:
+            self._conn.execute(
+                f"INSERT OR REPLACE INTO images ({', '.join(self.COLUMNS)}) VALUES ({', '.join('?' * len(self.COLUMNS))})",
+                tuple(record.get(column) for column in self.COLUMNS),
+            )
+
+    def get(self, image_id: str) -> Optional[Dict]:
+        with self._lock:
+            row = self._conn.execute(
+                f"SELECT {', '.join(self.COLUMNS)} FROM images WHERE id = ?", (image_id,)
+            ).fetchone()
+        return self._record(row) if row else None
+
+    def find_by_hash(self, sha256: str) -> Optional[Dict]:
+        with self._lock:
+            row = self._conn.execute(
+                f"SELECT {', '.join(self.COLUMNS)} FROM images WHERE sha256 = ? LIMIT 1", (sha256,)
+            ).fetchone()
+        return self._record(row) if row else None
+
+    def delete(self, image_id: str):
+        with self._lock:
+            self._conn.execute("DELETE FROM images WHERE id = ?", (image_id,))
+
+    def ids(self) -> List[str]:
+        with self._lock:
+            return [row[0] for row in self._conn.execute("SELECT id FROM images")]
+
+    def page(self, after: Optional[Tuple[str, str]], limit: Optional[int]) -> List[Dict]:
+        """Images newest first, starting after the (created_at, id) key."""
+        query = f"SELECT {', '.join(self.COLUMNS)} FROM images"
+        params: list = []
+        if after:
+            query += " WHERE (created_at, id) < (?, ?)"
+            params += list(after)
+        query += " ORDER BY created_at DESC, id DESC"
+        if limit is not None:
+            query += " LIMIT ?"
+            params.append(limit)
+        with self._lock:
+            return [self._record(row) for row in self._conn.execute(query, params)]
+
+
+class ImageLibrary:
+    """
+    Custom images on disk plus their index and gallery thumbnails.
+
+    The index is updated on upload and delete, and reconciled with the
+    directory once on startup, so listing never has to walk the directory.
+    Thumbnails are rendered once, on a worker pool.
+    """
+
+    def __init__(self, images_path: str):
+        self.images_path = images_path
+        self.thumbnails_path = os.path.join(images_path, THUMBNAILS_DIR)
+        os.makedirs(self.thumbnails_path, exist_ok=True)
+        self.index = ImageIndex(os.path.join(os.path.dirname(os.path.abspath(images_path)), "images.db"))
+
+        workers = int(os.getenv("IMAGE_WORKERS", "2"))
+        if os.getenv("IMAGE_POOL", "process") == "thread":
+            self.pool = ThreadPoolExecutor(max_workers=workers)
+        else:
+            self.pool = ProcessPoolExecutor(max_workers=workers)
+        self.max_upload_bytes = int(os.getenv("MAX_UPLOAD_BYTES", str(20 * 1024 * 1024)))
+        self.max_upload_pixels = int(os.getenv("MAX_UPLOAD_PIXELS", str(50_000_000)))
+        # Content hash -> lock, so identical concurrent uploads store one copy
+        self._upload_locks: Dict[str, asyncio.Lock] = {}
+        self._sync_task: Optional[asyncio.Task] = None
+
+    async def start(self):
+        """Reconcile the index with the directory in the background (called from the app lifespan)."""
+        if self._sync_task is None or self._sync_task.done():
+            self._sync_task = asyncio.create_task(self.sync())
+
+    async def close(self):
+        if self._sync_task:
+            self._sync_task.cancel()
+            await asyncio.gather(self._sync_task, return_exceptions=True)
+        self.pool.shutdown(wait=False, cancel_futures=True)
+        self.index.close()
+
+    def path_for(self, image_id: str) -> Optional[str]:
+        """Path of a custom image, or None if the id isn't a plain filename."""
+        if not image_id or os.path.basename(image_id) != image_id or image_id in (".", ".."):
+            return None
+        return os.path.join(self.images_path, image_id)
+
+    async def add(self, image_id: str, filename: Optional[str] = None) -> Dict:
+        """Index an image that has been written to the images directory."""
+        try:
+            return await self._index(image_id, filename)
+        except Exception as e:
+            # Still list the image; the gallery falls back to the original
+            print(f"Error describing image {image_id}: {e}")
+        return await self._index(image_id, filename, describe=False)
+
+    async def save_upload(self, upload: UploadFile) -> Tuple[Dict, bool]:
+        """
+        Store an uploaded image and index it. The body is streamed to disk in
+        chunks off the event loop and hashed on the way; an upload identical to
+        an image already in the library returns that image instead of a copy.
+
+        Returns:
+            (record, created) - created is False for a duplicate
+
+        Raises:
+            ImageTooLarge: over MAX_UPLOAD_BYTES or MAX_UPLOAD_PIXELS
+            ValueError: not a supported, readable image
+        """
+        extension = self._upload_extension(upload)
+        tmp_path = os.path.join(self.images_path, f".upload-{uuid.uuid4()}")
+        try:
+            sha256 = await self._stream_to_disk(upload, tmp_path)
+
+            lock = self._upload_locks.setdefault(sha256, asyncio.Lock())
+            try:
+                async with lock:
+                    existing = await asyncio.to_thread(self.index.find_by_hash, sha256)
+                    if existing and await asyncio.to_thread(os.path.exists, self.path_for(existing["id"])):
+                        return existing, False
+
+                    image_id = f"{uuid.uuid4()}{extension}"
+                    await asyncio.to_thread(os.replace, tmp_path, self.path_for(image_id))
+                    try:
+                        record = await self._index(
+                            image_id, upload.filename, sha256=sha256, max_pixels=self.max_upload_pixels
+                        )
+                        return record, True
+                    except Exception as e:
+                        await asyncio.to_thread(os.remove, self.path_for(image_id))
+                        if isinstance(e, ImageTooLarge):
+                            raise
+                        raise ValueError("File is not a readable image") from e
+            finally:
+                if not lock.locked() and self._upload_locks.get(sha256) is lock:
+                    del self._upload_locks[sha256]
+        finally:
+            try:
+                await asyncio.to_thread(os.remove, tmp_path)
+            except FileNotFoundError:
+                pass
+
+    async def _stream_to_disk(self, upload: UploadFile, path: str) -> str:
+        """Copy an upload to `path` in chunks, enforcing MAX_UPLOAD_BYTES. Returns its SHA-256."""
+        digest = hashlib.sha256()
+        size = 0
+        f = await asyncio.to_thread(open, path, 'wb')
+        try:
+            while chunk := await upload.read(UPLOAD_CHUNK_SIZE):
+                size += len(chunk)
+                if size > self.max_upload_bytes:
+                    raise ImageTooLarge(f"Upload exceeds {self.max_upload_bytes} bytes")
+                digest.update(chunk)
+                await asyncio.to_thread(f.write, chunk)
+        finally:
+            await asyncio.to_thread(f.close)
+        return digest.hexdigest()
+
+    @staticmethod
+    def _upload_extension(upload: UploadFile) -> str:
+        """File extension to store an upload under, from its name or else its content type."""
+        extension = os.path.splitext(upload.filename or "")[1].lower()
+        if extension not in IMAGE_EXTENSIONS:
+            extension = mimetypes.guess_extension(upload.content_type or "") or ""
+        if extension not in IMAGE_EXTENSIONS:
+            raise ValueError("Unsupported image type; use PNG, JPEG, GIF or WebP")
+        return extension
+
+    async def _index(
+        self,
+        image_id: str,
+        filename: Optional[str] = None,
+        sha256: Optional[str] = None,
+        max_pixels: int = 0,
+        describe: bool = True
+    ) -> Dict:
+        """Stat (and unless told otherwise, describe and thumbnail) an image, then write its index entry."""
+        path = self.path_for(image_id)
+        stat_result = await asyncio.to_thread(os.stat, path)
+        record = {
+            "id": image_id,
+            "filename": filename or image_id,
+            "size": stat_result.st_size,
+            "sha256": sha256,
+            "created_at": datetime.fromtimestamp(stat_result.st_mtime).isoformat(),
+        }
+
+        if describe:
+            thumbnail = f"{image_id}.webp"
+            described = await asyncio.get_running_loop().run_in_executor(
+                self.pool, describe_image, path, os.path.join(self.thumbnails_path, thumbnail),
+                sha256, max_pixels
+            )
+            record.update(described, thumbnail=thumbnail)
+
+        await asyncio.to_thread(self.index.put, record)
+        return record
+
+    async def remove(self, image_id: str) -> bool:
+        """Delete an image, its thumbnail and its index entry. Returns False if it didn't exist."""
+        path = self.path_for(image_id)
+        if path is None:
+            return False
+        record = await asyncio.to_thread(self.index.get, image_id)
+        try:
+            await asyncio.to_thread(os.remove, path)
+        except FileNotFoundError:
+            if record is None:
+                return False
+        if record and record.get("thumbnail"):
+            try:
+                await asyncio.to_thread(os.remove, os.path.join(self.thumbnails_path, record["thumbnail"]))
+            except FileNotFoundError:
+                pass
+        await asyncio.to_thread(self.index.delete, image_id)
+        return True
+
+    async def page(self, cursor: Optional[str] = None, limit: Optional[int] = None) -> Tuple[List[Dict], Optional[str]]:
+        """
+        A page of images, newest first. Returns (images, next_cursor);
+        next_cursor is None on the last page. Raises ValueError for a bad cursor.
+        """
+        after = decode_cursor(cursor) if cursor else None
+        fetch = limit + 1 if limit is not None else None
+        records = await asyncio.to_thread(self.index.page, after, fetch)
+
+        next_cursor = None
+        if limit is not None and len(records) > limit:
+            records = records[:limit]
+            last = records[-1]
+            next_cursor = encode_cursor((last["created_at"], last["id"]))
+        return records, next_cursor
+
+    async def sync(self):
+        """Index images that are on disk but not in the index, and drop entries for missing files."""
+        names = await asyncio.to_thread(os.listdir, self.images_path)
+        on_disk = {name for name in names if name.lower().endswith(IMAGE_EXTENSIONS)}
+        indexed = set(await asyncio.to_thread(self.index.ids))
+
+        for image_id in indexed - on_disk:
+            await asyncio.to_thread(self.index.delete, image_id)
+        for image_id in on_disk - indexed:
+            try:
+                await self.add(image_id)
+            except OSError as e:
+                print(f"Error indexing image {image_id}: {e}")
+
+
+
+# Shared instance for the custom image routes
+image_library = ImageLibrary(f"{os.getenv('DATA_PATH', '../data')}/custom-images")
@@ -0,0 +1,106 @@
+import asyncio
+import os
+import re
+from concurrent.futures import Executor
+from typing import Callable, Dict, Optional, Tuple
+
+from PIL import Image, ImageOps
+
+from app.services.upload_cache import coalesce, file_sha256
+
+# Short side in pixels when the quality setting doesn't name one
+DEFAULT_SHORT_SIDE = 720
+
+_RATIO = re.compile(r"^(\d+):(\d+)$")
+_QUALITY = re.compile(r"^(\d+)p$")
+
+
+def target_size(aspect_ratio: str, quality: str) -> Tuple[int, int]:
+    """
+    Frame size a generation will render at: "16:9" + "720p" -> 1280x720,
+    "9:16" -> 720x1280, "1:1" -> 720x720. Unknown ratios are treated as 16:9,
+    as _generate_video_sora2 does.
+    """
+    ratio = _RATIO.match(aspect_ratio or "")
+    width, height = (int(ratio.group(1)), int(ratio.group(2))) if ratio else (16, 9)
+    if not width or not height:
+        width, height = 16, 9
+    short_quality = _QUALITY.match(quality or "")
+    short_side = int(short_quality.group(1)) if short_quality else DEFAULT_SHORT_SIDE
+
+    if width >= height:
+        return round(short_side * width / height), short_side
+    return short_side, round(short_side * height / width)
+
+
+def normalize_image(src: str, dst: str, width: int, height: int, jpeg_quality: int = 90):
+    """
+    Center-crop an image to width:height, downscale it to at most width x
+    height (never upscale), drop its metadata and write it as a baseline JPEG.
+    Runs in a worker process, so it only takes plain values.
+    """
+    with Image.open(src) as image:
+        image = ImageOps.exif_transpose(image)
+        if image.mode in ("RGBA", "LA", "P"):
+            image = image.convert("RGBA")
+            # Transparent areas become white rather than black
+            background = Image.new("RGB", image.size, (255, 255, 255))
+            background.paste(image, mask=image.getchannel("A"))
+            image = background
+        elif image.mode != "RGB":
+            image = image.convert("RGB")
+
+        # Largest centered crop with the target aspect ratio
+        crop_width = min(image.width, round(image.height * width / height))
+        crop_height = min(image.height, round(image.width * height / width))
+        left = (image.width - crop_width) // 2
+        top = (image.height - crop_height) // 2
+        image = image.crop((left, top, left + crop_width, top + crop_height))
+        if crop_width > width:
+            image = image.resize((width, height), Image.LANCZOS)
+
+        tmp_path = f"{dst}.tmp"
+        image.save(tmp_path, format="JPEG", quality=jpeg_quality, optimize=True)
+    os.replace(tmp_path, dst)
+
+
+class ImagePrep:
+    """
+    Normalizes reference images to the frame a generation will render at
+    before they are uploaded to Kie.ai, so large originals aren't sent only
+    to be downscaled upstream.
+
+    Results are cached on disk per (content hash, aspect ratio, quality);
+    concurrent requests for the same result share one conversion.
+    """
+
+    def __init__(
+        self,
+        cache_dir: str,
+        pool: Executor,
+        jpeg_quality: int = 90,
+        digest: Optional[Callable[[str], str]] = None
+    ):
+        self.cache_dir = cache_dir
+        self.pool = pool
+        self.jpeg_quality = jpeg_quality
+        # Content hash of a source image; pass a memoized one so originals aren't re-read per generation
+        self.digest = digest or file_sha256
+        self._inflight: Dict[str, asyncio.Future] = {}
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    async def prepare(self, image_path: str, aspect_ratio: str, quality: str) -> str:
+        """Path of the normalized copy of an image, converting it if it isn't cached yet."""
+        width, height = target_size(aspect_ratio, quality)
+        digest = await asyncio.to_thread(self.digest, image_path)
+        output_path = os.path.join(self.cache_dir, f"{digest}-{width}x{height}.jpg")
+        if await asyncio.to_thread(os.path.exists, output_path):
+            return output_path
+
+        async def convert() -> str:
+            await asyncio.get_running_loop().run_in_executor(
+                self.pool, normalize_image, image_path, output_path, width, height, self.jpeg_quality
+            )
+            return output_path
+
+        return await coalesce(self._inflight, output_path, convert)
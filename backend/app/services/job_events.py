@@ -0,0 +1,107 @@
+import asyncio
+import itertools
+import json
+import uuid
+from collections import deque
+from typing import Optional, Dict, Set, Deque, Tuple
+
+
+class JobEvent:
+    """A single job change, serialized once and shared by every subscriber."""
+
+    __slots__ = ("id", "seq", "type", "data")
+
+    def __init__(self, event_id: str, seq: int, event_type: str, data: str):
+        self.id = event_id
+        self.seq = seq
+        self.type = event_type
+        self.data = data
+
+    def to_sse(self) -> str:
+        return f"id: {self.id}\nevent: {self.type}\ndata: {self.data}\n\n"
+
+
+# Sent instead of events a subscriber can no longer receive; clients refetch the job list
+RESYNC = JobEvent("", -1, "resync", "{}")
+
+
+class Subscriber:
+    """Bounded event queue for one connected client."""
+
+    def __init__(self, queue_size: int):
+        self.queue: "asyncio.Queue[JobEvent]" = asyncio.Queue(maxsize=queue_size)
+
+    def push(self, event: JobEvent):
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            # Client is too slow: drop its backlog and tell it to resync instead of
+            # letting the queue (and server memory) grow without bound
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait(RESYNC)
+
+
+class JobEventBus:
+    """
+    In-process pub/sub for job changes.
+
+    Recent events are kept in a ring buffer so a reconnecting client can
+    resume from its Last-Event-ID. Event ids carry a per-process epoch, so ids
+    from before a restart are recognized and answered with a resync.
+    """
+
+    def __init__(self, history_size: int = 1000, queue_size: int = 256):
+        self.queue_size = queue_size
+        self._epoch = uuid.uuid4().hex[:8]
+        self._seq = itertools.count(1)
+        self._history: Deque[JobEvent] = deque(maxlen=history_size)
+        self._subscribers: Set[Subscriber] = set()
+
+    def __len__(self) -> int:
+        return len(self._subscribers)
+
+    def publish(self, event_type: str, payload: Dict):
+        """Record an event and fan it out to every subscriber."""
+        seq = next(self._seq)
+        event = JobEvent(f"{self._epoch}-{seq}", seq, event_type, json.dumps(payload))
+        self._history.append(event)
+        for subscriber in self._subscribers:
+            subscriber.push(event)
+
+    def subscribe(self, last_event_id: Optional[str] = None) -> Subscriber:
+        """
+        Register a subscriber. If last_event_id is given, events after it are
+        replayed first, or a resync is queued if they are no longer available.
+        """
+        subscriber = Subscriber(self.queue_size)
+
+        if last_event_id:
+            replay = self._events_after(last_event_id)
+            if replay is None or len(replay) >= self.queue_size:
+                subscriber.push(RESYNC)
+            else:
+                for event in replay:
+                    subscriber.push(event)
+
+        self._subscribers.add(subscriber)
+        return subscriber
+
+    def unsubscribe(self, subscriber: Subscriber):
+        self._subscribers.discard(subscriber)
+
+    def _events_after(self, last_event_id: str) -> Optional[list]:
+        parsed = self._parse_id(last_event_id)
+        if parsed is None or parsed[0] != self._epoch:
+            return None
+
+        last_seq = parsed[1]
+        if self._history and last_seq < self._history[0].seq - 1:
+            # Some events after last_seq have already fallen out of the buffer
+            return None
+        return [event for event in self._history if event.seq > last_seq]
+
+    @staticmethod
+    def _parse_id(event_id: str) -> Optional[Tuple[str, int]]:
+        epoch, _, seq = event_id.rpartition("-")
+        return (epoch, int(seq)) if seq.isdigit() else None
@@ -1,14 +1,38 @@
 import json
 import os
 import asyncio
-from datetime import datetime
-from typing import Optional, Dict, List
+import bisect
+import uuid
+import weakref
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Optional, Dict, List, Set, Iterable, Tuple
 from pathlib import Path
-import cv2
-
-from app.services.kie_client import KieClient
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from app.services.kie_client import KieClient, KieRateLimitError
+from app.services.job_store import create_job_store
+from app.services.status_poller import StatusPoller
+from app.services.upload_cache import UploadCache
+from app.services.image_prep import ImagePrep
+from app.services.job_events import JobEventBus
+from app.services.work_queue import WorkQueue, STAGES
+from app.services.submit_scheduler import SubmitScheduler
+from app.services.retry import is_transient, CircuitOpenError
+from app.services.cost_ledger import CostLedger, CostEntry, cost_status
+from app.services.media import render_media
+from app.services.faststart import faststart
+from app.services.poll_schedule import AdaptivePollSchedule, generation_seconds
+from app.services.pagination import encode_cursor, decode_cursor
 from app.models.job import JobResponse
 
+# Statuses of a job that is still waiting on Kie.ai
+ACTIVE_STATUSES = ("pending", "queued", "uploading", "generating")
+# Statuses of a job that hasn't reached completed/failed yet
+IN_PROGRESS_STATUSES = ACTIVE_STATUSES + ("downloading",)
+# Deleted job ids remembered for delta listings
+MAX_TOMBSTONES = 10000
+
 
 class JobManager:
     """Manages video generation jobs and their state."""
@@ -16,29 +40,230 @@ class JobManager:
     def __init__(self):
         # Use local path when running outside Docker
         self.base_path = os.getenv("DATA_PATH", "../data")
-        self.jobs_file = f"{self.base_path}/jobs.json"
+        self.store = create_job_store(self.base_path)
         self.kie_client = KieClient()
-        self._ensure_jobs_file()
 
-    def _ensure_jobs_file(self):
-        """Ensure jobs.json file exists."""
-        if not os.path.exists(self.jobs_file):
-            os.makedirs(os.path.dirname(self.jobs_file), exist_ok=True)
-            with open(self.jobs_file, 'w') as f:
-                json.dump({}, f)
+        # In-memory job table is authoritative; the store is written behind it
+        self._jobs: Dict[str, Dict] = self.store.load_all()
+        self._dirty: Set[str] = set()
+        self._deleted: Set[str] = set()
+        # kieTaskId -> job id, for routing callbacks
+        self._task_index: Dict[str, str] = {
+            job["kieTaskId"]: job_id for job_id, job in self._jobs.items() if job.get("kieTaskId")
+        }
+        # batchId -> job ids, for batch progress
+        self._batches: Dict[str, Set[str]] = {}
+        for job_id, job in self._jobs.items():
+            if job.get("batchId"):
+                self._batches.setdefault(job["batchId"], set()).add(job_id)
+        # Push channel for job changes (see /api/jobs/stream)
+        self.events = JobEventBus(
+            history_size=int(os.getenv("JOB_EVENTS_HISTORY", "1000")),
+            queue_size=int(os.getenv("JOB_EVENTS_QUEUE_SIZE", "256")),
+        )
 
-    async def _load_jobs(self) -> Dict:
-        """Load all jobs from storage."""
-        try:
-            with open(self.jobs_file, 'r') as f:
-                return json.load(f)
-        except:
-            return {}
+        # Change tracking for listing: version counter, sorted view cache, recent deletions
+        self._epoch = uuid.uuid4().hex[:8]
+        self._version = 0
+        self._sorted_cache: List[Dict] = []
+        self._sorted_keys: List[Tuple[str, str]] = []
+        self._sorted_version = -1
+        self._tombstones: "OrderedDict[str, str]" = OrderedDict()
+        # Locks disappear on their own once no coroutine holds or waits on them
+        self._job_locks: "weakref.WeakValueDictionary[str, asyncio.Lock]" = weakref.WeakValueDictionary()
+        self.flush_interval = float(os.getenv("JOB_FLUSH_INTERVAL", "1.0"))
+        self.flush_batch_size = int(os.getenv("JOB_FLUSH_BATCH_SIZE", "200"))
+        self._flush_event: Optional[asyncio.Event] = None
+        self._flush_task: Optional[asyncio.Task] = None
+        self._flush_lock: Optional[asyncio.Lock] = None
+        self._background_tasks: Set[asyncio.Task] = set()
+
+        # Bounded pool for OpenCV work so decoding never blocks the event loop
+        media_workers = int(os.getenv("MEDIA_WORKERS", "2"))
+        if os.getenv("MEDIA_POOL", "process") == "thread":
+            self.media_pool = ThreadPoolExecutor(max_workers=media_workers)
+        else:
+            self.media_pool = ProcessPoolExecutor(max_workers=media_workers)
+
+        # Durable workflow checkpoints, with a concurrency cap per stage
+        self.work_queue = WorkQueue(f"{self.base_path}/workflows.db")
+        self._stage_limits: Dict[str, asyncio.Semaphore] = {
+            stage: asyncio.Semaphore(int(os.getenv(f"WORKFLOW_{stage.upper()}_CONCURRENCY", default)))
+            for stage, default in (
+                ("upload", "4"), ("download", "4"), ("faststart", "2"), ("media", str(media_workers))
+            )
+        }
+        self.video_faststart = os.getenv("VIDEO_FASTSTART", "true").lower() == "true"
+
+        # Admission control for submissions: per-model concurrency and rate limits,
+        # with a FIFO queue instead of failing jobs when Kie.ai is saturated
+        default_limits = self._submit_limits("", (4, 1.0, 4))
+        self.submit_scheduler = SubmitScheduler(
+            limits={model: self._submit_limits(model, default_limits) for model in ("runway", "sora2")},
+            default=default_limits,
+            on_change=self._on_submit_queue_change,
+        )
+        self.submit_max_retries = int(os.getenv("KIE_SUBMIT_MAX_RETRIES", "5"))
+        self.submit_retry_delay = float(os.getenv("KIE_SUBMIT_RETRY_DELAY", "10"))
+
+        # Cost history with incremental rollups; entries are written with each flush
+        self.cost_ledger = CostLedger(f"{self.base_path}/costs.db")
+        self._cost_entries: List[CostEntry] = []
+
+        # Kie.ai URLs of already-uploaded images, so repeat generations skip the upload
+        self.upload_cache = UploadCache(
+            f"{self.base_path}/upload-cache.json",
+            ttl=float(os.getenv("KIE_UPLOAD_CACHE_TTL_HOURS", "70")) * 3600,
+            max_entries=int(os.getenv("KIE_UPLOAD_CACHE_SIZE", "1000")),
+        )
 
-    async def _save_jobs(self, jobs: Dict):
-        """Save all jobs to storage."""
-        with open(self.jobs_file, 'w') as f:
-            json.dump(jobs, f, indent=2)
+        # Optionally shrink reference images to the generation's frame size before uploading
+        self.image_prep: Optional[ImagePrep] = None
+        if os.getenv("IMAGE_NORMALIZE", "false").lower() == "true":
+            self.image_prep = ImagePrep(
+                f"{self.base_path}/prepared-images",
+                self.media_pool,
+                jpeg_quality=int(os.getenv("IMAGE_NORMALIZE_JPEG_QUALITY", "90")),
+                digest=self.upload_cache.digest,
+            )
+
+        # One scheduler polls every in-flight Kie.ai task, timed by observed generation times
+        if self.kie_client.callbacks_enabled:
+            # Kie.ai reports completions via callback; polling is only a slow safety net
+            safety_interval = float(os.getenv("KIE_CALLBACK_POLL_INTERVAL", "300"))
+            self.poll_schedule = AdaptivePollSchedule(
+                base_interval=safety_interval,
+                min_interval=safety_interval,
+                max_interval=safety_interval,
+            )
+        else:
+            self.poll_schedule = AdaptivePollSchedule(
+                base_interval=float(os.getenv("KIE_POLL_INTERVAL", "30")),
+                min_interval=float(os.getenv("KIE_POLL_MIN_INTERVAL", "5")),
+                max_interval=float(os.getenv("KIE_POLL_MAX_INTERVAL", "120")),
+            )
+        self.poller = StatusPoller(
+            check_status=self.kie_client.get_task_status,
+            on_status=self._on_poll_status,
+            on_timeout=self._on_poll_timeout,
+            on_error=self._on_poll_error,
+            schedule=self.poll_schedule,
+            timeout=float(os.getenv("KIE_POLL_TIMEOUT", "600")),
+            concurrency=int(os.getenv("KIE_POLL_CONCURRENCY", "8")),
+            gate=self.kie_client.breaker.wait_closed,
+            is_transient=is_transient,
+        )
+
+    async def start(self):
+        """Start background tasks (called from the app lifespan)."""
+        self._ensure_flusher()
+        self.poller.start()
+        await asyncio.to_thread(self._load_generation_times)
+        await self._backfill_cost_ledger()
+        await self._close_deleted_costs()
+        await self._resume_workflows()
+
+    async def close(self):
+        """Stop background tasks and flush pending writes."""
+        await self.poller.close()
+        # Interrupted workflows stay active in the work queue and resume on next start
+        for task in list(self._background_tasks):
+            task.cancel()
+        await asyncio.gather(*self._background_tasks, return_exceptions=True)
+        if self._flush_task:
+            self._flush_task.cancel()
+            try:
+                await self._flush_task
+            except asyncio.CancelledError:
+                pass
+            self._flush_task = None
+        await self.flush()
+        self.store.close()
+        self.work_queue.close()
+        self.cost_ledger.close()
+        self.media_pool.shutdown(wait=False, cancel_futures=True)
+
+    def _ensure_flusher(self):
+        """Start the write-behind flush loop if it isn't running yet."""
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_event = asyncio.Event()
+            self._flush_lock = asyncio.Lock()
+            self._flush_task = asyncio.create_task(self._flush_loop())
+
+    def _mark_dirty(self, job_id: str, deleted: bool = False):
+        """Queue a job for the next flush."""
+        if deleted:
+            self._dirty.discard(job_id)
+            self._deleted.add(job_id)
+        else:
+            self._deleted.discard(job_id)
+            self._dirty.add(job_id)
+
+        self._version += 1
+        self._ensure_flusher()
+        if len(self._dirty) + len(self._deleted) >= self.flush_batch_size:
+            self._flush_event.set()
+
+    async def _flush_loop(self):
+        """Flush dirty jobs every flush_interval, or sooner when the batch fills up."""
+        while True:
+            try:
+                await asyncio.wait_for(self._flush_event.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._flush_event.clear()
+            try:
+                await self.flush()
+            except Exception as e:
+                print(f"Error flushing jobs: {e}")
+
+    async def flush(self):
+        """
+        Write all pending job changes to the store in one batch. Returns once
+        every change made before the call has been written, including changes
+        an already running flush picked up.
+        """
+        # Take the lock before checking for work: an empty dirty set may only
+        # mean the flush loop has the changes in its in-progress batch
+        async with self._flush_lock or asyncio.Lock():
+            if not self._dirty and not self._deleted and not self._cost_entries:
+                return
+
+            dirty, self._dirty = self._dirty, set()
+            deleted, self._deleted = self._deleted, set()
+            cost_entries, self._cost_entries = self._cost_entries, []
+            upserts = [dict(self._jobs[job_id]) for job_id in dirty if job_id in self._jobs]
+
+            try:
+                if upserts or deleted:
+                    await asyncio.to_thread(self.store.apply_batch, upserts, list(deleted))
+            except Exception:
+                # Put the batch back so the next flush retries it
+                self._dirty |= {job_id for job_id in dirty if job_id not in self._deleted}
+                self._deleted |= {job_id for job_id in deleted if job_id not in self._dirty}
+                self._cost_entries[:0] = cost_entries
+                raise
+
+            try:
+                await asyncio.to_thread(self.cost_ledger.append_many, cost_entries)
+            except Exception:
+                self._cost_entries[:0] = cost_entries
+                raise
+
+    def _load_generation_times(self):
+        """Seed the poll schedule with generation times saved in completed jobs' metadata.json."""
+        for job_id, job_data in list(self._jobs.items()):
+            if job_data.get("status") != "completed":
+                continue
+            try:
+                with open(f"{self.base_path}/videos/{job_id}/metadata.json", 'r') as f:
+                    metadata = json.load(f)
+            except (OSError, ValueError):
+                continue
+            seconds = metadata.get("generateSeconds") or generation_seconds(metadata)
+            if seconds:
+                duration = job_data.get("videoParams", {}).get("duration", 5)
+                self.poll_schedule.record(job_data.get("model", "sora2"), duration, seconds)
 
     def _calculate_cost(self, model: str, duration: int) -> float:
         """Calculate estimated cost for a generation based on model and duration."""
@@ -59,7 +284,8 @@ class JobManager:
         prompt: str,
         image_source: str,
         options: Dict,
-        video_params: Dict
+        video_params: Dict,
+        batch_id: Optional[str] = None
     ) -> JobResponse:
         """Create a new job."""
         now = datetime.utcnow().isoformat()
@@ -79,21 +305,60 @@ class JobManager:
             options=options,
             videoParams=video_params,
             cost=estimated_cost,
+            batchId=batch_id,
             createdAt=now,
             updatedAt=now,
         )
 
-        # Save to storage
-        jobs = await self._load_jobs()
-        jobs[job_id] = job.model_dump()
-        await self._save_jobs(jobs)
+        self._jobs[job_id] = job.model_dump()
+        self._record_cost(job_id, None)
+        if batch_id:
+            self._batches.setdefault(batch_id, set()).add(job_id)
+        self._mark_dirty(job_id)
+        self.events.publish("created", self._jobs[job_id])
 
         return job
 
+    async def create_batch(self, specs: List[Dict]) -> Tuple[str, List[JobResponse]]:
+        """
+        Create one job per spec (create_job keyword arguments) under a new
+        batch ID, and write them all to the store in a single transaction.
+        """
+        batch_id = str(uuid.uuid4())
+        jobs = [await self.create_job(**spec, batch_id=batch_id) for spec in specs]
+        await self.flush()
+        return batch_id, jobs
+
+    async def get_batch(self, batch_id: str) -> Optional[Dict]:
+        """Aggregate progress of a batch, or None if no job belongs to it."""
+        job_ids = self._batches.get(batch_id)
+        if not job_ids:
+            return None
+
+        counts: Dict[str, int] = {}
+        cost = 0.0
+        for job_id in job_ids:
+            job_data = self._jobs[job_id]
+            counts[job_data["status"]] = counts.get(job_data["status"], 0) + 1
+            cost += job_data.get("cost") or 0.0
+
+        total = len(job_ids)
+        finished = counts.get("completed", 0) + counts.get("failed", 0)
+        return {
+            "batchId": batch_id,
+            "total": total,
+            "completed": counts.get("completed", 0),
+            "failed": counts.get("failed", 0),
+            "inProgress": total - finished,
+            "statusCounts": counts,
+            "progress": finished / total,
+            "estimatedCost": round(cost, 2),
+            "jobIds": sorted(job_ids, key=lambda job_id: self._jobs[job_id]["createdAt"]),
+        }
+
     async def get_job(self, job_id: str) -> Optional[JobResponse]:
         """Get a job by ID."""
-        jobs = await self._load_jobs()
-        job_data = jobs.get(job_id)
+        job_data = self._jobs.get(job_id)
 
         if not job_data:
             return None
@@ -102,194 +367,622 @@ class JobManager:
 
     async def get_all_jobs(self) -> List[JobResponse]:
         """Get all jobs, sorted by most recent activity first."""
-        jobs = await self._load_jobs()
-        job_list = [JobResponse(**job_data) for job_data in jobs.values()]
+        return [JobResponse(**job_data) for job_data in self._sorted_jobs()]
+
+    @property
+    def version(self) -> str:
+        """Changes whenever any job changes; unique across restarts."""
+        return f"{self._epoch}-{self._version}"
+
+    @staticmethod
+    def _sort_key(job_data: Dict) -> Tuple[str, str]:
+        # updatedAt (most recent activity first), fallback to createdAt; id breaks ties
+        return (job_data.get("updatedAt") or job_data.get("createdAt") or "", job_data["id"])
+
+    def _sorted_jobs(self) -> List[Dict]:
+        """All jobs, most recent activity first. Re-sorted only after a change."""
+        if self._sorted_version != self._version:
+            self._sorted_cache = sorted(self._jobs.values(), key=self._sort_key, reverse=True)
+            # Same order reversed (oldest first), so cursors can be located with bisect
+            self._sorted_keys = [self._sort_key(job_data) for job_data in reversed(self._sorted_cache)]
+            self._sorted_version = self._version
+        return self._sorted_cache
+
+    def query_jobs(
+        self,
+        status: Optional[str] = None,
+        model: Optional[str] = None,
+        since: Optional[str] = None,
+        cursor: Optional[str] = None,
+        limit: Optional[int] = None,
+    ) -> Tuple[List[Dict], Optional[str], List[str]]:
+        """
+        Filter and page through jobs, most recent activity first.
+
+        Args:
+            status: Only jobs with this status
+            model: Only jobs for this model
+            since: Only jobs updated after this updatedAt timestamp (delta mode)
+            cursor: Opaque cursor returned by a previous page
+            limit: Maximum number of jobs to return
 
-        # Sort by updatedAt (most recent activity first), fallback to createdAt
-        job_list.sort(key=lambda x: x.updatedAt or x.createdAt, reverse=True)
-        return job_list
+        Returns:
+            (jobs, next cursor or None, ids of jobs deleted after `since`)
+        """
+        after = decode_cursor(cursor) if cursor else None
+
+        jobs = self._sorted_jobs()
+        start = 0
+        if after is not None:
+            # Skip straight past every job at or before the cursor (newest first)
+            start = len(jobs) - bisect.bisect_left(self._sorted_keys, after)
+
+        page: List[Dict] = []
+        next_cursor = None
+        for index in range(start, len(jobs)):
+            job_data = jobs[index]
+            key = self._sort_key(job_data)
+            if since is not None and key[0] <= since:
+                # Sorted newest first, so nothing further down changed after `since`
+                break
+            if status is not None and job_data.get("status") != status:
+                continue
+            if model is not None and job_data.get("model") != model:
+                continue
+            if limit is not None and len(page) == limit:
+                next_cursor = encode_cursor(self._sort_key(page[-1]))
+                break
+            page.append(job_data)
+
+        deleted = []
+        if since is not None:
+            deleted = [job_id for job_id, deleted_at in self._tombstones.items() if deleted_at > since]
+        return page, next_cursor, deleted
+
+    def job_lock(self, job_id: str) -> asyncio.Lock:
+        """Per-job lock for multi-step sections that await between reading and writing a job."""
+        lock = self._job_locks.get(job_id)
+        if lock is None:
+            lock = asyncio.Lock()
+            self._job_locks[job_id] = lock
+        return lock
+
+    async def update_job(self, job_id: str, updates: Dict, expected_status: Optional[Iterable[str]] = None):
+        """
+        Update a job's data.
 
-    async def update_job(self, job_id: str, updates: Dict):
-        """Update a job's data."""
-        jobs = await self._load_jobs()
+        If expected_status is given, the update is only applied while the job is in
+        one of those statuses (compare-and-set), so a stale workflow can't overwrite
+        a transition made by another one. Returns True if the update was applied.
+        """
+        job_data = self._jobs.get(job_id)
 
-        if job_id not in jobs:
+        if job_data is None:
             return False
 
-        jobs[job_id].update(updates)
-        jobs[job_id]["updatedAt"] = datetime.utcnow().isoformat()
-        await self._save_jobs(jobs)
+        if expected_status is not None and job_data.get("status") not in expected_status:
+            return False
+
+        old_cost_status = cost_status(job_data)
+        job_data.update(updates)
+        self._record_cost(job_id, old_cost_status)
+        if updates.get("kieTaskId"):
+            self._task_index[updates["kieTaskId"]] = job_id
+        job_data["updatedAt"] = datetime.utcnow().isoformat()
+        self._mark_dirty(job_id)
+        self.events.publish("updated", {**updates, "id": job_id, "updatedAt": job_data["updatedAt"]})
         return True
 
+    def _record_cost(self, job_id: str, old_status: Optional[str], new_status: Optional[str] = None):
+        """Queue a ledger entry if the job moved to a different cost status."""
+        job_data = self._jobs[job_id]
+        new_status = new_status or cost_status(job_data)
+        if new_status == old_status:
+            return
+        self._cost_entries.append(CostEntry(
+            job_id=job_id,
+            model=job_data.get("model", "sora2"),
+            duration=job_data.get("videoParams", {}).get("duration", 5),
+            day=job_data["createdAt"][:10],
+            old_status=old_status,
+            new_status=new_status,
+            estimated=job_data.get("cost") or 0.0,
+        ))
+
+    async def _backfill_cost_ledger(self):
+        """Seed an empty ledger with the jobs that existed before it (first start only)."""
+        if not self._jobs or not await asyncio.to_thread(self.cost_ledger.is_empty):
+            return
+        for job_id in self._jobs:
+            self._record_cost(job_id, None)
+        await self.flush()
+
+    async def _close_deleted_costs(self):
+        """Close ledger entries of jobs that were deleted while in progress without being closed."""
+        for entry in await asyncio.to_thread(self.cost_ledger.in_progress_entries):
+            if entry.job_id not in self._jobs:
+                entry.old_status, entry.new_status = "in_progress", "deleted"
+                self._cost_entries.append(entry)
+        await self.flush()
+
     async def delete_job(self, job_id: str) -> bool:
         """Delete a job and its video files."""
-        jobs = await self._load_jobs()
-
-        if job_id not in jobs:
+        job_data = self._jobs.get(job_id)
+        if job_data is None:
             return False
+        # Finished jobs keep their cost status; unfinished ones would otherwise stay in progress forever
+        if cost_status(job_data) == "in_progress":
+            self._record_cost(job_id, "in_progress", "deleted")
+        del self._jobs[job_id]
+
+        batch = self._batches.get(job_data.get("batchId"))
+        if batch is not None:
+            batch.discard(job_id)
+            if not batch:
+                del self._batches[job_data["batchId"]]
+
+        if job_data.get("kieTaskId"):
+            self.poller.cancel(job_data["kieTaskId"])
+            self._task_index.pop(job_data["kieTaskId"], None)
+
+        self._mark_dirty(job_id, deleted=True)
+        await asyncio.to_thread(self.work_queue.remove, job_id)
+        self._tombstones[job_id] = datetime.utcnow().isoformat()
+        self.events.publish("deleted", {"id": job_id})
+        while len(self._tombstones) > MAX_TOMBSTONES:
+            self._tombstones.popitem(last=False)
 
         # Delete video files
         video_dir = f"{self.base_path}/videos/{job_id}"
         if os.path.exists(video_dir):
             import shutil
-            shutil.rmtree(video_dir)
+            await asyncio.to_thread(shutil.rmtree, video_dir)
 
-        # Remove from jobs
-        del jobs[job_id]
-        await self._save_jobs(jobs)
         return True
 
-    def _extract_first_frame(self, video_path: str, output_path: str) -> bool:
-        """Extract the first frame from a video and save as thumbnail."""
+    async def _render_media(self, job_id: str, video_path: str, video_dir: str) -> Dict:
+        """
+        Render thumbnails, hover preview and sprite sheet on the media worker pool.
+        Returns the job fields that point at the written files.
+        """
+        loop = asyncio.get_running_loop()
         try:
-            # Open video file
-            video = cv2.VideoCapture(video_path)
-
-            # Read first frame
-            success, frame = video.read()
-
-            if success:
-                # Save frame as JPEG
-                cv2.imwrite(output_path, frame)
-                video.release()
-                return True
-
-            video.release()
-            return False
-
+            outputs = await loop.run_in_executor(self.media_pool, render_media, video_path, video_dir)
         except Exception as e:
-            print(f"Error extracting first frame: {e}")
-            return False
+            print(f"Error rendering media: {e}")
+            outputs = {}
+
+        def url(filename: Optional[str]) -> Optional[str]:
+            return f"/videos/{job_id}/{filename}" if filename else None
+
+        thumbnails = {name: url(filename) for name, filename in outputs.get("thumbnails", {}).items()}
+        return {
+            "thumbnailUrl": thumbnails.get("large"),
+            "thumbnails": thumbnails or None,
+            "previewUrl": url(outputs.get("preview")),
+            "spriteUrl": url(outputs.get("sprite")),
+            "spriteIndexUrl": url(outputs.get("spriteIndex")),
+        }
+
+    @staticmethod
+    def _write_metadata(path: str, metadata: Dict):
+        with open(path, 'w') as f:
+            json.dump(metadata, f, indent=2)
 
     async def start_generation(self, job_id: str, image_path: Optional[str] = None):
         """Start the video generation process (runs in background)."""
+        checkpoint = {"imagePath": image_path}
+        await asyncio.to_thread(self.work_queue.enqueue, job_id, STAGES[0], checkpoint)
         # Run in background
-        asyncio.create_task(self._generation_workflow(job_id, image_path))
+        self._spawn(self._run_workflow(job_id, STAGES[0], checkpoint))
 
-    async def _generation_workflow(self, job_id: str, image_path: Optional[str] = None):
+    async def start_generations(self, items: List[Tuple[str, Optional[str]]]):
+        """Start many (job_id, image_path) generations, recording their workflows in one transaction."""
+        workflows = [(job_id, STAGES[0], {"imagePath": image_path}) for job_id, image_path in items]
+        await asyncio.to_thread(self.work_queue.enqueue_many, workflows)
+        for job_id, stage, checkpoint in workflows:
+            self._spawn(self._run_workflow(job_id, stage, checkpoint))
+
+    async def _run_workflow(self, job_id: str, stage: str, checkpoint: Dict):
         """
-        Complete workflow for generating a video:
-        1. Upload image (if provided)
-        2. Submit generation request
-        3. Poll for completion
-        4. Download video
+        Run a generation workflow from `stage` onwards:
+        1. upload - upload the source image (if provided)
+        2. submit - submit the generation request
+        3. poll - register with the status poller; the workflow pauses here and
+           _finalize_job resumes it at the download stage once the video is ready
+        4. download - download the video
+        5. faststart - move the MP4 index to the front so playback starts early
+        6. media - render thumbnails/previews and mark the job completed
+
+        Each stage is idempotent, and the checkpoint is saved to the work queue
+        before the next stage starts, so an interrupted workflow resumes from its
+        last stage on restart.
         """
+        handlers = {
+            "upload": self._stage_upload,
+            "submit": self._stage_submit,
+            "poll": self._stage_poll,
+            "download": self._stage_download,
+            "faststart": self._stage_faststart,
+            "media": self._stage_media,
+        }
+
         try:
-            image_url = None
+            while True:
+                limit = self._stage_limits.get(stage)
+                if limit is None:
+                    updates = await handlers[stage](job_id, checkpoint)
+                else:
+                    async with limit:
+                        updates = await handlers[stage](job_id, checkpoint)
 
-            # Step 1: Upload image
-            if image_path and os.path.exists(image_path):
-                await self.update_job(job_id, {"status": "uploading"})
-                image_url = await self.kie_client.upload_file(image_path)
+                if updates is None:
+                    # Paused (waiting on Kie.ai) or the job left the workflow
+                    return
+                checkpoint.update(updates)
 
-            # Step 2: Submit generation request
-            await self.update_job(job_id, {"status": "generating"})
+                index = STAGES.index(stage)
+                if index + 1 == len(STAGES):
+                    await asyncio.to_thread(self.work_queue.finish, job_id, "done")
+                    return
+                stage = STAGES[index + 1]
+                await asyncio.to_thread(self.work_queue.advance, job_id, stage, checkpoint)
 
-            job = await self.get_job(job_id)
-            task_id = await self.kie_client.generate_video(
-                prompt=job.prompt,
-                image_url=image_url,
-                duration=job.videoParams.get("duration", 5),
-                quality=job.videoParams.get("quality", "720p"),
-                aspect_ratio=job.videoParams.get("aspectRatio", "16:9"),
-                model=job.model
-            )
+        except Exception as e:
+            error = f"Download error: {str(e)}" if stage in ("download", "faststart", "media") else str(e)
+            await self._fail_job(job_id, error, expected_status=IN_PROGRESS_STATUSES)
+
+    async def _stage_upload(self, job_id: str, checkpoint: Dict) -> Optional[Dict]:
+        image_path = checkpoint.get("imagePath")
+        if checkpoint.get("imageUrl") or not image_path or not os.path.exists(image_path):
+            return {}
 
-            await self.update_job(job_id, {"kieTaskId": task_id})
+        if not await self.update_job(job_id, {"status": "uploading"}, expected_status=ACTIVE_STATUSES):
+            return None
+        if self.image_prep:
+            job = await self.get_job(job_id)
+            if not job:
+                return None
+            try:
+                image_path = await self.image_prep.prepare(
+                    image_path,
+                    aspect_ratio=job.videoParams.get("aspectRatio", "16:9"),
+                    quality=job.videoParams.get("quality", "720p"),
+                )
+            except Exception as e:
+                # The original is still a valid reference image
+                print(f"Error normalizing image for job {job_id}: {e}")
+        attempts = 0
+        while True:
+            # Uploads fail fast while Kie.ai's circuit is open; wait it out here
+            await self.kie_client.breaker.wait_closed()
+            try:
+                image_url = await self.upload_cache.get_or_upload(
+                    image_path, "fight-videos", self.kie_client.upload_file
+                )
+                return {"imageUrl": image_url}
+            except CircuitOpenError as e:
+                attempts += 1
+                if attempts > self.submit_max_retries:
+                    raise
+                await asyncio.sleep(e.retry_after)
+
+    async def _stage_submit(self, job_id: str, checkpoint: Dict) -> Optional[Dict]:
+        job = await self.get_job(job_id)
+        if not job or job.status not in ACTIVE_STATUSES:
+            return None
 
-            # Step 3: Poll for completion
-            await self._poll_until_complete(job_id, task_id)
+        if job.kieTaskId:
+            # Submitted before a restart; never pay for the same generation twice
+            return {"submittedAt": checkpoint.get("submittedAt") or job.updatedAt}
 
-        except Exception as e:
+        async def mark_queued(delay: float):
             await self.update_job(job_id, {
-                "status": "failed",
-                "error": str(e)
-            })
+                "status": "queued",
+                "estimatedStartAt": self._estimated_start_at(delay)
+            }, expected_status=ACTIVE_STATUSES)
+
+        rate_limited = 0
+        while True:
+            # Retries after a rate limit go back to the head of the queue
+            async with self.submit_scheduler.slot(job_id, job.model, front=rate_limited > 0, on_queued=mark_queued):
+                if not await self.update_job(
+                    job_id, {"status": "generating", "estimatedStartAt": None}, expected_status=ACTIVE_STATUSES
+                ):
+                    return None
+
+                try:
+                    task_id = await self.kie_client.generate_video(
+                        prompt=job.prompt,
+                        image_url=checkpoint.get("imageUrl"),
+                        duration=job.videoParams.get("duration", 5),
+                        quality=job.videoParams.get("quality", "720p"),
+                        aspect_ratio=job.videoParams.get("aspectRatio", "16:9"),
+                        model=job.model
+                    )
+                    break
+                except (KieRateLimitError, CircuitOpenError) as e:
+                    rate_limited += 1
+                    if rate_limited > self.submit_max_retries:
+                        raise
+                    # Hold back every submission for this model, then requeue this one
+                    self.submit_scheduler.throttle(
+                        job.model, e.retry_after or self.submit_retry_delay * 2 ** (rate_limited - 1)
+                    )
+
+        await self.update_job(job_id, {"kieTaskId": task_id})
+        # Persist the task id right away so a restart can't submit the job again
+        await self.flush()
+        return {"submittedAt": datetime.utcnow().isoformat()}
+
+    @staticmethod
+    def _submit_limits(model: str, default: Tuple[int, float, int]) -> Tuple[int, float, int]:
+        """(concurrency, rate per second, burst) for a model, e.g. KIE_SUBMIT_CONCURRENCY_SORA2."""
+        suffix = f"_{model.upper()}" if model else ""
+        return (
+            int(os.getenv(f"KIE_SUBMIT_CONCURRENCY{suffix}", str(default[0]))),
+            float(os.getenv(f"KIE_SUBMIT_RATE{suffix}", str(default[1]))),
+            int(os.getenv(f"KIE_SUBMIT_BURST{suffix}", str(default[2]))),
+        )
 
-    async def _poll_until_complete(self, job_id: str, task_id: str):
-        """Poll Kie.ai until the video is ready."""
-        max_attempts = 20  # 10 minutes max (30s * 20)
-        attempt = 0
+    @staticmethod
+    def _estimated_start_at(delay: float) -> str:
+        return (datetime.utcnow() + timedelta(seconds=delay)).isoformat()
+
+    def _on_submit_queue_change(self, model: str):
+        self._spawn(self._refresh_queue_estimates(model))
+
+    async def _refresh_queue_estimates(self, model: str):
+        """Update estimatedStartAt on queued jobs whose estimate moved noticeably."""
+        for job_id, delay in self.submit_scheduler.estimated_delays(model):
+            job_data = self._jobs.get(job_id)
+            if not job_data or job_data.get("status") != "queued":
+                continue
+            estimate = self._estimated_start_at(delay)
+            previous = job_data.get("estimatedStartAt")
+            if previous and abs(
+                (datetime.fromisoformat(estimate) - datetime.fromisoformat(previous)).total_seconds()
+            ) < 5:
+                continue
+            await self.update_job(job_id, {"estimatedStartAt": estimate}, expected_status=("queued",))
+
+    async def _stage_poll(self, job_id: str, checkpoint: Dict) -> Optional[Dict]:
+        job = await self.get_job(job_id)
+        if not job or job.status not in IN_PROGRESS_STATUSES or not job.kieTaskId:
+            return None
 
-        while attempt < max_attempts:
-            try:
-                job = await self.get_job(job_id)
-                status_data = await self.kie_client.get_task_status(task_id, model=job.model)
-                state = status_data.get("state")
-
-                if state == "success":
-                    # Download video
-                    await self.update_job(job_id, {"status": "downloading"})
-
-                    # Parse video URL based on model
-                    job = await self.get_job(job_id)
-                    if job.model == "sora2":
-                        # Sora 2 response format
-                        result_json_str = status_data.get("resultJson", "{}")
-                        result_json = json.loads(result_json_str)
-                        result_urls = result_json.get("resultUrls", [])
-                        if not result_urls:
-                            raise Exception("No video URL in Sora 2 response")
-                        video_url = result_urls[0]
-                        thumbnail_url = None  # Sora 2 doesn't provide thumbnails
-                    else:
-                        # Runway response format
-                        video_url = status_data["videoInfo"]["videoUrl"]
-                        thumbnail_url = status_data["videoInfo"]["imageUrl"]
-
-                    # Save to local storage
-                    video_dir = f"{self.base_path}/videos/{job_id}"
-                    os.makedirs(video_dir, exist_ok=True)
-
-                    video_path = f"{video_dir}/video.mp4"
-                    await self.kie_client.download_video(video_url, video_path)
-
-                    # Extract first frame as thumbnail
-                    thumbnail_path = f"{video_dir}/thumbnail.jpg"
-                    thumbnail_success = self._extract_first_frame(video_path, thumbnail_path)
-                    local_thumbnail_url = f"/videos/{job_id}/thumbnail.jpg" if thumbnail_success else None
-
-                    # Save metadata
-                    metadata = {
-                        "kieVideoUrl": video_url,
-                        "kieThumbnailUrl": thumbnail_url,
-                        "generateTime": status_data.get("generateTime"),
-                    }
-                    with open(f"{video_dir}/metadata.json", 'w') as f:
-                        json.dump(metadata, f, indent=2)
-
-                    # Update job as completed
-                    await self.update_job(job_id, {
-                        "status": "completed",
-                        "videoUrl": f"/videos/{job_id}/video.mp4",
-                        "thumbnailUrl": local_thumbnail_url,
-                        "completedAt": datetime.utcnow().isoformat()
-                    })
-                    return
+        if job.status == "downloading":
+            # Interrupted between claiming the download and checkpointing it; ask Kie.ai again
+            await self.update_job(job_id, {"status": "generating"}, expected_status=("downloading",))
 
-                elif state == "fail":
-                    await self.update_job(job_id, {
-                        "status": "failed",
-                        "error": "Video generation failed on Kie.ai"
-                    })
-                    return
+        # The poller times the task out from registration, so a job resumed after
+        # downtime still gets a full poll budget; elapsed only shapes the schedule
+        submitted_at = checkpoint.get("submittedAt") or job.updatedAt
+        elapsed = (datetime.utcnow() - datetime.fromisoformat(submitted_at)).total_seconds()
+        self.poller.register(job_id, job.kieTaskId, job.model, job.videoParams.get("duration", 5), elapsed=elapsed)
+        return None
 
-                # Still processing, wait and retry
-                await asyncio.sleep(30)
-                attempt += 1
+    async def _stage_download(self, job_id: str, checkpoint: Dict) -> Optional[Dict]:
+        if not await self.update_job(job_id, {"status": "downloading"}, expected_status=IN_PROGRESS_STATUSES):
+            return None
 
-            except Exception as e:
-                await self.update_job(job_id, {
-                    "status": "failed",
-                    "error": f"Polling error: {str(e)}"
-                })
-                return
+        # Save to local storage
+        video_dir = f"{self.base_path}/videos/{job_id}"
+        os.makedirs(video_dir, exist_ok=True)
+        video_path = f"{video_dir}/video.mp4"
+
+        if checkpoint.get("videoSha256") and os.path.exists(video_path):
+            return {}
+
+        video_sha256 = await self.kie_client.download_video(checkpoint["videoUrl"], video_path)
+        return {"videoSha256": video_sha256}
 
-        # Timeout
+    async def _stage_faststart(self, job_id: str, checkpoint: Dict) -> Optional[Dict]:
+        job = await self.get_job(job_id)
+        if not job or job.status != "downloading":
+            return None
+        if not self.video_faststart:
+            return {}
+
+        # Remuxing changes the bytes, so the recorded digest (and media ETag) must follow
+        video_sha256 = await asyncio.to_thread(faststart, f"{self.base_path}/videos/{job_id}/video.mp4")
+        return {"videoSha256": video_sha256} if video_sha256 else {}
+
+    async def _stage_media(self, job_id: str, checkpoint: Dict) -> Optional[Dict]:
+        job = await self.get_job(job_id)
+        if not job or job.status != "downloading":
+            return None
+
+        video_dir = f"{self.base_path}/videos/{job_id}"
+        video_path = f"{video_dir}/video.mp4"
+
+        # Thumbnails, hover preview and sprite sheet from a single decode pass
+        media = await self._render_media(job_id, video_path, video_dir)
+
+        # Save metadata
+        metadata = {
+            "kieVideoUrl": checkpoint.get("videoUrl"),
+            "kieThumbnailUrl": checkpoint.get("kieThumbnailUrl"),
+            "generateTime": checkpoint.get("generateTime"),
+            "generateSeconds": checkpoint.get("generateSeconds"),
+            "videoSha256": checkpoint.get("videoSha256"),
+        }
+        await asyncio.to_thread(self._write_metadata, f"{video_dir}/metadata.json", metadata)
+
+        # Update job as completed
         await self.update_job(job_id, {
-            "status": "failed",
-            "error": "Generation timeout (exceeded 10 minutes)"
-        })
+            "status": "completed",
+            "videoUrl": f"/videos/{job_id}/video.mp4",
+            **media,
+            "completedAt": datetime.utcnow().isoformat()
+        }, expected_status=("downloading",))
+        return {}
+
+    async def _resume_workflows(self):
+        """Resume every incomplete workflow from its last checkpoint (called on startup)."""
+        resumed = set()
+        for job_id, stage, checkpoint in await asyncio.to_thread(self.work_queue.incomplete):
+            job_data = self._jobs.get(job_id)
+            if job_data is None or job_data.get("status") not in IN_PROGRESS_STATUSES:
+                state = "done" if job_data and job_data.get("status") == "completed" else "failed"
+                await asyncio.to_thread(self.work_queue.finish, job_id, state)
+                continue
+            resumed.add(job_id)
+            self._spawn(self._run_workflow(job_id, stage, checkpoint))
+
+        # Jobs submitted before the work queue existed: pick them up at the poll stage
+        for job_id, job_data in list(self._jobs.items()):
+            if job_id in resumed or job_data.get("status") not in ACTIVE_STATUSES or not job_data.get("kieTaskId"):
+                continue
+            checkpoint = {"submittedAt": job_data.get("updatedAt")}
+            await asyncio.to_thread(self.work_queue.enqueue, job_id, "poll", checkpoint)
+            self._spawn(self._run_workflow(job_id, "poll", checkpoint))
+
+    async def _fail_job(
+        self,
+        job_id: str,
+        error: str,
+        expected_status: Iterable[str] = ACTIVE_STATUSES,
+        reason: Optional[str] = None
+    ) -> bool:
+        """
+        Mark a job and its workflow as failed. `reason` is a machine-readable
+        failureReason (e.g. "timeout") for callers that classify failures;
+        `error` is only meant for people.
+        """
+        updates = {"status": "failed", "error": error, "failureReason": reason}
+        if not await self.update_job(job_id, updates, expected_status=expected_status):
+            return False
+        await asyncio.to_thread(self.work_queue.finish, job_id, "failed")
+        return True
+
+    async def _on_poll_status(self, job_id: str, status_data: Dict) -> bool:
+        """Poller callback. Returns True once the task has finished on Kie.ai."""
+        job = await self.get_job(job_id)
+        if not job or job.status not in ACTIVE_STATUSES:
+            # Deleted, or finished by another path (e.g. manual recovery)
+            return True
+
+        state = status_data.get("state")
+        if state == "success":
+            # Hand off to the download stage so the poller's workers stay free
+            self._spawn(self._finalize_in_background(job_id, status_data))
+            return True
+
+        return await self._apply_task_status(job_id, status_data) is not None
+
+    async def _on_poll_timeout(self, job_id: str):
+        await self._fail_job(
+            job_id, f"Generation timeout (exceeded {self.poller.timeout / 60:g} minutes)", reason="timeout"
+        )
+
+    async def _on_poll_error(self, job_id: str, error: Exception):
+        await self._fail_job(job_id, f"Polling error: {str(error)}", expected_status=IN_PROGRESS_STATUSES)
+
+    async def handle_task_callback(self, task_id: str) -> bool:
+        """
+        Handle a completion callback from Kie.ai by checking the task right away.
+
+        The callback body is not trusted: the task's state and result URLs always
+        come from Kie.ai's own record, fetched through the poller.
+        Returns False if no job has this task id.
+        """
+        job_id = self._task_index.get(task_id)
+        job = await self.get_job(job_id) if job_id else None
+        if not job:
+            return False
+
+        if job.status not in ACTIVE_STATUSES:
+            return True
+
+        if not self.poller.check_now(task_id):
+            # Not being polled (e.g. after a restart): start polling and check right away
+            self.poller.register(job_id, task_id, job.model, job.videoParams.get("duration", 5))
+            self.poller.check_now(task_id)
+
+        return True
+
+    def _spawn(self, coro):
+        """Run a coroutine in the background, keeping a reference until it finishes."""
+        task = asyncio.create_task(coro)
+        self._background_tasks.add(task)
+        task.add_done_callback(self._background_tasks.discard)
+        return task
+
+    async def _apply_task_status(self, job_id: str, status_data: Dict) -> Optional[str]:
+        """
+        Apply a Kie.ai task status to a job.
+        Returns the job's resulting status once the task has finished, or None while it is still processing.
+        """
+        state = status_data.get("state")
+
+        if state == "success":
+            return await self._finalize_job(job_id, status_data)
+
+        elif state == "fail":
+            fail_msg = status_data.get("failMsg") or "Video generation failed on Kie.ai"
+            await self._fail_job(job_id, f"Generation failed: {fail_msg}")
+            job = await self.get_job(job_id)
+            return job.status if job else "deleted"
+
+        return None
+
+    @staticmethod
+    def _result_urls(model: str, status_data: Dict) -> Tuple[Optional[str], Optional[str]]:
+        """(video URL, thumbnail URL) from a successful task status. Raises ValueError if malformed."""
+        try:
+            if model == "sora2":
+                # Sora 2 response format; Sora 2 doesn't provide thumbnails
+                result_urls = json.loads(status_data.get("resultJson") or "{}").get("resultUrls") or []
+                return (result_urls[0] if result_urls else None), None
+            # Runway response format
+            video_info = status_data.get("videoInfo") or {}
+            return video_info.get("videoUrl"), video_info.get("imageUrl")
+        except (TypeError, AttributeError, ValueError) as e:
+            raise ValueError(f"Malformed result from Kie.ai: {e}")
+
+    async def _finalize_in_background(self, job_id: str, status_data: Dict):
+        """_finalize_job for spawned tasks: an unexpected error fails the job instead of stranding it."""
+        try:
+            await self._finalize_job(job_id, status_data)
+        except Exception as e:
+            await self._fail_job(job_id, f"Finalize error: {str(e)}", expected_status=IN_PROGRESS_STATUSES)
+
+    async def _finalize_job(self, job_id: str, status_data: Dict) -> str:
+        """Resume a job's workflow at the download stage once Kie.ai reports success."""
+        # Only one finalizer per job; a concurrent poller/recovery waits here and then sees the result
+        async with self.job_lock(job_id):
+            job = await self.get_job(job_id)
+            if not job or job.status not in ACTIVE_STATUSES:
+                return job.status if job else "deleted"
+
+            # Parse before leaving the active statuses, so a bad payload fails the job cleanly
+            try:
+                video_url, thumbnail_url = self._result_urls(job.model, status_data)
+            except ValueError as e:
+                await self._fail_job(job_id, str(e))
+                return "failed"
+            if not video_url:
+                await self._fail_job(job_id, "No video URL in response")
+                return "failed"
+
+            if not await self.update_job(job_id, {"status": "downloading"}, expected_status=ACTIVE_STATUSES):
+                job = await self.get_job(job_id)
+                return job.status if job else "deleted"
+
+            record = await asyncio.to_thread(self.work_queue.get, job_id)
+            checkpoint = record[2] if record else {}
+            checkpoint.update({
+                "videoUrl": video_url,
+                "kieThumbnailUrl": thumbnail_url,
+                "generateTime": status_data.get("generateTime"),
+                "generateSeconds": generation_seconds(status_data),
+            })
+            await asyncio.to_thread(self.work_queue.enqueue, job_id, "download", checkpoint)
+            await self._run_workflow(job_id, "download", checkpoint)
+
+            job = await self.get_job(job_id)
+            return job.status if job else "deleted"
 
     async def update_job_status(self, job_id: str):
         """Manually update a job's status from Kie.ai."""
@@ -316,64 +1009,78 @@ class JobManager:
 
         try:
             status_data = await self.kie_client.get_task_status(job.kieTaskId, model=job.model)
-            state = status_data.get("state")
-
-            if state == "success":
-                # Download video and complete the job
-                await self.update_job(job_id, {"status": "downloading"})
-
-                # Parse video URL based on model
-                if job.model == "sora2":
-                    result_json_str = status_data.get("resultJson", "{}")
-                    result_json = json.loads(result_json_str)
-                    result_urls = result_json.get("resultUrls", [])
-                    if not result_urls:
-                        await self.update_job(job_id, {
-                            "status": "failed",
-                            "error": "No video URL in response"
-                        })
-                        return {"success": False, "message": "No video URL in response"}
-                    video_url = result_urls[0]
-                else:
-                    video_url = status_data["videoInfo"]["videoUrl"]
-
-                # Save to local storage
-                video_dir = f"{self.base_path}/videos/{job_id}"
-                os.makedirs(video_dir, exist_ok=True)
-
-                video_path = f"{video_dir}/video.mp4"
-                await self.kie_client.download_video(video_url, video_path)
-
-                # Extract first frame as thumbnail
-                thumbnail_path = f"{video_dir}/thumbnail.jpg"
-                thumbnail_success = self._extract_first_frame(video_path, thumbnail_path)
-                local_thumbnail_url = f"/videos/{job_id}/thumbnail.jpg" if thumbnail_success else None
-
-                # Update job as completed
-                await self.update_job(job_id, {
-                    "status": "completed",
-                    "videoUrl": f"/videos/{job_id}/video.mp4",
-                    "thumbnailUrl": local_thumbnail_url,
-                    "completedAt": datetime.utcnow().isoformat()
-                })
-
-                return {"success": True, "message": "Job recovered and completed", "status": "completed"}
-
-            elif state == "fail":
-                fail_msg = status_data.get("failMsg", "Unknown error")
-                await self.update_job(job_id, {
-                    "status": "failed",
-                    "error": f"Generation failed: {fail_msg}"
-                })
-                return {"success": False, "message": f"Job failed: {fail_msg}", "status": "failed"}
+            return await self._recovery_result(job_id, status_data)
+        except Exception as e:
+            return {"success": False, "message": f"Error checking status: {str(e)}"}
 
-            else:
-                # Still processing
-                return {
-                    "success": True,
-                    "message": f"Job is still processing (state: {state})",
-                    "status": "generating"
+    async def check_and_recover_jobs(self, job_ids: Optional[List[str]] = None) -> Dict[str, dict]:
+        """
+        Check many stuck jobs on Kie.ai in one pass; all active jobs with a task
+        ID if `job_ids` is None. Finished videos are downloaded in the background.
+        Returns a result per job ID, shaped like check_and_recover_job's.
+        """
+        if job_ids is None:
+            job_ids = [
+                job_id for job_id, job_data in self._jobs.items()
+                if job_data.get("status") in ACTIVE_STATUSES and job_data.get("kieTaskId")
+            ]
+
+        results: Dict[str, dict] = {}
+        tasks_by_model: Dict[str, Dict[str, str]] = {}  # model -> kieTaskId -> job_id
+        for job_id in job_ids:
+            job_data = self._jobs.get(job_id)
+            if not job_data or not job_data.get("kieTaskId"):
+                results[job_id] = {"success": False, "message": "Job not found or has no task ID"}
+            elif job_data.get("status") not in ACTIVE_STATUSES:
+                results[job_id] = {
+                    "success": False,
+                    "message": "Job is not in a recoverable state",
+                    "status": job_data.get("status")
                 }
+            else:
+                model = job_data.get("model", "sora2")
+                tasks_by_model.setdefault(model, {})[job_data["kieTaskId"]] = job_id
+
+        async def check_model(model: str, tasks: Dict[str, str]):
+            statuses = await self.kie_client.get_task_statuses(list(tasks), model)
+            for task_id, status_data in statuses.items():
+                job_id = tasks[task_id]
+                if isinstance(status_data, Exception):
+                    results[job_id] = {"success": False, "message": f"Error checking status: {str(status_data)}"}
+                else:
+                    results[job_id] = await self._recovery_result(job_id, status_data, wait=False)
 
-        except Exception as e:
-            return {"success": False, "message": f"Error checking status: {str(e)}"}
+        await asyncio.gather(*(check_model(model, tasks) for model, tasks in tasks_by_model.items()))
+        return results
+
+    async def _recovery_result(self, job_id: str, status_data: Dict, wait: bool = True) -> dict:
+        """Apply checked status data to a job and describe the outcome."""
+        state = status_data.get("state")
+
+        if state == "success" and not wait:
+            job = await self.get_job(job_id)
+            if job and job.kieTaskId:
+                self.poller.cancel(job.kieTaskId)
+            self._spawn(self._finalize_in_background(job_id, status_data))
+            return {"success": True, "message": "Job completed on Kie.ai, downloading", "status": "downloading"}
+
+        status = await self._apply_task_status(job_id, status_data)
+
+        if status == "completed":
+            return {"success": True, "message": "Job recovered and completed", "status": "completed"}
+
+        elif status is not None:
+            job = await self.get_job(job_id)
+            message = job.error if job and job.error else f"Job is {status}"
+            return {"success": False, "message": message, "status": status}
+
+        else:
+            # Still processing
+            return {
+                "success": True,
+                "message": f"Job is still processing (state: {state})",
+                "status": "generating"
+            }
+
+# Shared instance so every router works against the same in-memory job table
+job_manager = JobManager()
@@ -0,0 +1,162 @@
+import abc
+import json
+import os
+from typing import Dict, Iterable
+
+from app.services.sqlite_db import SQLiteDatabase
+
+
+class JobStore(abc.ABC):
+    """
+    Storage backend for job records (plain dicts keyed by job id).
+
+    JobManager keeps the authoritative table in memory, so a store only has to
+    load everything once at startup and apply write-behind batches.
+    """
+
+    @abc.abstractmethod
+    def load_all(self) -> Dict[str, Dict]:
+        """Return every stored job keyed by id."""
+
+    @abc.abstractmethod
+    def apply_batch(self, upserts: Iterable[Dict], deletes: Iterable[str]) -> None:
+        """Write a batch of upserted and deleted jobs in one go."""
+
+    @abc.abstractmethod
+    def count(self) -> int:
+        """Number of stored jobs."""
+
+    @abc.abstractmethod
+    def close(self) -> None:
+        """Release the backend's resources."""
+
+
+class JsonJobStore(JobStore):
+    """Legacy store that keeps every job in a single jobs.json file."""
+
+    def __init__(self, path: str):
+        self.path = path
+        if not os.path.exists(self.path):
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            self._write({})
+
+    def _read(self) -> Dict:
+        try:
+            with open(self.path, 'r') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _write(self, jobs: Dict):
+        # Write to a temp file and swap it in so a crash never leaves a truncated file
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(jobs, f, indent=2)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.path)
+
+    def load_all(self) -> Dict[str, Dict]:
+        return self._read()
+
+    def apply_batch(self, upserts: Iterable[Dict], deletes: Iterable[str]) -> None:
+        data = self._read()
+        for job in upserts:
+            data[job["id"]] = job
+        for job_id in deletes:
+            data.pop(job_id, None)
+        self._write(data)
+
+    def count(self) -> int:
+        return len(self._read())
+
+    def close(self) -> None:
+        pass
+
+
+class SQLiteJobStore(SQLiteDatabase, JobStore):
+    """
+    SQLite-backed store (WAL mode). Each job is one row, so a status update
+    touches a single record instead of rewriting every job.
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS jobs (
+            id TEXT PRIMARY KEY,
+            status TEXT,
+            model TEXT,
+            created_at TEXT,
+            updated_at TEXT,
+            data TEXT NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs(status);
+        CREATE INDEX IF NOT EXISTS idx_jobs_updated_at ON jobs(updated_at);
+    """
+
+    @staticmethod
+    def _row(job: Dict) -> tuple:
+        return (
+            job["id"],
+            job.get("status"),
+            job.get("model"),
+            job.get("createdAt"),
+            job.get("updatedAt") or job.get("createdAt"),
+            json.dumps(job),
+        )
+
+    def load_all(self) -> Dict[str, Dict]:
+        with self._lock:
+            rows = self._conn.execute("SELECT data FROM jobs").fetchall()
+        jobs = [json.loads(row[0]) for row in rows]
+        return {job["id"]: job for job in jobs}
+
+    def apply_batch(self, upserts: Iterable[Dict], deletes: Iterable[str]) -> None:
+        rows = [self._row(job) for job in upserts]
+        deletes = [(job_id,) for job_id in deletes]
+        with self._lock:
+            with self._transaction():
+                if rows:
+                    self._conn.executemany(
+                        "INSERT OR REPLACE INTO jobs (id, status, model, created_at, updated_at, data) "
+                        "VALUES (?, ?, ?, ?, ?, ?)",
+                        rows,
+                    )
+                if deletes:
+                    self._conn.executemany("DELETE FROM jobs WHERE id = ?", deletes)
+
+    def count(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM jobs").fetchone()[0]
+
+
+def migrate_json_to_store(json_path: str, store: JobStore) -> int:
+    """
+    One-shot import of a legacy jobs.json into another store.
+    The source file is renamed to jobs.json.migrated afterwards so the
+    import never runs twice. Returns the number of imported jobs.
+    """
+    if not os.path.exists(json_path):
+        return 0
+
+    jobs = JsonJobStore(json_path).load_all()
+    for job_id, job in jobs.items():
+        job.setdefault("id", job_id)
+    store.apply_batch(jobs.values(), [])
+    os.replace(json_path, f"{json_path}.migrated")
+    return len(jobs)
+
+
+def create_job_store(base_path: str) -> JobStore:
+    """Build the store selected by JOB_STORE ("sqlite" by default, or "json")."""
+    backend = os.getenv("JOB_STORE", "sqlite").lower()
+    json_path = f"{base_path}/jobs.json"
+
+    if backend == "json":
+        return JsonJobStore(json_path)
+
+    store = SQLiteJobStore(f"{base_path}/jobs.db")
+    if store.count() == 0:
+        migrated = migrate_json_to_store(json_path, store)
+        if migrated:
+            print(f"Migrated {migrated} jobs from {json_path} to {store.path}")
+    return store
@@ -1,10 +1,31 @@
 import aiohttp
 import asyncio
+import hashlib
+import mimetypes
 import os
 import ssl
-from typing import Optional, Dict
+from typing import Optional, Dict, List, Tuple, Union
+from urllib.parse import urlencode
 import aiofiles
 
+from app.services.retry import RetryPolicy, CircuitBreaker, is_transient
+
+
+class KieAPIError(Exception):
+    """Kie.ai answered a request with an error status."""
+
+    def __init__(self, message: str, status: int, retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.status = status
+        self.retry_after = retry_after
+
+
+class KieRateLimitError(KieAPIError):
+    """Kie.ai rejected a request because of rate limiting; safe to retry later."""
+
+    def __init__(self, message: str, retry_after: Optional[float] = None):
+        super().__init__(message, 429, retry_after)
+
 
 class KieClient:
     """Client for interacting with Kie.ai API."""
@@ -26,6 +47,82 @@ class KieClient:
         self.ssl_context.check_hostname = False
         self.ssl_context.verify_mode = ssl.CERT_NONE
 
+        # Connection pool settings for the shared session
+        self.pool_limit = int(os.getenv("KIE_POOL_LIMIT", "100"))
+        self.pool_limit_per_host = int(os.getenv("KIE_POOL_LIMIT_PER_HOST", "20"))
+        self.keepalive_timeout = float(os.getenv("KIE_KEEPALIVE_TIMEOUT", "60"))
+        self.dns_cache_ttl = int(os.getenv("KIE_DNS_CACHE_TTL", "300"))
+        self._session: Optional[aiohttp.ClientSession] = None
+
+        # Bounded upload queue so bursts of generations don't saturate memory or bandwidth
+        self._upload_semaphore = asyncio.Semaphore(int(os.getenv("KIE_UPLOAD_CONCURRENCY", "4")))
+
+        # Streaming download settings
+        self.download_chunk_size = int(os.getenv("KIE_DOWNLOAD_CHUNK_SIZE", str(1024 * 1024)))
+        self.download_max_resumes = int(os.getenv("KIE_DOWNLOAD_MAX_RESUMES", "3"))
+
+        # Opt-in completion callbacks: Kie.ai POSTs task results to this URL
+        self.callback_url = os.getenv("KIE_CALLBACK_URL")
+        self.callback_token = os.getenv("KIE_CALLBACK_TOKEN", "")
+        if self.callback_url and not self.callback_token:
+            # The callback endpoint is public; without a shared secret anyone could trigger it
+            raise ValueError("KIE_CALLBACK_URL is set but KIE_CALLBACK_TOKEN is not. Set both to enable callbacks.")
+
+        # Status checks share one bounded pool; identical concurrent lookups share one request
+        self._status_semaphore = asyncio.Semaphore(int(os.getenv("KIE_STATUS_CONCURRENCY", "16")))
+        self._status_inflight: Dict[Tuple[str, str], asyncio.Task] = {}
+
+        # Transient failures are retried with backoff; repeated ones open the circuit
+        # breaker, which fails calls fast (and pauses polling) while Kie.ai recovers
+        self.breaker = CircuitBreaker(
+            failure_threshold=int(os.getenv("KIE_BREAKER_THRESHOLD", "5")),
+            reset_timeout=float(os.getenv("KIE_BREAKER_RESET_SECONDS", "30")),
+        )
+        self.retry_policy = RetryPolicy(
+            max_attempts=int(os.getenv("KIE_RETRY_MAX_ATTEMPTS", "4")),
+            base_delay=float(os.getenv("KIE_RETRY_BASE_DELAY", "1")),
+            max_delay=float(os.getenv("KIE_RETRY_MAX_DELAY", "30")),
+            breaker=self.breaker,
+        )
+
+    async def start(self) -> None:
+        """Open the shared HTTP session (called from the app lifespan)."""
+        self._get_session()
+
+    async def close(self) -> None:
+        """Close the shared HTTP session and its pooled connections."""
+        if self._session and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        """
+        Return the long-lived session, creating it on first use.
+        Reusing it keeps TCP/TLS connections alive across polls instead of
+        doing a fresh handshake for every request.
+        """
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(
+                ssl=self.ssl_context,
+                limit=self.pool_limit,
+                limit_per_host=self.pool_limit_per_host,
+                keepalive_timeout=self.keepalive_timeout,
+                ttl_dns_cache=self.dns_cache_ttl,
+            )
+            self._session = aiohttp.ClientSession(connector=connector)
+        return self._session
+
+    @property
+    def callbacks_enabled(self) -> bool:
+        return bool(self.callback_url and self.callback_token)
+
+    def _get_callback_url(self) -> Optional[str]:
+        """Callback URL to register with a task, carrying the shared token."""
+        if not self.callbacks_enabled:
+            return None
+        separator = "&" if "?" in self.callback_url else "?"
+        return f"{self.callback_url}{separator}{urlencode({'token': self.callback_token})}"
+
     def _get_headers(self) -> Dict[str, str]:
         """Get authorization headers for API requests."""
         return {
@@ -36,6 +133,9 @@ class KieClient:
         """
         Upload a file to Kie.ai and return the file URL.
 
+        The file is streamed from disk rather than read into memory, and at most
+        KIE_UPLOAD_CONCURRENCY uploads run at once; further uploads wait their turn.
+
         Args:
             file_path: Local path to the file to upload
             upload_path: Remote upload path on Kie.ai
@@ -43,48 +143,69 @@ class KieClient:
         Returns:
             str: URL of the uploaded file
         """
+        async with self._upload_semaphore:
+            result = await self.retry_policy.run(lambda: self._upload_file_once(file_path, upload_path))
+
+        # Handle different response formats
+        if "data" in result:
+            data = result["data"]
+            # Try different URL field names
+            if "downloadUrl" in data:
+                return data["downloadUrl"]
+            elif "fileUrl" in data:
+                return data["fileUrl"]
+            elif "url" in data:
+                return data["url"]
+        elif "fileUrl" in result:
+            return result["fileUrl"]
+        elif "downloadUrl" in result:
+            return result["downloadUrl"]
+
+        raise Exception(f"Unexpected upload response format: {result}")
+
+    async def _upload_file_once(self, file_path: str, upload_path: str) -> Dict:
+        """Make a single upload attempt; the file is reopened so retries stream it from the start."""
         url = f"{self.UPLOAD_BASE_URL}/api/file-stream-upload"
-
-        # Read file
-        async with aiofiles.open(file_path, 'rb') as f:
-            file_content = await f.read()
-
-        # Prepare form data
         filename = os.path.basename(file_path)
-        form = aiohttp.FormData()
-        form.add_field('file', file_content, filename=filename, content_type='image/jpeg')
-        form.add_field('uploadPath', upload_path)
-        form.add_field('fileName', filename)
 
-        # Upload
-        async with aiohttp.ClientSession(connector=aiohttp.TCPConnector(ssl=self.ssl_context)) as session:
+        content_type = await asyncio.to_thread(self._detect_content_type, file_path)
+        file_obj = await asyncio.to_thread(open, file_path, 'rb')
+        try:
+            # Prepare form data; aiohttp streams the file object in chunks
+            form = aiohttp.FormData()
+            form.add_field('file', file_obj, filename=filename, content_type=content_type)
+            form.add_field('uploadPath', upload_path)
+            form.add_field('fileName', filename)
+
+            # Upload
+            session = self._get_session()
             async with session.post(
                 url,
                 headers=self._get_headers(),
                 data=form
             ) as response:
-                if response.status != 200:
-                    error_text = await response.text()
-                    raise Exception(f"File upload failed: {response.status} - {error_text}")
-
-                result = await response.json()
-
-                # Handle different response formats
-                if "data" in result:
-                    data = result["data"]
-                    # Try different URL field names
-                    if "downloadUrl" in data:
-                        return data["downloadUrl"]
-                    elif "fileUrl" in data:
-                        return data["fileUrl"]
-                    elif "url" in data:
-                        return data["url"]
-                elif "fileUrl" in result:
-                    return result["fileUrl"]
-                elif "downloadUrl" in result:
-                    return result["downloadUrl"]
-                else:
-                    raise Exception(f"Unexpected upload response format: {result}")
+                await self._raise_for_status(response, "File upload failed")
+                return await response.json()
+        finally:
+            file_obj.close()
+
+    @staticmethod
+    def _detect_content_type(file_path: str) -> str:
+        """Detect an image's content type from its leading bytes, falling back to the extension."""
+        with open(file_path, 'rb') as f:
+            header = f.read(12)
+
+        if header.startswith(b"\xff\xd8\xff"):
+            return "image/jpeg"
+        if header.startswith(b"\x89PNG\r\n\x1a\n"):
+            return "image/png"
+        if header[:6] in (b"GIF87a", b"GIF89a"):
+            return "image/gif"
+        if header[:4] == b"RIFF" and header[8:12] == b"WEBP":
+            return "image/webp"
+
+        guessed, _ = mimetypes.guess_type(file_path)
+        return guessed or "application/octet-stream"
 
     async def generate_video(
         self,
@@ -112,9 +233,11 @@ class KieClient:
             str: Task ID for polling status
         """
         if model == "sora2":
-            return await self._generate_video_sora2(prompt, image_url, aspect_ratio)
+            submit = lambda: self._generate_video_sora2(prompt, image_url, aspect_ratio)
         else:
-            return await self._generate_video_runway(prompt, image_url, duration, quality, aspect_ratio, watermark)
+            submit = lambda: self._generate_video_runway(prompt, image_url, duration, quality, aspect_ratio, watermark)
+        # Only retried when the request never reached Kie.ai, so a generation is never paid for twice
+        return await self.retry_policy.run(submit, idempotent=False)
 
     async def _generate_video_runway(
         self,
@@ -139,18 +262,21 @@ class KieClient:
         if image_url:
             payload["imageUrl"] = image_url
 
-        async with aiohttp.ClientSession(connector=aiohttp.TCPConnector(ssl=self.ssl_context)) as session:
-            async with session.post(
-                url,
-                headers={**self._get_headers(), "Content-Type": "application/json"},
-                json=payload
-            ) as response:
-                if response.status != 200:
-                    error_text = await response.text()
-                    raise Exception(f"Video generation failed: {response.status} - {error_text}")
+        if self.callbacks_enabled:
+            payload["callBackUrl"] = self._get_callback_url()
 
-                result = await response.json()
-                return result["data"]["taskId"]
+        session = self._get_session()
+        async with session.post(
+            url,
+            headers={**self._get_headers(), "Content-Type": "application/json"},
+            json=payload
+        ) as response:
+            await self._raise_for_status(response, "Video generation failed")
+
+            result = await response.json()
+            if result.get("code") == 429:
+                raise KieRateLimitError(f"Video generation failed: {result.get('msg') or 'rate limited'}")
+            return result["data"]["taskId"]
 
     async def _generate_video_sora2(
         self,
@@ -182,25 +308,46 @@ class KieClient:
         if image_url:
             payload["input"]["image_urls"] = [image_url]
 
-        async with aiohttp.ClientSession(connector=aiohttp.TCPConnector(ssl=self.ssl_context)) as session:
-            async with session.post(
-                url,
-                headers={**self._get_headers(), "Content-Type": "application/json"},
-                json=payload
-            ) as response:
-                if response.status != 200:
-                    error_text = await response.text()
-                    raise Exception(f"Sora 2 generation failed: {response.status} - {error_text}")
+        if self.callbacks_enabled:
+            payload["callBackUrl"] = self._get_callback_url()
 
-                result = await response.json()
+        session = self._get_session()
+        async with session.post(
+            url,
+            headers={**self._get_headers(), "Content-Type": "application/json"},
+            json=payload
+        ) as response:
+            await self._raise_for_status(response, "Sora 2 generation failed")
 
-                # Sora 2 uses different response format
-                if "data" in result and "taskId" in result["data"]:
-                    return result["data"]["taskId"]
-                elif "taskId" in result:
-                    return result["taskId"]
-                else:
-                    raise Exception(f"Unexpected Sora 2 response format: {result}")
+            result = await response.json()
+            if result.get("code") == 429:
+                raise KieRateLimitError(f"Sora 2 generation failed: {result.get('msg') or 'rate limited'}")
+
+            # Sora 2 uses different response format
+            if "data" in result and "taskId" in result["data"]:
+                return result["data"]["taskId"]
+            elif "taskId" in result:
+                return result["taskId"]
+            else:
+                raise Exception(f"Unexpected Sora 2 response format: {result}")
+
+    async def _raise_for_status(self, response: aiohttp.ClientResponse, message: str):
+        """Raise KieAPIError (or KieRateLimitError) for a non-200 response."""
+        if response.status == 200:
+            return
+        retry_after = self._parse_retry_after(response.headers.get("Retry-After"))
+        if response.status == 429:
+            raise KieRateLimitError(f"{message}: rate limited", retry_after)
+        error_text = await response.text()
+        raise KieAPIError(f"{message}: {response.status} - {error_text}", response.status, retry_after)
+
+    @staticmethod
+    def _parse_retry_after(value: Optional[str]) -> Optional[float]:
+        """Retry-After in seconds (only the delta-seconds form is supported)."""
+        try:
+            return max(0.0, float(value)) if value else None
+        except ValueError:
+            return None
 
     async def get_task_status(self, task_id: str, model: str = "sora2") -> Dict:
         """
@@ -213,46 +360,166 @@ class KieClient:
         Returns:
             Dict with task status information
         """
+        key = (task_id, model)
+        task = self._status_inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._get_task_status_limited(task_id, model))
+            self._status_inflight[key] = task
+            task.add_done_callback(lambda _: self._status_inflight.pop(key, None))
+        # Shielded so one caller giving up doesn't cancel the lookup for the others
+        return await asyncio.shield(task)
+
+    async def get_task_statuses(
+        self,
+        task_ids: List[str],
+        model: str = "sora2"
+    ) -> Dict[str, Union[Dict, Exception]]:
+        """
+        Get the status of many tasks at once.
+
+        Checks run concurrently (at most KIE_STATUS_CONCURRENCY at a time) over
+        the shared connection pool, and duplicate ids are looked up once.
+
+        Returns:
+            Dict of task id -> status data, or the exception its lookup raised
+        """
+        unique_ids = list(dict.fromkeys(task_ids))
+        results = await asyncio.gather(
+            *(self.get_task_status(task_id, model) for task_id in unique_ids),
+            return_exceptions=True
+        )
+        return dict(zip(unique_ids, results))
+
+    async def _get_task_status_limited(self, task_id: str, model: str) -> Dict:
+        async with self._status_semaphore:
+            return await self.retry_policy.run(lambda: self._get_task_status_once(task_id, model))
+
+    async def _get_task_status_once(self, task_id: str, model: str) -> Dict:
         # Sora 2 uses different endpoint
         if model == "sora2":
             url = f"{self.API_BASE_URL}/api/v1/jobs/recordInfo"
         else:
             url = f"{self.API_BASE_URL}/api/v1/runway/record-detail"
 
-        async with aiohttp.ClientSession(connector=aiohttp.TCPConnector(ssl=self.ssl_context)) as session:
-            async with session.get(
-                url,
-                headers=self._get_headers(),
-                params={"taskId": task_id}
-            ) as response:
-                if response.status != 200:
-                    error_text = await response.text()
-                    raise Exception(f"Status check failed: {response.status} - {error_text}")
+        session = self._get_session()
+        async with session.get(
+            url,
+            headers=self._get_headers(),
+            params={"taskId": task_id}
+        ) as response:
+            await self._raise_for_status(response, "Status check failed")
 
-                result = await response.json()
+            result = await response.json()
 
-                # Return the data section
-                if "data" in result:
-                    return result["data"]
-                else:
-                    return result
+            # Return the data section
+            if "data" in result:
+                return result["data"]
+            else:
+                return result
 
-    async def download_video(self, video_url: str, output_path: str) -> None:
+    async def download_video(
+        self,
+        video_url: str,
+        output_path: str,
+        expected_sha256: Optional[str] = None
+    ) -> str:
         """
         Download a video from Kie.ai to local storage.
 
+        The body is streamed to `<output_path>.part` in chunks of
+        KIE_DOWNLOAD_CHUNK_SIZE bytes and renamed into place once complete, so
+        memory use is bounded by the chunk size and a failed download never
+        leaves a truncated video behind. Interrupted transfers are resumed with
+        an HTTP Range request.
+
         Args:
             video_url: URL of the video to download
             output_path: Local path to save the video
-        """
-        async with aiohttp.ClientSession(connector=aiohttp.TCPConnector(ssl=self.ssl_context)) as session:
-            async with session.get(video_url) as response:
-                if response.status != 200:
-                    raise Exception(f"Video download failed: {response.status}")
-
-                # Create directory if it doesn't exist
-                os.makedirs(os.path.dirname(output_path), exist_ok=True)
+            expected_sha256: Optional hex digest the downloaded file must match
 
-                # Write video file
-                async with aiofiles.open(output_path, 'wb') as f:
-                    await f.write(await response.read())
+        Returns:
+            str: SHA-256 hex digest of the downloaded file
+        """
+        # Create directory if it doesn't exist
+        os.makedirs(os.path.dirname(output_path), exist_ok=True)
+        tmp_path = f"{output_path}.part"
+
+        session = self._get_session()
+        # No overall deadline for large files, only for stalled reads
+        timeout = aiohttp.ClientTimeout(total=None, sock_connect=30, sock_read=60)
+
+        written = 0
+        total_size: Optional[int] = None
+        digest = hashlib.sha256()
+        resumes = 0
+
+        while total_size is None or written < total_size:
+            headers = {"Range": f"bytes={written}-"} if written else {}
+            try:
+                async with session.get(video_url, headers=headers, timeout=timeout) as response:
+                    if response.status == 206 and written:
+                        total_size = self._parse_content_range_total(response) or total_size
+                        mode = 'ab'
+                    elif response.status == 200:
+                        # Full body (first request, or the server ignored our Range header)
+                        written = 0
+                        digest = hashlib.sha256()
+                        total_size = response.content_length
+                        mode = 'wb'
+                    else:
+                        raise KieAPIError(f"Video download failed: {response.status}", response.status)
+
+                    # Write video file chunk by chunk
+                    async with aiofiles.open(tmp_path, mode) as f:
+                        async for chunk in response.content.iter_chunked(self.download_chunk_size):
+                            await f.write(chunk)
+                            digest.update(chunk)
+                            written += len(chunk)
+
+                if total_size is None:
+                    # No Content-Length: the stream ending cleanly is all we can check
+                    break
+
+            except Exception as e:
+                # Dropped connections, stalls and 5xx responses are resumed; anything else is fatal
+                if not is_transient(e):
+                    await asyncio.to_thread(self._remove_if_exists, tmp_path)
+                    raise
+                resumes += 1
+                if resumes > self.download_max_resumes:
+                    await asyncio.to_thread(self._remove_if_exists, tmp_path)
+                    raise Exception(f"Video download failed after {resumes - 1} resumes: {e}")
+                await asyncio.sleep(min(2 ** resumes, 10))
+                continue
+
+            if written < total_size:
+                # Connection closed early without an error; resume from where it stopped
+                resumes += 1
+                if resumes > self.download_max_resumes:
+                    break
+
+        if total_size is not None and written != total_size:
+            await asyncio.to_thread(self._remove_if_exists, tmp_path)
+            raise Exception(f"Video download incomplete: got {written} of {total_size} bytes")
+
+        checksum = digest.hexdigest()
+        if expected_sha256 and checksum != expected_sha256.lower():
+            await asyncio.to_thread(self._remove_if_exists, tmp_path)
+            raise Exception("Video download checksum mismatch")
+
+        os.replace(tmp_path, output_path)
+        return checksum
+
+    @staticmethod
+    def _parse_content_range_total(response: aiohttp.ClientResponse) -> Optional[int]:
+        """Total size from a `Content-Range: bytes start-end/total` header."""
+        content_range = response.headers.get("Content-Range", "")
+        total = content_range.rpartition("/")[2]
+        return int(total) if total.isdigit() else None
+
+    @staticmethod
+    def _remove_if_exists(path: str):
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
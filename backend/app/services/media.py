@@ -0,0 +1,190 @@
+import json
+import os
+from typing import Dict, List, Tuple
+import cv2
+from PIL import Image
+
+# Thumbnail outputs: size name -> (width in pixels, filename)
+THUMBNAIL_SIZES: Dict[str, Tuple[int, str]] = {
+    "small": (320, "thumbnail-small.webp"),  # list view
+    "large": (960, "thumbnail.jpg"),  # embed view / video poster
+}
+
+# Fractions of the video to sample when picking a representative frame
+CANDIDATE_POSITIONS = (0.1, 0.25, 0.4, 0.55, 0.7)
+
+# Animated hover preview
+PREVIEW_FILENAME = "preview.webp"
+PREVIEW_FRAMES = 24
+PREVIEW_WIDTH = 240
+PREVIEW_FRAME_MS = 125
+
+# Scrubbing sprite sheet
+SPRITE_FILENAME = "sprite.jpg"
+SPRITE_INDEX_FILENAME = "sprite.json"
+SPRITE_FRAMES = 20
+SPRITE_COLUMNS = 5
+SPRITE_WIDTH = 160
+
+
+def _frame_score(frame) -> float:
+    """Score a frame by sharpness, rejecting near-black and near-white frames."""
+    gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+    brightness = gray.mean()
+    if brightness < 20 or brightness > 235:
+        return 0.0
+    return cv2.Laplacian(gray, cv2.CV_64F).var()
+
+
+def _resize_to_width(frame, width: int):
+    height, original_width = frame.shape[:2]
+    if original_width <= width:
+        return frame
+    new_height = max(1, round(height * width / original_width))
+    return cv2.resize(frame, (width, new_height), interpolation=cv2.INTER_AREA)
+
+
+def _write_image(path: str, frame) -> bool:
+    if path.endswith(".webp"):
+        params = [cv2.IMWRITE_WEBP_QUALITY, 80]
+    else:
+        params = [cv2.IMWRITE_JPEG_QUALITY, 85]
+    return cv2.imwrite(path, frame, params)
+
+
+def _to_pil(frame) -> Image.Image:
+    return Image.fromarray(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB))
+
+
+def _evenly_spaced(frame_count: int, count: int) -> List[int]:
+    if frame_count <= count:
+        return list(range(frame_count))
+    return [int((i + 0.5) * frame_count / count) for i in range(count)]
+
+
+def _count_frames(video_path: str) -> int:
+    """Count frames by decoding, for containers that don't report a frame count."""
+    video = cv2.VideoCapture(video_path)
+    count = 0
+    try:
+        while video.grab():
+            count += 1
+    finally:
+        video.release()
+    return count
+
+
+def _write_thumbnails(frames: List, output_dir: str) -> Dict[str, str]:
+    if not frames:
+        return {}
+    best = max(frames, key=_frame_score)
+
+    outputs = {}
+    for name, (width, filename) in THUMBNAIL_SIZES.items():
+        if _write_image(os.path.join(output_dir, filename), _resize_to_width(best, width)):
+            outputs[name] = filename
+    return outputs
+
+
+def _write_preview(frames: List, output_dir: str) -> bool:
+    if not frames:
+        return False
+    images = [_to_pil(frame) for frame in frames]
+    images[0].save(
+        os.path.join(output_dir, PREVIEW_FILENAME),
+        format="WEBP",
+        save_all=True,
+        append_images=images[1:],
+        duration=PREVIEW_FRAME_MS,
+        loop=0,
+        quality=60,
+    )
+    return True
+
+
+def _write_sprite(frames: List, timestamps: List[float], output_dir: str) -> bool:
+    if not frames:
+        return False
+    tile_height, tile_width = frames[0].shape[:2]
+    columns = min(SPRITE_COLUMNS, len(frames))
+    rows = (len(frames) + columns - 1) // columns
+
+    sheet = Image.new("RGB", (tile_width * columns, tile_height * rows))
+    for i, frame in enumerate(frames):
+        sheet.paste(_to_pil(frame), ((i % columns) * tile_width, (i // columns) * tile_height))
+    sheet.save(os.path.join(output_dir, SPRITE_FILENAME), format="JPEG", quality=75)
+
+    index = {
+        "image": SPRITE_FILENAME,
+        "frameWidth": tile_width,
+        "frameHeight": tile_height,
+        "columns": columns,
+        "rows": rows,
+        "count": len(frames),
+        "timestamps": timestamps,
+    }
+    with open(os.path.join(output_dir, SPRITE_INDEX_FILENAME), 'w') as f:
+        json.dump(index, f)
+    return True
+
+
+def render_media(video_path: str, output_dir: str) -> Dict:
+    """
+    Decode a video once and write every derived asset next to it:
+    list/embed thumbnails from a representative frame, an animated WebP hover
+    preview, and a sprite sheet with a JSON index for scrubbing.
+
+    Frames that no output needs are only grabbed, not converted, so the pass
+    costs one sequential decode. Runs in a worker process, so it only takes
+    and returns plain values.
+
+    Returns:
+        Dict with "thumbnails" (size name -> filename) and, when written,
+        "preview", "sprite" and "spriteIndex" filenames
+    """
+    video = cv2.VideoCapture(video_path)
+    try:
+        frame_count = int(video.get(cv2.CAP_PROP_FRAME_COUNT) or 0)
+        fps = video.get(cv2.CAP_PROP_FPS) or 0
+        if frame_count <= 0:
+            video.release()
+            frame_count = _count_frames(video_path)
+            video = cv2.VideoCapture(video_path)
+
+        thumbnail_indexes = set(int(frame_count * p) for p in CANDIDATE_POSITIONS) if frame_count > 1 else {0}
+        preview_indexes = set(_evenly_spaced(frame_count, PREVIEW_FRAMES))
+        sprite_list = _evenly_spaced(frame_count, SPRITE_FRAMES)
+        sprite_indexes = set(sprite_list)
+        wanted = thumbnail_indexes | preview_indexes | sprite_indexes
+        last_wanted = max(wanted) if wanted else -1
+
+        thumbnail_frames, preview_frames, sprite_frames = [], [], []
+        for index in range(last_wanted + 1):
+            if index not in wanted:
+                if not video.grab():
+                    break
+                continue
+
+            success, frame = video.read()
+            if not success:
+                break
+            if index in thumbnail_indexes:
+                thumbnail_frames.append(frame)
+            if index in preview_indexes:
+                preview_frames.append(_resize_to_width(frame, PREVIEW_WIDTH))
+            if index in sprite_indexes:
+                sprite_frames.append(_resize_to_width(frame, SPRITE_WIDTH))
+    finally:
+        video.release()
+
+    outputs: Dict = {"thumbnails": _write_thumbnails(thumbnail_frames, output_dir)}
+
+    if _write_preview(preview_frames, output_dir):
+        outputs["preview"] = PREVIEW_FILENAME
+
+    timestamps = [round(i / fps, 3) if fps else 0.0 for i in sprite_list[:len(sprite_frames)]]
+    if _write_sprite(sprite_frames, timestamps, output_dir):
+        outputs["sprite"] = SPRITE_FILENAME
+        outputs["spriteIndex"] = SPRITE_INDEX_FILENAME
+
+    return outputs
@@ -0,0 +1,144 @@
+import json
+import mimetypes
+import os
+import stat
+import threading
+from collections import OrderedDict
+from typing import Optional, Dict, Tuple
+
+from starlette.responses import FileResponse, Response
+
+from app.services.upload_cache import file_sha256
+
+# Generated assets never change once written, so clients may cache them forever
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+
+class ContentHashes:
+    """SHA-256 digests of served files, memoized by (path, size, mtime)."""
+
+    def __init__(self, max_entries: int = 10000):
+        self.max_entries = max_entries
+        self._digests: "OrderedDict[Tuple[str, int, int], str]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def etag(self, path: str, stat_result: os.stat_result) -> str:
+        """Strong ETag for a file (call from a worker thread: may read the whole file)."""
+        key = (path, stat_result.st_size, stat_result.st_mtime_ns)
+        with self._lock:
+            digest = self._digests.get(key)
+            if digest is not None:
+                self._digests.move_to_end(key)
+                return f'"{digest}"'
+
+        digest = self._known_digest(path) or file_sha256(path)
+        with self._lock:
+            self._digests[key] = digest
+            while len(self._digests) > self.max_entries:
+                self._digests.popitem(last=False)
+        return f'"{digest}"'
+
+    @staticmethod
+    def _known_digest(path: str) -> Optional[str]:
+        """A finished video's SHA-256 is already recorded in metadata.json at download time."""
+        if os.path.basename(path) != "video.mp4":
+            return None
+        try:
+            with open(os.path.join(os.path.dirname(path), "metadata.json"), 'r') as f:
+                return json.load(f).get("videoSha256")
+        except (OSError, ValueError):
+            return None
+
+
+class HotFileCache:
+    """Small in-memory LRU of file bodies (thumbnails, previews) bounded by total bytes."""
+
+    def __init__(self, max_bytes: int, max_file_bytes: int):
+        self.max_bytes = max_bytes
+        self.max_file_bytes = max_file_bytes
+        self._entries: "OrderedDict[Tuple[str, int, int], bytes]" = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def cacheable(self, stat_result: os.stat_result) -> bool:
+        return 0 < stat_result.st_size <= self.max_file_bytes and self.max_bytes > 0
+
+    def read(self, path: str, stat_result: os.stat_result) -> bytes:
+        """Return the file's bytes, from memory if cached (call from a worker thread)."""
+        key = (path, stat_result.st_size, stat_result.st_mtime_ns)
+        with self._lock:
+            body = self._entries.get(key)
+            if body is not None:
+                self._entries.move_to_end(key)
+                return body
+
+        with open(path, 'rb') as f:
+            body = f.read()
+
+        with self._lock:
+            if key not in self._entries:
+                self._entries[key] = body
+                self._size += len(body)
+                while self._size > self.max_bytes:
+                    _, evicted = self._entries.popitem(last=False)
+                    self._size -= len(evicted)
+        return body
+
+
+class MediaServer:
+    """Builds responses for generated job assets under `root`."""
+
+    def __init__(self, root: str, cache_bytes: int = 16 * 1024 * 1024, cache_file_bytes: int = 512 * 1024):
+        self.root = os.path.realpath(root)
+        self.hashes = ContentHashes()
+        self.hot_files = HotFileCache(cache_bytes, cache_file_bytes)
+
+    def resolve(self, job_id: str, filename: str) -> Optional[str]:
+        """Path of a job asset, or None if the name would escape the media root."""
+        if not job_id or not filename or any(part in ("", ".", "..") for part in (job_id, filename)):
+            return None
+        path = os.path.realpath(os.path.join(self.root, job_id, filename))
+        if os.path.dirname(os.path.dirname(path)) != self.root:
+            return None
+        return path
+
+    def lookup(self, path: str) -> Optional[Tuple[os.stat_result, str]]:
+        """(stat, ETag) for a regular file, or None if it doesn't exist (call from a worker thread)."""
+        try:
+            stat_result = os.stat(path)
+        except OSError:
+            return None
+        if not stat.S_ISREG(stat_result.st_mode):
+            return None
+        return stat_result, self.hashes.etag(path, stat_result)
+
+    def respond(
+        self,
+        path: str,
+        stat_result: os.stat_result,
+        etag: str,
+        request_headers: Dict[str, str],
+        body: Optional[bytes] = None,
+        download_name: Optional[str] = None,
+        media_type: Optional[str] = None
+    ) -> Response:
+        """
+        304 if the client's copy is current; the cached body for small files
+        without a Range header; otherwise a (range-aware) file response.
+        """
+        headers = {"ETag": etag, "Cache-Control": IMMUTABLE_CACHE_CONTROL}
+        if_none_match = request_headers.get("if-none-match")
+        if if_none_match and (if_none_match.strip() == "*" or etag in [t.strip() for t in if_none_match.split(",")]):
+            return Response(status_code=304, headers=headers)
+
+        if download_name:
+            return FileResponse(
+                path, headers=headers, media_type=media_type, filename=download_name, stat_result=stat_result
+            )
+        if body is not None:
+            return Response(content=body, headers=headers, media_type=media_type or self._guess_type(path))
+        return FileResponse(path, headers=headers, media_type=media_type, stat_result=stat_result)
+
+    @staticmethod
+    def _guess_type(path: str) -> str:
+        return mimetypes.guess_type(path)[0] or "application/octet-stream"
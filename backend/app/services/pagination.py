@@ -0,0 +1,17 @@
+import base64
+import json
+from typing import Tuple
+
+
+def encode_cursor(key: Tuple[str, str]) -> str:
+    """Opaque page cursor for a (timestamp, id) sort key."""
+    return base64.urlsafe_b64encode(json.dumps(list(key)).encode()).decode()
+
+
+def decode_cursor(cursor: str) -> Tuple[str, str]:
+    """The (timestamp, id) sort key in a cursor. Raises ValueError if it is malformed."""
+    try:
+        timestamp, item_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        return (str(timestamp), str(item_id))
+    except (ValueError, TypeError):
+        raise ValueError("Invalid cursor")
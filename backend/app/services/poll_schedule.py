@@ -0,0 +1,134 @@
+import random
+from collections import deque
+from typing import Optional, Dict, Tuple, Deque
+
+
+def generation_seconds(status_data: Dict) -> Optional[float]:
+    """
+    Extract how long Kie.ai took to generate a video from a task status payload.
+    Sora 2 reports costTime (ms) or create/complete timestamps (ms); Runway's
+    generateTime is used when it is numeric (seconds).
+    """
+    def _number(value) -> Optional[float]:
+        try:
+            return float(value)
+        except (TypeError, ValueError):
+            return None
+
+    cost_time = _number(status_data.get("costTime"))
+    if cost_time:
+        return cost_time / 1000.0
+
+    create_time = _number(status_data.get("createTime"))
+    complete_time = _number(status_data.get("completeTime"))
+    if create_time and complete_time and complete_time > create_time:
+        return (complete_time - create_time) / 1000.0
+
+    return _number(status_data.get("generateTime"))
+
+
+def _quantile(sorted_values, q: float) -> float:
+    index = min(len(sorted_values) - 1, max(0, int(round(q * (len(sorted_values) - 1)))))
+    return sorted_values[index]
+
+
+class AdaptivePollSchedule:
+    """
+    Computes poll delays from the observed generation-time distribution of each
+    (model, duration) pair: sparse checks before the fast tail is expected,
+    dense checks between the 10th and 90th percentile, then jittered
+    exponential backoff. Falls back to a fixed interval until enough samples
+    have been recorded.
+    """
+
+    MIN_SAMPLES = 5
+    MAX_SAMPLES = 500
+
+    def __init__(
+        self,
+        base_interval: float = 30,
+        min_interval: float = 5,
+        max_interval: float = 120,
+        jitter: float = 0.1,
+    ):
+        self.base_interval = base_interval
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.jitter = jitter
+        self._samples: Dict[Tuple[str, int], Deque[float]] = {}
+        self._quantiles: Dict[Tuple[str, int], Tuple[float, float]] = {}
+
+        # Time-to-detect / polls-per-job metrics for finished tasks
+        self._detect_latencies: Deque[float] = deque(maxlen=self.MAX_SAMPLES)
+        self._polls: Deque[int] = deque(maxlen=self.MAX_SAMPLES)
+
+    def record(self, model: str, duration: int, seconds: float):
+        """Add an observed generation time."""
+        if seconds is None or seconds <= 0:
+            return
+        key = (model, int(duration))
+        samples = self._samples.setdefault(key, deque(maxlen=self.MAX_SAMPLES))
+        samples.append(seconds)
+        self._quantiles.pop(key, None)
+
+    def expected_window(self, model: str, duration: int) -> Optional[Tuple[float, float]]:
+        """Return the (p10, p90) generation time in seconds, or None without enough samples."""
+        key = (model, int(duration))
+        window = self._quantiles.get(key)
+        if window is None:
+            samples = self._samples.get(key)
+            if not samples or len(samples) < self.MIN_SAMPLES:
+                return None
+            ordered = sorted(samples)
+            window = self._quantiles[key] = (_quantile(ordered, 0.1), _quantile(ordered, 0.9))
+        return window
+
+    def next_delay(self, model: str, duration: int, elapsed: float) -> float:
+        """Seconds to wait before the next status check of a task that has been running `elapsed` seconds."""
+        window = self.expected_window(model, duration)
+
+        if window is None:
+            delay = self.base_interval
+        else:
+            early, late = window
+            if elapsed < early:
+                # Nothing expected yet: wait until the fast tail starts finishing
+                delay = early - elapsed
+            elif elapsed < late:
+                # Inside the expected completion window: check densely
+                delay = (late - early) / 10.0
+            else:
+                # Running long: each check is 1.5x further past the window than the last
+                delay = max((late - early) / 10.0, (elapsed - late) * 0.5)
+
+        delay = min(self.max_interval, max(self.min_interval, delay))
+        return delay * random.uniform(1 - self.jitter, 1 + self.jitter)
+
+    def observe_finished(self, polls: int, elapsed: float, generate_seconds: Optional[float]):
+        """Record metrics for a task whose completion was just detected."""
+        self._polls.append(polls)
+        if generate_seconds is not None and generate_seconds > 0:
+            self._detect_latencies.append(max(0.0, elapsed - generate_seconds))
+
+    def metrics(self) -> Dict:
+        """Polling effectiveness over recently finished tasks."""
+        latencies = sorted(self._detect_latencies)
+        polls = list(self._polls)
+        return {
+            "finishedTasks": len(polls),
+            "avgPollsPerJob": sum(polls) / len(polls) if polls else None,
+            "timeToDetect": {
+                "avg": sum(latencies) / len(latencies) if latencies else None,
+                "p50": _quantile(latencies, 0.5) if latencies else None,
+                "p90": _quantile(latencies, 0.9) if latencies else None,
+            },
+            "generationTimes": {
+                f"{model}/{duration}s": {
+                    "samples": len(samples),
+                    "p10": window[0] if window else None,
+                    "p90": window[1] if window else None,
+                }
+                for (model, duration), samples in self._samples.items()
+                for window in [self.expected_window(model, duration)]
+            },
+        }
@@ -0,0 +1,165 @@
+import asyncio
+import random
+import time
+from typing import Optional, Callable, Awaitable, TypeVar
+
+import aiohttp
+
+T = TypeVar("T")
+
+# HTTP statuses worth retrying: the service is busy or briefly unavailable
+RETRYABLE_STATUSES = {408, 425, 429, 500, 502, 503, 504}
+
+
+class CircuitOpenError(Exception):
+    """Raised without calling the service while the circuit breaker is open."""
+
+    def __init__(self, retry_after: float):
+        super().__init__(f"Kie.ai is unavailable, retrying in {retry_after:.0f}s")
+        self.retry_after = retry_after
+
+
+def is_transient(error: Exception) -> bool:
+    """Whether an error is likely to go away on its own (network, timeout, 5xx, 429)."""
+    if isinstance(error, (CircuitOpenError, aiohttp.ClientConnectionError,
+                          aiohttp.ClientPayloadError, asyncio.TimeoutError)):
+        return True
+    return getattr(error, "status", None) in RETRYABLE_STATUSES
+
+
+def is_unsent(error: Exception) -> bool:
+    """Whether a request certainly never reached the service, so retrying it can't duplicate work."""
+    return isinstance(error, (CircuitOpenError, aiohttp.ClientConnectorError))
+
+
+class CircuitBreaker:
+    """
+    Stops calls to a degraded service.
+
+    After `failure_threshold` consecutive transient failures the circuit opens
+    and calls fail fast with CircuitOpenError for `reset_timeout` seconds.
+    Then a single probe call is let through: success closes the circuit,
+    failure opens it again.
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._failures = 0
+        self._open_until = 0.0
+        self._probing = False
+
+    @property
+    def state(self) -> str:
+        if self._failures < self.failure_threshold:
+            return "closed"
+        return "open" if self.remaining() > 0 or self._probing else "half-open"
+
+    def remaining(self) -> float:
+        """Seconds until the circuit lets a call through again (0 if closed)."""
+        if self._failures < self.failure_threshold:
+            return 0.0
+        return max(0.0, self._open_until - time.monotonic())
+
+    def before_call(self) -> bool:
+        """
+        Raise CircuitOpenError if a call isn't allowed right now.
+        Returns True if this call is the half-open probe.
+        """
+        if self._failures < self.failure_threshold:
+            return False
+        remaining = self.remaining()
+        if remaining > 0:
+            raise CircuitOpenError(remaining)
+        if self._probing:
+            # Another call is already probing the service
+            raise CircuitOpenError(1.0)
+        self._probing = True
+        return True
+
+    def record_success(self):
+        self._failures = 0
+        self._probing = False
+
+    def record_failure(self):
+        self._failures += 1
+        self._probing = False
+        if self._failures >= self.failure_threshold:
+            self._open_until = time.monotonic() + self.reset_timeout
+
+    def release_probe(self):
+        """Give up a probe without a verdict (e.g. a fatal, non-service error)."""
+        self._probing = False
+
+    async def wait_closed(self):
+        """Sleep while the circuit is open."""
+        while True:
+            remaining = self.remaining()
+            if remaining <= 0:
+                return
+            await asyncio.sleep(remaining)
+
+
+class RetryPolicy:
+    """
+    Retries transient failures with exponential backoff and full jitter,
+    honouring Retry-After, and reports outcomes to an optional CircuitBreaker.
+    """
+
+    def __init__(
+        self,
+        max_attempts: int = 4,
+        base_delay: float = 1.0,
+        max_delay: float = 30.0,
+        breaker: Optional[CircuitBreaker] = None
+    ):
+        self.max_attempts = max(1, max_attempts)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.breaker = breaker
+
+    def delay(self, attempt: int, retry_after: Optional[float] = None) -> float:
+        """Delay before retry number `attempt` (1-based)."""
+        backoff = random.uniform(0, min(self.max_delay, self.base_delay * 2 ** (attempt - 1)))
+        if retry_after is not None:
+            return max(backoff, min(retry_after, self.max_delay))
+        return backoff
+
+    async def run(self, operation: Callable[[], Awaitable[T]], idempotent: bool = True) -> T:
+        """
+        Call `operation` until it succeeds, fails with a fatal error, or runs
+        out of attempts. Non-idempotent operations are only retried when the
+        request never reached the service.
+
+        CircuitOpenError is raised straight away rather than slept through, so
+        callers holding a slot can give it up and decide when to come back.
+        """
+        attempt = 0
+        while True:
+            attempt += 1
+            probe = self.breaker.before_call() if self.breaker else False
+            try:
+                result = await operation()
+            except Exception as e:
+                transient = is_transient(e)
+                if self.breaker:
+                    # Rate limiting means Kie.ai is up, just busy
+                    if transient and getattr(e, "status", None) != 429:
+                        self.breaker.record_failure()
+                    else:
+                        self.breaker.release_probe()
+
+                retryable = transient and (idempotent or is_unsent(e))
+                if not retryable or attempt >= self.max_attempts:
+                    raise
+                await asyncio.sleep(self.delay(attempt, getattr(e, "retry_after", None)))
+                continue
+            except asyncio.CancelledError:
+                # A cancelled probe must not leave the circuit stuck waiting on it
+                if probe:
+                    self.breaker.release_probe()
+                raise
+
+            if self.breaker:
+                self.breaker.record_success()
+            return result
@@ -0,0 +1,56 @@
+import os
+import sqlite3
+import threading
+
+
+def connect(path: str) -> sqlite3.Connection:
+    """
+    Open an autocommit connection in WAL mode with synchronous=NORMAL that
+    may be shared across threads (callers guard it with a lock).
+    """
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    return conn
+
+
+class Transaction:
+    """BEGIN IMMEDIATE / COMMIT wrapper for an autocommit connection."""
+
+    def __init__(self, conn: sqlite3.Connection):
+        self.conn = conn
+
+    def __enter__(self):
+        self.conn.execute("BEGIN IMMEDIATE")
+        return self.conn
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.conn.execute("COMMIT")
+        else:
+            self.conn.execute("ROLLBACK")
+        return False
+
+
+class SQLiteDatabase:
+    """
+    Base for a store kept in one SQLite file: a single connection shared
+    across threads and guarded by `_lock`, with SCHEMA applied on open.
+    """
+
+    SCHEMA = ""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = connect(self.path)
+        self._conn.executescript(self.SCHEMA)
+
+    def _transaction(self) -> Transaction:
+        """Transaction on the shared connection; hold `_lock` around it."""
+        return Transaction(self._conn)
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
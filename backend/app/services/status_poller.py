@@ -0,0 +1,212 @@
+import asyncio
+import heapq
+import itertools
+import time
+from typing import Optional, Dict, List, Tuple, Callable, Awaitable
+
+from app.services.poll_schedule import AdaptivePollSchedule, generation_seconds
+
+
+class PendingTask:
+    """Polling state for one in-flight Kie.ai task."""
+
+    __slots__ = ("job_id", "task_id", "model", "duration", "started", "deadline", "polls", "due")
+
+    def __init__(self, job_id: str, task_id: str, model: str, duration: int, started: float, deadline: float):
+        self.job_id = job_id
+        self.task_id = task_id
+        self.model = model
+        self.duration = duration
+        self.started = started
+        self.deadline = deadline
+        self.polls = 0
+        self.due = started
+
+
+class StatusPoller:
+    """
+    Polls Kie.ai task status for every in-flight job from a single scheduler.
+
+    Pending tasks sit in a heap keyed by their next check time. One scheduler
+    coroutine sleeps until the earliest one is due, then hands every due task
+    to a fixed pool of workers, so the number of timers and wakeups doesn't
+    grow with the number of jobs. Check times come from an
+    AdaptivePollSchedule fed with the generation times of finished tasks.
+    """
+
+    # Tasks due within this window of each other are checked in the same wakeup
+    COALESCE_WINDOW = 1.0
+
+    def __init__(
+        self,
+        check_status: Callable[[str, str], Awaitable[Dict]],
+        on_status: Callable[[str, Dict], Awaitable[bool]],
+        on_timeout: Callable[[str], Awaitable[None]],
+        on_error: Callable[[str, Exception], Awaitable[None]],
+        schedule: Optional[AdaptivePollSchedule] = None,
+        timeout: float = 600,
+        concurrency: int = 8,
+        gate: Optional[Callable[[], Awaitable[None]]] = None,
+        is_transient: Optional[Callable[[Exception], bool]] = None,
+    ):
+        """
+        Args:
+            check_status: Fetches status data for (task_id, model)
+            on_status: Handles status data for a job; returns True once the task is finished
+            on_timeout: Called with the job id once a task is still unfinished after `timeout`
+            on_error: Called with the job id and exception when a status check fails
+            schedule: Decides when each task is checked next
+            timeout: Seconds a task is polled for before it is given up on, counted from
+                registration so a task resumed after downtime gets a full budget
+            concurrency: Number of status checks allowed in flight at once
+            gate: Awaited before every check; blocks polling while the service is degraded
+            is_transient: Errors it accepts are retried on the normal schedule instead of
+                failing the job. A task only times out after Kie.ai has answered a check
+                with a non-final state, never on a failed check.
+        """
+        self.check_status = check_status
+        self.on_status = on_status
+        self.on_timeout = on_timeout
+        self.on_error = on_error
+        self.schedule = schedule or AdaptivePollSchedule()
+        self.timeout = timeout
+        self.concurrency = concurrency
+        self.gate = gate
+        self.is_transient = is_transient
+
+        self._pending: Dict[str, PendingTask] = {}
+        self._heap: List[Tuple[float, int, str]] = []
+        self._counter = itertools.count()
+        self._wakeup: Optional[asyncio.Event] = None
+        self._queue: Optional[asyncio.Queue] = None
+        self._runners: List[asyncio.Task] = []
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    def __contains__(self, task_id: str) -> bool:
+        return task_id in self._pending
+
+    def start(self):
+        """Start the scheduler and worker pool if they aren't running yet."""
+        if self._runners and not all(t.done() for t in self._runners):
+            return
+        self._wakeup = asyncio.Event()
+        self._queue = asyncio.Queue()
+        self._runners = [asyncio.create_task(self._schedule_loop())]
+        self._runners += [asyncio.create_task(self._worker()) for _ in range(self.concurrency)]
+
+    async def close(self):
+        """Stop the scheduler and workers. Pending tasks are dropped."""
+        for runner in self._runners:
+            runner.cancel()
+        await asyncio.gather(*self._runners, return_exceptions=True)
+        self._runners = []
+
+    def register(self, job_id: str, task_id: str, model: str, duration: int, elapsed: float = 0.0):
+        """
+        Start polling a task that was submitted `elapsed` seconds ago. `elapsed`
+        only shapes the check schedule; the timeout runs from now.
+        """
+        self.start()
+        now = time.monotonic()
+        pending = PendingTask(job_id, task_id, model, duration, now - elapsed, now + self.timeout)
+        self._pending[task_id] = pending
+        self._schedule_next(pending)
+
+    def _schedule_next(self, pending: PendingTask):
+        elapsed = time.monotonic() - pending.started
+        pending.due = time.monotonic() + self.schedule.next_delay(pending.model, pending.duration, elapsed)
+        self._push(pending.task_id, pending.due)
+
+    def check_now(self, task_id: str) -> bool:
+        """Move a pending task to the front of the queue. Returns False if it isn't being polled."""
+        pending = self._pending.get(task_id)
+        if pending is None:
+            return False
+        pending.due = time.monotonic()
+        self._push(task_id, pending.due)
+        return True
+
+    def cancel(self, task_id: str):
+        """Stop polling a task. Its heap entry is skipped lazily."""
+        self._pending.pop(task_id, None)
+
+    def _push(self, task_id: str, due: float):
+        heapq.heappush(self._heap, (due, next(self._counter), task_id))
+        # Wake the scheduler if this task is now the earliest one
+        if self._heap[0][2] == task_id:
+            self._wakeup.set()
+
+    async def _schedule_loop(self):
+        while True:
+            timeout = None
+            if self._heap:
+                timeout = max(0.0, self._heap[0][0] - time.monotonic())
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=timeout)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+
+            horizon = time.monotonic() + self.COALESCE_WINDOW
+            while self._heap and self._heap[0][0] <= horizon:
+                due, _, task_id = heapq.heappop(self._heap)
+                pending = self._pending.get(task_id)
+                # Skip entries for cancelled tasks or superseded schedule times
+                if pending is None or pending.due != due:
+                    continue
+                self._queue.put_nowait(pending)
+
+    async def _worker(self):
+        while True:
+            pending = await self._queue.get()
+            try:
+                await self._check(pending)
+            except Exception as e:
+                print(f"Error polling task {pending.task_id}: {e}")
+            finally:
+                self._queue.task_done()
+
+    async def _check(self, pending: PendingTask):
+        if self._pending.get(pending.task_id) is not pending:
+            return
+
+        if self.gate:
+            await self.gate()
+            if self._pending.get(pending.task_id) is not pending:
+                return
+
+        pending.polls += 1
+        try:
+            status_data = await self.check_status(pending.task_id, pending.model)
+            finished = await self.on_status(pending.job_id, status_data)
+        except Exception as e:
+            if not (self.is_transient and self.is_transient(e)):
+                self.cancel(pending.task_id)
+                await self.on_error(pending.job_id, e)
+                return
+            # Kie.ai never answered, so this says nothing about the task: check again
+            # later, and don't let it count towards the timeout
+            print(f"Transient error polling task {pending.task_id}, will retry: {e}")
+            if self._pending.get(pending.task_id) is pending:
+                self._schedule_next(pending)
+            return
+
+        elapsed = time.monotonic() - pending.started
+        if finished:
+            self.cancel(pending.task_id)
+            if status_data.get("state") == "success":
+                generate_time = generation_seconds(status_data)
+                self.schedule.record(pending.model, pending.duration, generate_time or elapsed)
+                self.schedule.observe_finished(pending.polls, elapsed, generate_time)
+            return
+
+        if time.monotonic() >= pending.deadline:
+            self.cancel(pending.task_id)
+            await self.on_timeout(pending.job_id)
+            return
+
+        # Re-check only if nobody cancelled or re-registered the task meanwhile
+        if self._pending.get(pending.task_id) is pending:
+            self._schedule_next(pending)
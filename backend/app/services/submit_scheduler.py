@@ -0,0 +1,201 @@
+import asyncio
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Optional, Dict, List, Tuple, Callable, Awaitable, Deque
+
+
+class TokenBucket:
+    """Token bucket refilled continuously at `rate` tokens/second, holding at most `burst`."""
+
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.burst = max(1, burst)
+        self.tokens = float(self.burst)
+        self._updated = time.monotonic()
+        self._blocked_until = 0.0
+
+    def _refill(self, now: float):
+        self.tokens = min(self.burst, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def delay(self) -> float:
+        """Seconds until a token is available (0 if one is available now)."""
+        now = time.monotonic()
+        self._refill(now)
+        wait = max(0.0, self._blocked_until - now)
+        if self.tokens < 1:
+            wait = max(wait, (1 - self.tokens) / self.rate if self.rate > 0 else float("inf"))
+        return wait
+
+    def take(self):
+        self.tokens -= 1
+
+    def block(self, seconds: float):
+        """Hand out no tokens for `seconds` (e.g. after the upstream rate-limited us)."""
+        now = time.monotonic()
+        self._refill(now)
+        self.tokens = 0.0
+        self._blocked_until = max(self._blocked_until, now + seconds)
+
+
+class _Lane:
+    """FIFO queue, concurrency limit and rate limit for one model."""
+
+    def __init__(self, concurrency: int, rate: float, burst: int):
+        self.concurrency = max(1, concurrency)
+        self.bucket = TokenBucket(rate, burst)
+        self.active = 0
+        self.waiters: Deque[Tuple[str, asyncio.Future]] = deque()
+        self.wakeup: Optional[asyncio.TimerHandle] = None
+        # Moving average of how long a submission holds its slot
+        self.avg_seconds = 5.0
+
+
+class SubmitScheduler:
+    """
+    Admission control for generation submissions.
+
+    Each model gets its own lane with a concurrency limit and a token-bucket
+    rate limit. Jobs that can't start right away wait in a FIFO queue instead
+    of failing, and each waiting job gets an estimated start delay.
+    """
+
+    def __init__(
+        self,
+        limits: Dict[str, Tuple[int, float, int]],
+        default: Tuple[int, float, int] = (4, 1.0, 4),
+        on_change: Optional[Callable[[str], None]] = None
+    ):
+        """
+        Args:
+            limits: model -> (concurrency, rate per second, burst)
+            default: Limits for models not listed in `limits`
+            on_change: Called with the model name whenever its queue moves
+        """
+        self.limits = limits
+        self.default = default
+        self.on_change = on_change
+        self._lanes: Dict[str, _Lane] = {}
+
+    def _lane(self, model: str) -> _Lane:
+        lane = self._lanes.get(model)
+        if lane is None:
+            lane = self._lanes[model] = _Lane(*self.limits.get(model, self.default))
+        return lane
+
+    def queued(self, model: str) -> int:
+        lane = self._lanes.get(model)
+        return len(lane.waiters) if lane else 0
+
+    @asynccontextmanager
+    async def slot(
+        self,
+        job_id: str,
+        model: str,
+        front: bool = False,
+        on_queued: Optional[Callable[[float], Awaitable]] = None
+    ):
+        """
+        Wait for a submission slot for `model`, holding it for the duration of
+        the block. With `front=True` the job skips to the head of the queue
+        (used when retrying a job that was already admitted once).
+        `on_queued` is awaited with the estimated delay if the job has to wait.
+        """
+        lane = self._lane(model)
+        if not lane.waiters and lane.active < lane.concurrency and lane.bucket.delay() == 0:
+            lane.bucket.take()
+            lane.active += 1
+        else:
+            future = asyncio.get_running_loop().create_future()
+            if front:
+                lane.waiters.appendleft((job_id, future))
+            else:
+                lane.waiters.append((job_id, future))
+            self._dispatch(model)
+            try:
+                if on_queued and not future.done():
+                    await on_queued(self.estimated_delay(job_id, model) or 0.0)
+                await future
+            except asyncio.CancelledError:
+                if future.done() and not future.cancelled():
+                    # Admitted just as we were cancelled; give the slot back
+                    self._release(model, None)
+                else:
+                    self._remove(lane, job_id)
+                raise
+
+        started = time.monotonic()
+        try:
+            yield
+        finally:
+            self._release(model, time.monotonic() - started)
+
+    def throttle(self, model: str, seconds: float):
+        """Pause admissions for a model, e.g. after a rate-limit response."""
+        self._lane(model).bucket.block(seconds)
+
+    def estimated_delay(self, job_id: str, model: str) -> Optional[float]:
+        """Estimated seconds until a queued job is admitted, or None if it isn't queued."""
+        lane = self._lanes.get(model)
+        if lane is None:
+            return None
+        for position, (waiting_id, _) in enumerate(lane.waiters):
+            if waiting_id == job_id:
+                return self._estimate(lane, position)
+        return None
+
+    def estimated_delays(self, model: str) -> List[Tuple[str, float]]:
+        """(job_id, estimated seconds until admitted) for every job queued for a model."""
+        lane = self._lanes.get(model)
+        if lane is None:
+            return []
+        return [(job_id, self._estimate(lane, position)) for position, (job_id, _) in enumerate(lane.waiters)]
+
+    @staticmethod
+    def _estimate(lane: _Lane, position: int) -> float:
+        bucket = lane.bucket
+        token_wait = bucket.delay()
+        if position and bucket.rate > 0:
+            token_wait += position / bucket.rate
+        free = lane.concurrency - lane.active
+        slot_wait = 0.0 if position < free else ((position - free) // lane.concurrency + 1) * lane.avg_seconds
+        return max(token_wait, slot_wait)
+
+    def _release(self, model: str, elapsed: Optional[float]):
+        lane = self._lanes[model]
+        lane.active -= 1
+        if elapsed is not None:
+            lane.avg_seconds = 0.8 * lane.avg_seconds + 0.2 * elapsed
+        self._dispatch(model)
+
+    @staticmethod
+    def _remove(lane: _Lane, job_id: str):
+        for entry in lane.waiters:
+            if entry[0] == job_id:
+                lane.waiters.remove(entry)
+                return
+
+    def _dispatch(self, model: str):
+        """Admit waiting jobs in FIFO order while slots and tokens are available."""
+        lane = self._lanes[model]
+        if lane.wakeup:
+            lane.wakeup.cancel()
+            lane.wakeup = None
+
+        admitted = False
+        while lane.waiters and lane.active < lane.concurrency:
+            delay = lane.bucket.delay()
+            if delay > 0:
+                lane.wakeup = asyncio.get_running_loop().call_later(delay, self._dispatch, model)
+                break
+            _, future = lane.waiters.popleft()
+            if future.done():
+                continue
+            lane.bucket.take()
+            lane.active += 1
+            future.set_result(None)
+            admitted = True
+
+        if admitted and self.on_change:
+            self.on_change(model)
@@ -0,0 +1,151 @@
+import asyncio
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional, Dict, Tuple, Callable, Awaitable, TypeVar
+
+T = TypeVar("T")
+
+
+def file_sha256(file_path: str, chunk_size: int = 1024 * 1024) -> str:
+    """SHA-256 hex digest of a file, read in chunks."""
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+async def coalesce(inflight: Dict[str, asyncio.Future], key: str, coro_factory: Callable[[], Awaitable[T]]) -> T:
+    """
+    Run `coro_factory()` for a key unless a run for it is already in flight,
+    in which case wait for that run's result (or exception) instead.
+    `inflight` is the caller's key -> future table.
+    """
+    running = inflight.get(key)
+    if running is not None:
+        return await asyncio.shield(running)
+
+    future = asyncio.get_running_loop().create_future()
+    inflight[key] = future
+    try:
+        result = await coro_factory()
+    except Exception as e:
+        future.set_exception(e)
+        # Mark the exception as retrieved in case nobody else was waiting
+        future.exception()
+        raise
+    except asyncio.CancelledError:
+        future.cancel()
+        raise
+    finally:
+        inflight.pop(key, None)
+
+    future.set_result(result)
+    return result
+
+
+class UploadCache:
+    """
+    Persistent cache of Kie.ai file URLs keyed by the uploaded file's content
+    hash and upload path.
+
+    Entries expire after `ttl` seconds (Kie.ai deletes uploaded files after a
+    few days) and the least recently used entries are evicted past
+    `max_entries`. Concurrent requests for the same file share one upload.
+    """
+
+    def __init__(self, path: str, ttl: float, max_entries: int = 1000):
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Dict]" = OrderedDict()
+        self._inflight: Dict[str, asyncio.Future] = {}
+        # (path, size, mtime) -> digest, so unchanged files aren't re-hashed
+        self._digests: Dict[Tuple[str, int, int], str] = {}
+        self._save_lock = threading.Lock()
+        self._load()
+
+    def _load(self):
+        try:
+            with open(self.path, 'r') as f:
+                entries = json.load(f)
+        except (OSError, ValueError):
+            return
+
+        now = time.time()
+        live = sorted(
+            ((key, entry) for key, entry in entries.items() if now - entry.get("uploadedAt", 0) < self.ttl),
+            key=lambda item: item[1].get("lastUsedAt", 0),
+        )
+        self._entries.update(live[-self.max_entries:])
+
+    def _save(self, entries: Dict):
+        tmp_path = f"{self.path}.tmp"
+        with self._save_lock:
+            with open(tmp_path, 'w') as f:
+                json.dump(entries, f)
+            os.replace(tmp_path, self.path)
+
+    def digest(self, file_path: str) -> str:
+        """A file's SHA-256, memoized by (path, size, mtime) (call from a worker thread)."""
+        stat = os.stat(file_path)
+        stat_key = (file_path, stat.st_size, stat.st_mtime_ns)
+        digest = self._digests.get(stat_key)
+        if digest is None:
+            digest = self._digests[stat_key] = file_sha256(file_path)
+        return digest
+
+    def _lookup(self, key: str) -> Optional[str]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if time.time() - entry["uploadedAt"] >= self.ttl:
+            del self._entries[key]
+            return None
+        entry["lastUsedAt"] = time.time()
+        self._entries.move_to_end(key)
+        return entry["url"]
+
+    async def get_or_upload(
+        self,
+        file_path: str,
+        upload_path: str,
+        upload: Callable[[str, str], Awaitable[str]]
+    ) -> str:
+        """
+        Return the Kie.ai URL for a file, uploading it only if no live cached
+        URL exists and no upload of the same content is already in flight.
+        """
+        digest = await asyncio.to_thread(self.digest, file_path)
+        key = f"{digest}:{upload_path}"
+
+        url = self._lookup(key)
+        if url:
+            return url
+
+        return await coalesce(self._inflight, key, lambda: self._upload(key, file_path, upload_path, upload))
+
+    async def _upload(
+        self,
+        key: str,
+        file_path: str,
+        upload_path: str,
+        upload: Callable[[str, str], Awaitable[str]]
+    ) -> str:
+        url = await upload(file_path, upload_path)
+
+        now = time.time()
+        self._entries[key] = {"url": url, "uploadedAt": now, "lastUsedAt": now}
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+        try:
+            await asyncio.to_thread(self._save, dict(self._entries))
+        except OSError as e:
+            print(f"Error saving upload cache: {e}")
+        return url
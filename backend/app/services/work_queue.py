@@ -0,0 +1,82 @@
+import json
+from datetime import datetime
+from typing import Optional, Dict, List, Tuple
+
+from app.services.sqlite_db import SQLiteDatabase
+
+# Workflow stages in order. Each stage's checkpoint is saved before the next one starts.
+STAGES = ("upload", "submit", "poll", "download", "faststart", "media")
+
+
+class WorkQueue(SQLiteDatabase):
+    """
+    Durable record of each generation workflow's current stage and checkpoint
+    data, stored in SQLite so in-flight jobs can resume after a restart.
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS workflows (
+            job_id TEXT PRIMARY KEY,
+            stage TEXT NOT NULL,
+            state TEXT NOT NULL,
+            checkpoint TEXT NOT NULL,
+            updated_at TEXT NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS idx_workflows_state ON workflows(state);
+    """
+
+    def enqueue(self, job_id: str, stage: str, checkpoint: Dict):
+        """Create (or restart) a workflow at the given stage."""
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO workflows (job_id, stage, state, checkpoint, updated_at) "
+                "VALUES (?, ?, 'active', ?, ?)",
+                (job_id, stage, json.dumps(checkpoint), datetime.utcnow().isoformat()),
+            )
+
+    def enqueue_many(self, workflows: List[Tuple[str, str, Dict]]):
+        """Create many (job_id, stage, checkpoint) workflows in one transaction."""
+        now = datetime.utcnow().isoformat()
+        with self._lock:
+            with self._transaction():
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO workflows (job_id, stage, state, checkpoint, updated_at) "
+                    "VALUES (?, ?, 'active', ?, ?)",
+                    [(job_id, stage, json.dumps(checkpoint), now) for job_id, stage, checkpoint in workflows],
+                )
+
+    def get(self, job_id: str) -> Optional[Tuple[str, str, Dict]]:
+        """Return (stage, state, checkpoint) for a workflow, or None."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT stage, state, checkpoint FROM workflows WHERE job_id = ?", (job_id,)
+            ).fetchone()
+        return (row[0], row[1], json.loads(row[2])) if row else None
+
+    def advance(self, job_id: str, stage: str, checkpoint: Dict):
+        """Record that a workflow has reached `stage` with the given checkpoint."""
+        with self._lock:
+            self._conn.execute(
+                "UPDATE workflows SET stage = ?, checkpoint = ?, updated_at = ? WHERE job_id = ?",
+                (stage, json.dumps(checkpoint), datetime.utcnow().isoformat(), job_id),
+            )
+
+    def finish(self, job_id: str, state: str = "done"):
+        """Mark a workflow as finished ("done" or "failed")."""
+        with self._lock:
+            self._conn.execute(
+                "UPDATE workflows SET state = ?, updated_at = ? WHERE job_id = ?",
+                (state, datetime.utcnow().isoformat(), job_id),
+            )
+
+    def remove(self, job_id: str):
+        with self._lock:
+            self._conn.execute("DELETE FROM workflows WHERE job_id = ?", (job_id,))
+
+    def incomplete(self) -> List[Tuple[str, str, Dict]]:
+        """All workflows that haven't finished, as (job_id, stage, checkpoint)."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT job_id, stage, checkpoint FROM workflows WHERE state = 'active'"
+            ).fetchall()
+        return [(row[0], row[1], json.loads(row[2])) for row in rows]
@@ -0,0 +1,80 @@
+"""
+Per-update latency of JobManager.update_job with 1k, 10k and 100k stored jobs,
+and the write-behind flush cost per updated job.
+
+Not collected by pytest; run from backend/:
+
+    python -m tests.bench_job_updates [updates]
+"""
+import asyncio
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+os.environ.setdefault("KIE_API_KEY", "bench-key")
+# Importing job_manager builds its module-level manager; keep it out of the real data directory
+os.environ.setdefault("DATA_PATH", tempfile.mkdtemp(prefix="bench-job-updates-"))
+os.environ.setdefault("MEDIA_POOL", "thread")
+os.environ.setdefault("IMAGE_POOL", "thread")
+
+from app.services.job_manager import JobManager  # noqa: E402
+from app.services.job_store import create_job_store  # noqa: E402
+
+SIZES = (1_000, 10_000, 100_000)
+
+
+async def _template() -> dict:
+    """A job record exactly as create_job stores it."""
+    manager = JobManager()
+    await manager.create_job("template", "sora2", "a", "b", "prompt", "custom", {}, {"duration": 10})
+    job = dict(manager._jobs["template"])
+    await manager.close()
+    return job
+
+
+async def bench(size: int, updates: int):
+    with tempfile.TemporaryDirectory(prefix="bench-job-updates-") as data_path:
+        os.environ["DATA_PATH"] = data_path
+        template = await _template()
+
+        # Seed the store directly; going through create_job would dominate the run
+        store = create_job_store(data_path)
+        store.apply_batch(
+            [{**template, "id": f"job-{i}", "kieTaskId": None} for i in range(size)], ["template"]
+        )
+        store.close()
+
+        manager = JobManager()
+        job_ids = [f"job-{random.randrange(size)}" for _ in range(updates)]
+        latencies = []
+        for i, job_id in enumerate(job_ids):
+            started = time.perf_counter_ns()
+            await manager.update_job(job_id, {"progress": i})
+            latencies.append(time.perf_counter_ns() - started)
+
+        dirty = len(manager._dirty)
+        started = time.perf_counter()
+        await manager.flush()
+        flush_seconds = time.perf_counter() - started
+        await manager.close()
+
+    latencies.sort()
+    print(
+        f"{size:>7} jobs: update_job p50 {latencies[len(latencies) // 2] / 1000:7.1f} us"
+        f"  p99 {latencies[int(len(latencies) * 0.99)] / 1000:7.1f} us"
+        f"  mean {statistics.mean(latencies) / 1000:7.1f} us"
+        f" | flush {dirty} jobs in {flush_seconds * 1000:7.1f} ms"
+        f" ({flush_seconds / max(dirty, 1) * 1e6:5.1f} us/job)"
+    )
+
+
+async def main(updates: int):
+    for size in SIZES:
+        await bench(size, updates)
+
+
+if __name__ == "__main__":
+    asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else 5000))
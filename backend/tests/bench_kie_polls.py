@@ -0,0 +1,106 @@
+"""
+Latency and client CPU per status poll against the local Kie.ai stub:
+KieClient's pooled session versus a new ClientSession (and connection)
+per poll, as before the pool.
+
+The stub runs in a separate process so CPU time is the client's alone.
+No TLS is involved locally, so the handshake saving against the real API
+is larger than shown here.
+
+Not collected by pytest; run from backend/:
+
+    python -m tests.bench_kie_polls [polls] [concurrency]
+"""
+import asyncio
+import multiprocessing
+import os
+import sys
+import time
+
+os.environ.setdefault("KIE_API_KEY", "bench-key")
+os.environ.pop("KIE_CALLBACK_URL", None)
+
+import aiohttp  # noqa: E402
+
+from app.services.kie_client import KieClient  # noqa: E402
+from tests.kie_stub import stub_kie  # noqa: E402
+
+
+def _serve(ports: multiprocessing.Queue, stop: multiprocessing.Event):
+    async def main():
+        async with stub_kie() as (_, base_url):
+            ports.put(base_url)
+            while not stop.is_set():
+                await asyncio.sleep(0.1)
+
+    asyncio.run(main())
+
+
+async def _run(poll, polls: int, concurrency: int):
+    """Run `polls` calls of poll(i), `concurrency` at a time. Returns (latencies, cpu seconds)."""
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+
+    async def one(i: int):
+        async with semaphore:
+            started = time.perf_counter()
+            await poll(i)
+            latencies.append(time.perf_counter() - started)
+
+    cpu_started = time.process_time()
+    await asyncio.gather(*(one(i) for i in range(polls)))
+    return sorted(latencies), time.process_time() - cpu_started
+
+
+def _report(name: str, latencies, cpu: float):
+    print(
+        f"{name:<16} p50 {latencies[len(latencies) // 2] * 1000:6.2f} ms"
+        f"  p99 {latencies[int(len(latencies) * 0.99)] * 1000:6.2f} ms"
+        f"  cpu/poll {cpu / len(latencies) * 1e6:7.1f} us"
+    )
+
+
+async def bench(base_url: str, polls: int, concurrency: int):
+    client = KieClient()
+    client.API_BASE_URL = base_url
+    await client.start()
+    headers = {"Authorization": f"Bearer {client.api_key}"}
+
+    async def pooled(i: int):
+        await client.get_task_status(f"task-{i}")
+
+    async def per_call_session(i: int):
+        async with aiohttp.ClientSession() as session:
+            async with session.get(
+                f"{base_url}/api/v1/jobs/recordInfo", params={"taskId": f"task-{i}"}, headers=headers
+            ) as response:
+                await response.json()
+
+    try:
+        # Warm up both paths (imports, DNS cache, first connections)
+        await _run(pooled, 50, concurrency)
+        await _run(per_call_session, 50, concurrency)
+
+        print(f"{polls} polls, {concurrency} concurrent")
+        _report("pooled session", *await _run(pooled, polls, concurrency))
+        _report("session per poll", *await _run(per_call_session, polls, concurrency))
+    finally:
+        await client.close()
+
+
+def main():
+    polls = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    concurrency = int(sys.argv[2]) if len(sys.argv) > 2 else 1
+
+    ports, stop = multiprocessing.Queue(), multiprocessing.Event()
+    server = multiprocessing.Process(target=_serve, args=(ports, stop), daemon=True)
+    server.start()
+    try:
+        asyncio.run(bench(ports.get(timeout=10), polls, concurrency))
+    finally:
+        stop.set()
+        server.join(timeout=5)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+"""
+Concurrent scrub/seek requests against the media router over a real
+uvicorn server, with a plain StaticFiles mount of the same files (how
+videos were served before) as the baseline.
+
+Each scrub is a 64 KiB Range request at a random offset of a 32 MiB video;
+thumbnail requests revalidate with If-None-Match, as a browser would.
+
+Not collected by pytest; run from backend/:
+
+    python -m tests.bench_media_seeks [requests] [concurrency]
+"""
+import asyncio
+import multiprocessing
+import os
+import random
+import socket
+import sys
+import tempfile
+import time
+
+import aiohttp
+
+VIDEO_BYTES = 32 * 1024 * 1024
+SEEK_BYTES = 64 * 1024
+
+
+def _serve(data_path: str, port: int):
+    os.environ["DATA_PATH"] = data_path
+    os.environ.setdefault("KIE_API_KEY", "bench-key")
+
+    import uvicorn
+    from fastapi import FastAPI
+    from fastapi.staticfiles import StaticFiles
+
+    from app.api import media
+
+    app = FastAPI()
+    app.include_router(media.router)
+    app.mount("/static", StaticFiles(directory=f"{data_path}/videos"), name="static")
+    uvicorn.run(app, host="127.0.0.1", port=port, log_level="warning", access_log=False)
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+async def _run(session: aiohttp.ClientSession, request, count: int, concurrency: int):
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+
+    async def one():
+        async with semaphore:
+            started = time.perf_counter()
+            await request(session)
+            latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(count)))
+    return sorted(latencies), time.perf_counter() - started
+
+
+def _report(name: str, latencies, wall: float):
+    print(
+        f"{name:<28} {len(latencies) / wall:8,.0f} req/s"
+        f"  p50 {latencies[len(latencies) // 2] * 1000:6.2f} ms"
+        f"  p99 {latencies[int(len(latencies) * 0.99)] * 1000:6.2f} ms"
+    )
+
+
+async def bench(base_url: str, count: int, concurrency: int):
+    def seek(prefix: str):
+        async def request(session):
+            start = random.randrange(0, VIDEO_BYTES - SEEK_BYTES)
+            headers = {"Range": f"bytes={start}-{start + SEEK_BYTES - 1}"}
+            async with session.get(f"{base_url}{prefix}/job-1/video.mp4", headers=headers) as response:
+                assert response.status == 206
+                assert len(await response.read()) == SEEK_BYTES
+        return request
+
+    async def etag_of(session, url):
+        async with session.get(url) as response:
+            await response.read()
+            return response.headers.get("ETag")
+
+    def thumbnail(prefix: str, etag: str):
+        async def request(session):
+            async with session.get(
+                f"{base_url}{prefix}/job-1/thumbnail.jpg", headers={"If-None-Match": etag}
+            ) as response:
+                await response.read()
+                assert response.status == 304
+        return request
+
+    connector = aiohttp.TCPConnector(limit=concurrency)
+    async with aiohttp.ClientSession(connector=connector) as session:
+        # Wait for uvicorn to start listening
+        for _ in range(100):
+            try:
+                async with session.get(f"{base_url}/static/job-1/thumbnail.jpg") as response:
+                    if response.status == 200:
+                        break
+            except aiohttp.ClientConnectionError:
+                pass
+            await asyncio.sleep(0.1)
+
+        media_etag = await etag_of(session, f"{base_url}/videos/job-1/thumbnail.jpg")
+        static_etag = await etag_of(session, f"{base_url}/static/job-1/thumbnail.jpg")
+
+        print(f"{count} requests, {concurrency} concurrent")
+        for name, request in (
+            ("seek: media router", seek("/videos")),
+            ("seek: StaticFiles", seek("/static")),
+            ("thumbnail 304: media router", thumbnail("/videos", media_etag)),
+            ("thumbnail 304: StaticFiles", thumbnail("/static", static_etag)),
+        ):
+            await _run(session, request, min(count, 100), concurrency)  # warm up
+            _report(name, *await _run(session, request, count, concurrency))
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    concurrency = int(sys.argv[2]) if len(sys.argv) > 2 else 32
+
+    with tempfile.TemporaryDirectory(prefix="bench-media-seeks-") as data_path:
+        os.makedirs(f"{data_path}/videos/job-1")
+        with open(f"{data_path}/videos/job-1/video.mp4", "wb") as f:
+            f.write(os.urandom(VIDEO_BYTES))
+        with open(f"{data_path}/videos/job-1/thumbnail.jpg", "wb") as f:
+            f.write(b"\xff\xd8\xff" + os.urandom(30 * 1024))
+
+        port = _free_port()
+        server = multiprocessing.Process(target=_serve, args=(data_path, port), daemon=True)
+        server.start()
+        try:
+            asyncio.run(bench(f"http://127.0.0.1:{port}", count, concurrency))
+        finally:
+            server.terminate()
+            server.join(timeout=5)
+
+
+if __name__ == "__main__":
+    main()
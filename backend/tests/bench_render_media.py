@@ -0,0 +1,86 @@
+"""
+Frames decoded per second per core by render_media: one single-threaded
+pass on its own, then a process pool with one worker per core.
+
+Uses a synthetic clip unless a video path is given. Not collected by
+pytest; run from backend/:
+
+    python -m tests.bench_render_media [video.mp4]
+"""
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import cv2
+import numpy as np
+
+from app.services.media import render_media
+
+WIDTH, HEIGHT, FPS, SECONDS = 1280, 720, 24, 10
+
+
+def _single_threaded():
+    # One core per render, so frames/s divides cleanly by cores
+    cv2.setNumThreads(1)
+
+
+def _write_clip(path: str):
+    """A 720p clip of moving gradients, so every frame differs."""
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*"mp4v"), FPS, (WIDTH, HEIGHT))
+    x = np.linspace(0, 255, WIDTH, dtype=np.float32)
+    y = np.linspace(0, 255, HEIGHT, dtype=np.float32)[:, None]
+    for i in range(FPS * SECONDS):
+        frame = np.empty((HEIGHT, WIDTH, 3), dtype=np.uint8)
+        frame[..., 0] = (x + i * 4) % 256
+        frame[..., 1] = (y + i * 2) % 256
+        frame[..., 2] = ((x + y) / 2 + i) % 256
+        writer.write(frame)
+    writer.release()
+
+
+def _frame_count(path: str) -> int:
+    video = cv2.VideoCapture(path)
+    count = int(video.get(cv2.CAP_PROP_FRAME_COUNT) or 0)
+    video.release()
+    return count
+
+
+def _render(video_path: str) -> float:
+    """Render into a scratch directory; returns the CPU seconds it took."""
+    with tempfile.TemporaryDirectory(prefix="bench-media-") as output_dir:
+        started = time.process_time()
+        render_media(video_path, output_dir)
+        return time.process_time() - started
+
+
+def main():
+    with tempfile.TemporaryDirectory(prefix="bench-media-src-") as source_dir:
+        video_path = sys.argv[1] if len(sys.argv) > 1 else os.path.join(source_dir, "clip.mp4")
+        if len(sys.argv) <= 1:
+            _write_clip(video_path)
+        frames = _frame_count(video_path)
+
+        _single_threaded()
+        _render(video_path)  # warm up codecs and page cache
+        wall_started = time.perf_counter()
+        cpu = _render(video_path)
+        wall = time.perf_counter() - wall_started
+        print(f"{frames} frames: one render {wall:.2f} s wall, {cpu:.2f} s CPU"
+              f" -> {frames / cpu:,.0f} frames/s per core")
+
+        cores = os.cpu_count() or 1
+        renders = cores * 2
+        with ProcessPoolExecutor(max_workers=cores, initializer=_single_threaded) as pool:
+            list(pool.map(_render, [video_path] * cores))  # warm up every worker
+            wall_started = time.perf_counter()
+            cpu = sum(pool.map(_render, [video_path] * renders))
+            wall = time.perf_counter() - wall_started
+        print(f"{renders} renders on {cores} workers: {frames * renders / wall:,.0f} frames/s total,"
+              f" {frames * renders / wall / cores:,.0f} frames/s per core"
+              f" ({frames * renders / cpu:,.0f} per CPU second)")
+
+
+if __name__ == "__main__":
+    main()
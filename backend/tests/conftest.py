@@ -0,0 +1,17 @@
+import os
+import tempfile
+
+import pytest
+
+# The app reads its settings from the environment at import time
+os.environ.setdefault("KIE_API_KEY", "test-key")
+os.environ.setdefault("DATA_PATH", tempfile.mkdtemp(prefix="fight-video-tests-"))
+os.environ.setdefault("MEDIA_POOL", "thread")
+os.environ.setdefault("IMAGE_POOL", "thread")
+
+
+@pytest.fixture
+def data_path(tmp_path, monkeypatch):
+    """A fresh DATA_PATH for managers and stores created by the test."""
+    monkeypatch.setenv("DATA_PATH", str(tmp_path))
+    return str(tmp_path)
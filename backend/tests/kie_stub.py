@@ -0,0 +1,76 @@
+"""Local Kie.ai stand-in shared by the offline tests."""
+from contextlib import asynccontextmanager
+from typing import Dict, List
+
+from aiohttp import web
+
+# A scripted fault: an HTTP status (with optional Retry-After), or DROP to cut the connection
+DROP = "drop"
+
+
+class StubKie:
+    """
+    Minimal Kie.ai stand-in that answers from a script of faults, then succeeds.
+
+    Tasks report "generating" unless a record is set for them in `records`;
+    `files` are served under /files/<name> for result URLs.
+    """
+
+    def __init__(self):
+        self.script: List = []
+        self.hits = 0
+        self.records: Dict[str, Dict] = {}
+        self.files: Dict[str, bytes] = {}
+
+    def fail(self, *faults):
+        self.script.extend(faults)
+
+    async def _next_fault(self, request: web.Request):
+        self.hits += 1
+        if not self.script:
+            return None
+        fault = self.script.pop(0)
+        if fault == DROP:
+            request.transport.abort()
+            return web.Response()
+        status, retry_after = fault if isinstance(fault, tuple) else (fault, None)
+        headers = {"Retry-After": str(retry_after)} if retry_after is not None else {}
+        return web.Response(status=status, text="injected fault", headers=headers)
+
+    async def record_info(self, request: web.Request):
+        fault = await self._next_fault(request)
+        if fault is not None:
+            return fault
+        task_id = request.query["taskId"]
+        record = self.records.get(task_id, {"state": "generating"})
+        return web.json_response({"code": 200, "data": {"taskId": task_id, **record}})
+
+    async def create_task(self, request: web.Request):
+        fault = await self._next_fault(request)
+        if fault is not None:
+            return fault
+        return web.json_response({"code": 200, "data": {"taskId": "task-1"}})
+
+    async def file(self, request: web.Request):
+        body = self.files.get(request.match_info["name"])
+        if body is None:
+            return web.Response(status=404)
+        return web.Response(body=body, content_type="video/mp4")
+
+
+@asynccontextmanager
+async def stub_kie():
+    stub = StubKie()
+    app = web.Application()
+    app.router.add_get("/api/v1/jobs/recordInfo", stub.record_info)
+    app.router.add_post("/api/v1/jobs/createTask", stub.create_task)
+    app.router.add_get("/files/{name}", stub.file)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    try:
+        yield stub, f"http://127.0.0.1:{port}"
+    finally:
+        await runner.cleanup()
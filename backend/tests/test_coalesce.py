@@ -0,0 +1,58 @@
+"""Concurrent callers for the same key share one run through upload_cache.coalesce."""
+import asyncio
+
+from app.services.upload_cache import UploadCache, coalesce
+
+
+def test_concurrent_callers_share_one_run():
+    runs = []
+
+    async def work():
+        runs.append(1)
+        await asyncio.sleep(0.01)
+        return "result"
+
+    async def scenario():
+        inflight = {}
+        results = await asyncio.gather(*[coalesce(inflight, "key", work) for _ in range(20)])
+        assert results == ["result"] * 20
+        assert inflight == {}
+        # A later call starts a new run
+        assert await coalesce(inflight, "key", work) == "result"
+
+    asyncio.run(scenario())
+    assert len(runs) == 2
+
+
+def test_errors_reach_every_waiter():
+    async def work():
+        await asyncio.sleep(0.01)
+        raise ValueError("boom")
+
+    async def scenario():
+        inflight = {}
+        results = await asyncio.gather(*[coalesce(inflight, "key", work) for _ in range(5)], return_exceptions=True)
+        assert all(isinstance(result, ValueError) for result in results)
+        assert inflight == {}
+
+    asyncio.run(scenario())
+
+
+def test_upload_cache_uploads_identical_files_once(tmp_path):
+    image = tmp_path / "image.png"
+    image.write_bytes(b"same content")
+    uploads = []
+
+    async def upload(file_path, upload_path):
+        uploads.append(file_path)
+        await asyncio.sleep(0.01)
+        return "https://files.example/image.png"
+
+    async def scenario():
+        cache = UploadCache(str(tmp_path / "cache.json"), ttl=3600)
+        urls = await asyncio.gather(*[cache.get_or_upload(str(image), "images", upload) for _ in range(10)])
+        assert set(urls) == {"https://files.example/image.png"}
+        assert await cache.get_or_upload(str(image), "images", upload) == urls[0]
+
+    asyncio.run(scenario())
+    assert len(uploads) == 1
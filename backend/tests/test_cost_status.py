@@ -0,0 +1,35 @@
+"""Timeouts are classified for cost accounting from failureReason, never from the error text."""
+import asyncio
+
+from app.services.cost_ledger import cost_status
+from app.services.job_manager import JobManager
+
+
+def test_cost_status_uses_failure_reason():
+    assert cost_status({"status": "failed", "failureReason": "timeout", "error": "anything"}) == "timed_out"
+    assert cost_status({"status": "failed", "error": "Generation failed: upstream timeout"}) == "failed"
+    assert cost_status({"status": "completed"}) == "completed"
+    assert cost_status({"status": "generating"}) == "in_progress"
+
+
+def test_poll_timeout_sets_failure_reason(data_path):
+    async def scenario():
+        manager = JobManager()
+        try:
+            for job_id in ("timed-out", "failed"):
+                await manager.create_job(job_id, "sora2", "a", "b", "prompt", "custom", {}, {"duration": 5})
+                await manager.update_job(job_id, {"status": "generating", "kieTaskId": f"task-{job_id}"})
+
+            await manager._on_poll_timeout("timed-out")
+            await manager._apply_task_status("failed", {"state": "fail", "failMsg": "Kie.ai timeout"})
+
+            timed_out = await manager.get_job("timed-out")
+            failed = await manager.get_job("failed")
+            assert (timed_out.status, timed_out.failureReason) == ("failed", "timeout")
+            assert (failed.status, failed.failureReason) == ("failed", None)
+            assert cost_status(manager._jobs["timed-out"]) == "timed_out"
+            assert cost_status(manager._jobs["failed"]) == "failed"
+        finally:
+            await manager.close()
+
+    asyncio.run(scenario())
@@ -0,0 +1,132 @@
+"""faststart: moov relocation of OpenCV output, and the files it must leave alone."""
+import hashlib
+import os
+import struct
+
+import cv2
+import numpy as np
+import pytest
+
+from app.services.faststart import faststart
+
+FRAMES = 12
+
+
+def box(box_type: bytes, payload: bytes = b"") -> bytes:
+    return struct.pack(">I4s", 8 + len(payload), box_type) + payload
+
+
+def stco_moov(*offsets: int) -> bytes:
+    """A moov whose only content is one stco table with the given chunk offsets."""
+    stco = box(b"stco", b"\0\0\0\0" + struct.pack(">I", len(offsets)) + b"".join(struct.pack(">I", o) for o in offsets))
+    for container in (b"stbl", b"minf", b"mdia", b"trak", b"moov"):
+        stco = box(container, stco)
+    return stco
+
+
+def top_level_types(path: str):
+    types = []
+    with open(path, "rb") as f:
+        size = os.path.getsize(path)
+        position = 0
+        while position + 8 <= size:
+            f.seek(position)
+            box_size, box_type = struct.unpack(">I4s", f.read(8))
+            if box_size == 1:
+                box_size = struct.unpack(">Q", f.read(8))[0]
+            types.append(box_type)
+            position += box_size
+    return types
+
+
+def decode_frames(path: str):
+    capture = cv2.VideoCapture(path)
+    frames = []
+    while True:
+        ok, frame = capture.read()
+        if not ok:
+            break
+        frames.append(frame)
+    capture.release()
+    return frames
+
+
+def read(path: str) -> bytes:
+    with open(path, "rb") as f:
+        return f.read()
+
+
+@pytest.fixture
+def opencv_video(tmp_path):
+    """A short clip written by OpenCV, which puts moov after mdat."""
+    path = str(tmp_path / "video.mp4")
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*"mp4v"), 24, (64, 48))
+    for i in range(FRAMES):
+        frame = np.zeros((48, 64, 3), dtype=np.uint8)
+        frame[:, : (i + 1) * 5] = (40 * (i % 6), 255 - 20 * i, 20 * i)
+        writer.write(frame)
+    writer.release()
+    types = top_level_types(path)
+    assert types.index(b"moov") > types.index(b"mdat")
+    return path
+
+
+def test_moves_moov_in_front_without_changing_frames(opencv_video):
+    before = decode_frames(opencv_video)
+    size = os.path.getsize(opencv_video)
+
+    digest = faststart(opencv_video)
+
+    assert digest == hashlib.sha256(read(opencv_video)).hexdigest()
+    assert os.path.getsize(opencv_video) == size
+    types = top_level_types(opencv_video)
+    assert types.index(b"moov") < types.index(b"mdat")
+    after = decode_frames(opencv_video)
+    assert len(after) == len(before) == FRAMES
+    assert all(np.array_equal(a, b) for a, b in zip(before, after))
+
+
+def test_already_faststart_file_is_unchanged(opencv_video):
+    assert faststart(opencv_video)
+    content = read(opencv_video)
+    assert faststart(opencv_video) is None
+    assert read(opencv_video) == content
+
+
+def test_fragmented_file_is_unchanged(tmp_path):
+    path = str(tmp_path / "fragmented.mp4")
+    content = box(b"ftyp", b"isom\0\0\0\0") + box(b"mdat", b"\0" * 64) + box(b"moof", b"\0" * 16) + stco_moov(24)
+    with open(path, "wb") as f:
+        f.write(content)
+    assert faststart(path) is None
+    assert read(path) == content
+
+
+def test_truncated_file_is_unchanged(opencv_video):
+    content = read(opencv_video)[:-100]
+    with open(opencv_video, "wb") as f:
+        f.write(content)
+    assert faststart(opencv_video) is None
+    assert read(opencv_video) == content
+
+
+def test_stco_overflow_leaves_file_unchanged(tmp_path):
+    """A chunk just under 4 GiB would be pushed past what a 32-bit stco offset can hold."""
+    path = str(tmp_path / "large.mp4")
+    ftyp = box(b"ftyp", b"isom\0\0\0\0")
+    mdat_size = 2 ** 32
+    moov = stco_moov(0xFFFFFFFF - 8)
+    with open(path, "wb") as f:
+        f.write(ftyp)
+        # 64-bit mdat header; the payload is left sparse
+        f.write(struct.pack(">I4sQ", 1, b"mdat", mdat_size))
+        f.seek(len(ftyp) + mdat_size)
+        f.write(moov)
+    stat = os.stat(path)
+
+    assert faststart(path) is None
+    assert os.stat(path).st_mtime_ns == stat.st_mtime_ns
+    assert not os.path.exists(f"{path}.faststart")
+    with open(path, "rb") as f:
+        f.seek(len(ftyp) + mdat_size)
+        assert f.read() == moov
@@ -0,0 +1,30 @@
+"""Custom image ids from generate requests must name an image in the library."""
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.api import generate
+
+TRAVERSAL_IDS = ["../../../etc/passwd", "..", "thumbs", "/etc/passwd", "missing.png"]
+
+
+@pytest.fixture
+def client():
+    app = FastAPI()
+    app.include_router(generate.router, prefix="/api")
+    with TestClient(app) as client:
+        yield client
+
+
+@pytest.mark.parametrize("image_id", TRAVERSAL_IDS)
+def test_generate_rejects_ids_outside_the_library(client, image_id):
+    response = client.post("/api/generate", json={"customImageId": image_id, "prompt": "fight"})
+    assert response.status_code == 404
+
+
+def test_batch_rejects_ids_outside_the_library(client):
+    response = client.post("/api/generate/batch", json={
+        "sweep": {"prompts": ["fight"], "customImageIds": TRAVERSAL_IDS},
+    })
+    assert response.status_code == 404
+    assert "../../../etc/passwd" in response.json()["detail"]
@@ -0,0 +1,39 @@
+"""ImageLibrary indexing and cursor pagination."""
+import asyncio
+import os
+
+import pytest
+from PIL import Image
+
+from app.services.image_library import ImageLibrary
+from app.services.upload_cache import file_sha256
+
+
+def test_pages_newest_first_with_cursors(tmp_path):
+    images_path = str(tmp_path / "custom-images")
+
+    async def scenario():
+        library = ImageLibrary(images_path)
+        try:
+            for i in range(5):
+                path = os.path.join(images_path, f"image-{i}.png")
+                Image.new("RGB", (40 + i, 30), (i * 40, 0, 0)).save(path)
+                os.utime(path, (1_700_000_000 + i, 1_700_000_000 + i))
+                record = await library.add(f"image-{i}.png")
+                assert record["sha256"] == file_sha256(path)
+                assert (record["width"], record["height"]) == (40 + i, 30)
+
+            seen, cursor = [], None
+            while True:
+                page, cursor = await library.page(cursor=cursor, limit=2)
+                seen += [record["id"] for record in page]
+                if cursor is None:
+                    break
+            assert seen == [f"image-{i}.png" for i in reversed(range(5))]
+
+            with pytest.raises(ValueError):
+                await library.page(cursor="not-a-cursor", limit=2)
+        finally:
+            await library.close()
+
+    asyncio.run(scenario())
@@ -0,0 +1,113 @@
+import asyncio
+import random
+
+from app.services.job_manager import JobManager
+
+JOBS = 100
+UPDATES_PER_JOB = 40
+
+
+async def _create_jobs(manager: JobManager, count: int):
+    for i in range(count):
+        await manager.create_job(f"job-{i}", "sora2", "a", "b", "prompt", "fighters", {}, {"duration": 10})
+
+
+def test_interleaved_updates_are_not_lost(data_path):
+    """Thousands of interleaved update_job calls: every field lands, in memory and in the store."""
+
+    async def scenario():
+        manager = JobManager()
+        await _create_jobs(manager, JOBS)
+
+        async def writer(job_id: str, field: int):
+            # Yield at random points so writers for the same job interleave
+            for _ in range(random.randint(0, 3)):
+                await asyncio.sleep(0)
+            await manager.update_job(job_id, {f"field{field}": field, "error": f"{job_id}:{field}"})
+            if random.random() < 0.05:
+                await manager.flush()
+
+        writers = [writer(f"job-{i}", field) for i in range(JOBS) for field in range(UPDATES_PER_JOB)]
+        random.shuffle(writers)
+        await asyncio.gather(*writers)
+        await manager.close()
+
+        for i in range(JOBS):
+            job_data = manager._jobs[f"job-{i}"]
+            assert all(job_data[f"field{field}"] == field for field in range(UPDATES_PER_JOB))
+
+        # Everything made it through the write-behind flush
+        reloaded = JobManager()
+        try:
+            for i in range(JOBS):
+                job_data = reloaded._jobs[f"job-{i}"]
+                assert all(job_data.get(f"field{field}") == field for field in range(UPDATES_PER_JOB))
+        finally:
+            await reloaded.close()
+
+    asyncio.run(scenario())
+
+
+def test_compare_and_set_applies_one_transition(data_path):
+    """Racing transitions guarded by expected_status: exactly one wins per job."""
+
+    async def scenario():
+        manager = JobManager()
+        await _create_jobs(manager, JOBS)
+        for i in range(JOBS):
+            await manager.update_job(f"job-{i}", {"status": "generating"})
+
+        async def transition(job_id: str, contender: int):
+            await asyncio.sleep(0)
+            status = random.choice(["downloading", "failed"])
+            applied = await manager.update_job(
+                job_id, {"status": status, "error": f"contender-{contender}"}, expected_status=("generating",)
+            )
+            return job_id, contender, status, applied
+
+        results = await asyncio.gather(*(
+            transition(f"job-{i}", contender) for i in range(JOBS) for contender in range(20)
+        ))
+        try:
+            for i in range(JOBS):
+                winners = [r for r in results if r[0] == f"job-{i}" and r[3]]
+                assert len(winners) == 1
+                _, contender, status, _ = winners[0]
+                job = await manager.get_job(f"job-{i}")
+                assert job.status == status
+                assert job.error == f"contender-{contender}"
+        finally:
+            await manager.close()
+
+    asyncio.run(scenario())
+
+
+def test_finalize_job_runs_download_once(data_path):
+    """Concurrent success reports (poller, callback, recovery) start one download per job."""
+
+    async def scenario():
+        manager = JobManager()
+        await _create_jobs(manager, 20)
+        downloads = []
+
+        async def fake_workflow(job_id, stage, checkpoint):
+            downloads.append((job_id, stage, checkpoint["videoUrl"]))
+            await asyncio.sleep(0.01)
+            await manager.update_job(job_id, {"status": "completed"}, expected_status=("downloading",))
+
+        manager._run_workflow = fake_workflow
+        for i in range(20):
+            await manager.update_job(f"job-{i}", {"status": "generating", "kieTaskId": f"task-{i}"})
+
+        status_data = {"state": "success", "resultJson": '{"resultUrls": ["https://example.com/v.mp4"]}'}
+        results = await asyncio.gather(*(
+            manager._finalize_job(f"job-{i}", status_data) for i in range(20) for _ in range(10)
+        ))
+        try:
+            assert sorted(job_id for job_id, _, _ in downloads) == sorted(f"job-{i}" for i in range(20))
+            assert all(stage == "download" for _, stage, _ in downloads)
+            assert set(results) == {"completed"}
+        finally:
+            await manager.close()
+
+    asyncio.run(scenario())
@@ -0,0 +1,40 @@
+"""Cursor pagination of JobManager.query_jobs matches a full filtered scan."""
+import asyncio
+import random
+
+import pytest
+
+from app.services.job_manager import JobManager
+
+
+@pytest.mark.parametrize("status, model, limit", [(None, None, 7), (None, "sora2", 50), ("failed", "runway", 1)])
+def test_cursor_pages_cover_every_match_once(data_path, status, model, limit):
+    async def scenario():
+        manager = JobManager()
+        try:
+            rng = random.Random(13)
+            for i in range(500):
+                await manager.create_job(
+                    f"job-{i}", rng.choice(["sora2", "runway"]), "a", "b", "prompt", "custom", {}, {"duration": 5}
+                )
+                await manager.update_job(f"job-{i}", {"status": rng.choice(["pending", "failed"])})
+                # Plenty of identical timestamps, so the id tie-break matters
+                manager._jobs[f"job-{i}"]["updatedAt"] = f"2026-01-01T00:00:{rng.randint(0, 20):02d}"
+            manager._version += 1
+
+            seen, cursor = [], None
+            while True:
+                page, cursor, _ = manager.query_jobs(status=status, model=model, cursor=cursor, limit=limit)
+                seen += [job_data["id"] for job_data in page]
+                if cursor is None:
+                    break
+
+            expected = [
+                job_data["id"] for job_data in manager._sorted_jobs()
+                if (status is None or job_data["status"] == status) and (model is None or job_data["model"] == model)
+            ]
+            assert seen == expected
+        finally:
+            await manager.close()
+
+    asyncio.run(scenario())
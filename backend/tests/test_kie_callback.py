@@ -0,0 +1,92 @@
+"""/api/kie/callback against a local Kie.ai stub: callers are authenticated and results come from Kie.ai."""
+import asyncio
+import json
+import os
+
+import httpx
+import pytest
+from fastapi import FastAPI
+
+from app.api import callbacks
+from app.services.job_manager import JobManager
+from tests.kie_stub import stub_kie
+
+TOKEN = "callback-secret"
+VIDEO = b"video bytes from kie.ai"
+
+
+@pytest.fixture
+def callback_env(data_path, monkeypatch):
+    monkeypatch.setenv("KIE_CALLBACK_URL", "https://example.test/api/kie/callback")
+    monkeypatch.setenv("KIE_CALLBACK_TOKEN", TOKEN)
+    monkeypatch.setenv("VIDEO_FASTSTART", "false")
+    return monkeypatch
+
+
+def test_callbacks_are_authenticated_and_resolved_against_kie(callback_env):
+    async def scenario():
+        async with stub_kie() as (stub, base_url):
+            manager = JobManager()
+            manager.kie_client.API_BASE_URL = base_url
+            await manager.kie_client.start()
+            await manager.start()
+            callback_env.setattr(callbacks, "job_manager", manager)
+
+            checked = []
+            check_now = manager.poller.check_now
+            manager.poller.check_now = lambda task_id: checked.append(task_id) or check_now(task_id)
+
+            app = FastAPI()
+            app.include_router(callbacks.router, prefix="/api")
+            transport = httpx.ASGITransport(app=app)
+            try:
+                await manager.create_job("job-1", "sora2", "a", "b", "prompt", "custom", {}, {"duration": 5})
+                await manager.update_job("job-1", {"status": "generating", "kieTaskId": "task-1"})
+                stub.records["task-1"] = {
+                    "state": "success",
+                    "resultJson": json.dumps({"resultUrls": [f"{base_url}/files/video.mp4"]}),
+                }
+                stub.files["video.mp4"] = VIDEO
+                # The callback body claims a different result; it must be ignored
+                forged = {"data": {
+                    "taskId": "task-1",
+                    "state": "success",
+                    "resultJson": json.dumps({"resultUrls": ["http://attacker.invalid/video.mp4"]}),
+                }}
+
+                async with httpx.AsyncClient(transport=transport, base_url="http://app") as client:
+                    for params in ({"token": "wrong"}, {"token": ""}, {}):
+                        response = await client.post("/api/kie/callback", params=params, json=forged)
+                        assert response.status_code == 403
+                    assert checked == [] and stub.hits == 0
+
+                    response = await client.post(
+                        "/api/kie/callback", params={"token": TOKEN}, json={"data": {"taskId": "unknown"}}
+                    )
+                    assert response.status_code == 404
+                    assert stub.hits == 0
+
+                    response = await client.post("/api/kie/callback", params={"token": TOKEN}, json=forged)
+                    assert response.status_code == 200
+                    # Not polled yet, so it is registered and checked right away
+                    assert checked and set(checked) == {"task-1"}
+
+                for _ in range(500):
+                    job = await manager.get_job("job-1")
+                    if job.status not in ("generating", "downloading"):
+                        break
+                    await asyncio.sleep(0.01)
+
+                assert job.status == "completed", job.error
+                # Finalized from the stub's recordInfo, not from the callback body
+                assert stub.hits >= 1
+                video_dir = os.path.join(manager.base_path, "videos", "job-1")
+                with open(os.path.join(video_dir, "video.mp4"), "rb") as f:
+                    assert f.read() == VIDEO
+                with open(os.path.join(video_dir, "metadata.json")) as f:
+                    assert json.load(f)["kieVideoUrl"] == f"{base_url}/files/video.mp4"
+            finally:
+                await manager.close()
+                await manager.kie_client.close()
+
+    asyncio.run(scenario())
@@ -0,0 +1,158 @@
+"""Retry, Retry-After and circuit breaker behaviour of KieClient against a local fault-injecting stub."""
+import asyncio
+import time
+
+import pytest
+
+from app.services.kie_client import KieClient, KieAPIError, KieRateLimitError
+from app.services.retry import CircuitOpenError
+from tests.kie_stub import DROP, stub_kie
+
+
+@pytest.fixture
+def retry_env(monkeypatch):
+    monkeypatch.setenv("KIE_RETRY_MAX_ATTEMPTS", "4")
+    monkeypatch.setenv("KIE_RETRY_BASE_DELAY", "0.01")
+    monkeypatch.setenv("KIE_RETRY_MAX_DELAY", "1")
+    monkeypatch.setenv("KIE_BREAKER_THRESHOLD", "100")
+    monkeypatch.setenv("KIE_BREAKER_RESET_SECONDS", "0.3")
+    monkeypatch.delenv("KIE_CALLBACK_URL", raising=False)
+    return monkeypatch
+
+
+def run_with_client(scenario):
+    async def main():
+        async with stub_kie() as (stub, base_url):
+            client = KieClient()
+            client.API_BASE_URL = base_url
+            await client.start()
+            try:
+                await scenario(client, stub)
+            finally:
+                await client.close()
+
+    asyncio.run(main())
+
+
+def test_transient_errors_are_retried(retry_env):
+    async def scenario(client, stub):
+        stub.fail(503, DROP, 502)
+        data = await client.get_task_status("t1")
+        assert data["taskId"] == "t1"
+        assert stub.hits == 4
+        assert client.breaker.state == "closed"
+
+    run_with_client(scenario)
+
+
+def test_fatal_errors_are_not_retried(retry_env):
+    async def scenario(client, stub):
+        stub.fail(401)
+        with pytest.raises(KieAPIError) as raised:
+            await client.get_task_status("t1")
+        assert raised.value.status == 401
+        assert stub.hits == 1
+
+    run_with_client(scenario)
+
+
+def test_gives_up_after_max_attempts(retry_env):
+    async def scenario(client, stub):
+        stub.fail(*[503] * 10)
+        with pytest.raises(KieAPIError):
+            await client.get_task_status("t1")
+        assert stub.hits == 4
+
+    run_with_client(scenario)
+
+
+def test_retry_after_is_honoured(retry_env):
+    async def scenario(client, stub):
+        stub.fail((429, 0.4))
+        started = time.monotonic()
+        await client.get_task_status("t1")
+        assert time.monotonic() - started >= 0.4
+        assert stub.hits == 2
+
+    run_with_client(scenario)
+
+
+def test_rate_limits_do_not_open_the_circuit(retry_env):
+    retry_env.setenv("KIE_BREAKER_THRESHOLD", "2")
+
+    async def scenario(client, stub):
+        stub.fail(*[(429, 0)] * 3)
+        await client.get_task_status("t1")
+        assert client.breaker.state == "closed"
+
+    run_with_client(scenario)
+
+
+def test_submissions_are_not_retried_once_sent(retry_env):
+    async def scenario(client, stub):
+        stub.fail(503)
+        with pytest.raises(KieAPIError):
+            await client.generate_video("prompt", model="sora2")
+        assert stub.hits == 1
+
+        stub.fail(429)
+        with pytest.raises(KieRateLimitError):
+            await client.generate_video("prompt", model="sora2")
+        assert stub.hits == 2
+
+    run_with_client(scenario)
+
+
+def test_circuit_opens_fails_fast_and_recovers(retry_env):
+    retry_env.setenv("KIE_BREAKER_THRESHOLD", "3")
+
+    async def scenario(client, stub):
+        # Three failures open the circuit; the fourth attempt fails fast instead of calling Kie.ai
+        stub.fail(503, 503, 503)
+        with pytest.raises(CircuitOpenError):
+            await client.get_task_status("t1")
+        assert stub.hits == 3
+        assert client.breaker.state == "open"
+
+        # While open, calls fail immediately without reaching the server or sleeping
+        started = time.monotonic()
+        results = await client.get_task_statuses([f"t{i}" for i in range(50)])
+        assert time.monotonic() - started < 0.2
+        assert all(isinstance(result, CircuitOpenError) for result in results.values())
+        assert stub.hits == 3
+
+        # After the reset timeout a single probe goes through; a failing probe reopens
+        # the circuit, so the call's retry fails fast too
+        await asyncio.sleep(0.35)
+        assert client.breaker.state == "half-open"
+        stub.fail(503)
+        with pytest.raises(CircuitOpenError):
+            await client.get_task_status("probe-1")
+        assert stub.hits == 4
+        assert client.breaker.state == "open"
+
+        # A successful probe closes it again
+        await client.breaker.wait_closed()
+        assert (await client.get_task_status("probe-2"))["taskId"] == "probe-2"
+        assert client.breaker.state == "closed"
+
+    run_with_client(scenario)
+
+
+def test_half_open_lets_one_probe_through(retry_env):
+    retry_env.setenv("KIE_BREAKER_THRESHOLD", "1")
+
+    async def scenario(client, stub):
+        stub.fail(503)
+        with pytest.raises(CircuitOpenError):
+            await client.get_task_status("t1")
+        await asyncio.sleep(0.35)
+
+        results = await client.get_task_statuses([f"t{i}" for i in range(10)])
+        probes = [r for r in results.values() if not isinstance(r, Exception)]
+        assert len(probes) == 1
+        assert all(isinstance(r, CircuitOpenError) for r in results.values() if isinstance(r, Exception))
+        assert stub.hits == 2
+        assert client.breaker.state == "closed"
+
+    run_with_client(scenario)
@@ -0,0 +1,113 @@
+"""Timeout handling of StatusPoller when status checks fail or the task is resumed."""
+import asyncio
+import time
+
+from app.services.status_poller import StatusPoller
+
+
+class FastSchedule:
+    """Checks every task again after a fixed short delay."""
+
+    def __init__(self, delay: float = 0.01):
+        self.delay = delay
+
+    def next_delay(self, model, duration, elapsed):
+        return self.delay
+
+    def record(self, model, duration, seconds):
+        pass
+
+    def observe_finished(self, polls, elapsed, generate_time):
+        pass
+
+
+class Transient(Exception):
+    pass
+
+
+def make_poller(check_status, events, timeout=0.05):
+    async def on_status(job_id, status_data):
+        events.append(("status", status_data["state"]))
+        return status_data["state"] in ("success", "fail")
+
+    async def on_timeout(job_id):
+        events.append(("timeout", job_id))
+
+    async def on_error(job_id, error):
+        events.append(("error", job_id))
+
+    poller = StatusPoller(
+        check_status, on_status, on_timeout, on_error,
+        schedule=FastSchedule(), timeout=timeout, concurrency=2,
+        is_transient=lambda e: isinstance(e, Transient),
+    )
+    # Honour the short schedule delays instead of batching them into one wakeup
+    poller.COALESCE_WINDOW = 0
+    return poller
+
+
+def test_transient_errors_never_time_a_task_out():
+    events = []
+    started = time.monotonic()
+
+    async def check_status(task_id, model):
+        # Kie.ai is unreachable for four times the timeout, then reports the task done
+        if time.monotonic() - started < 0.2:
+            raise Transient()
+        return {"state": "success"}
+
+    async def main():
+        poller = make_poller(check_status, events)
+        poller.register("job-1", "task-1", "sora2", 5)
+        # Well past the timeout, but Kie.ai hasn't answered a single check yet
+        for _ in range(200):
+            if "task-1" not in poller:
+                break
+            await asyncio.sleep(0.01)
+        await poller.close()
+
+    asyncio.run(main())
+    assert events == [("status", "success")]
+
+
+def test_times_out_after_an_answered_non_final_check():
+    events = []
+
+    async def check_status(task_id, model):
+        return {"state": "generating"}
+
+    async def main():
+        poller = make_poller(check_status, events)
+        poller.register("job-1", "task-1", "sora2", 5)
+        for _ in range(200):
+            if "task-1" not in poller:
+                break
+            await asyncio.sleep(0.01)
+        await poller.close()
+
+    asyncio.run(main())
+    assert events[-1] == ("timeout", "job-1")
+    assert all(event == ("status", "generating") for event in events[:-1])
+
+
+def test_resumed_tasks_get_a_full_poll_budget():
+    events = []
+
+    async def check_status(task_id, model):
+        return {"state": "generating"}
+
+    async def main():
+        poller = make_poller(check_status, events, timeout=0.2)
+        # Submitted long before a restart: still polled for `timeout` from now
+        poller.register("job-1", "task-1", "sora2", 5, elapsed=3600)
+        await asyncio.sleep(0.1)
+        assert "task-1" in poller
+        for _ in range(200):
+            if "task-1" not in poller:
+                break
+            await asyncio.sleep(0.01)
+        await poller.close()
+
+    asyncio.run(main())
+    assert events[-1] == ("timeout", "job-1")
+    assert len(events) > 2
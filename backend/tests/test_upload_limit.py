@@ -0,0 +1,69 @@
+"""UploadSizeLimit rejects oversized upload bodies before the multipart form is parsed."""
+import pytest
+from fastapi import FastAPI, File, UploadFile
+from fastapi.testclient import TestClient
+
+from app.api.custom_images import UploadSizeLimit
+
+LIMIT = 4096
+
+
+@pytest.fixture
+def client():
+    app = FastAPI()
+    parsed = []
+
+    @app.post("/upload")
+    async def upload(file: UploadFile = File(...)):
+        parsed.append(file.filename)
+        return {"size": len(await file.read())}
+
+    @app.post("/other")
+    async def other(file: UploadFile = File(...)):
+        return {"size": len(await file.read())}
+
+    app.add_middleware(UploadSizeLimit, paths=("/upload",), max_bytes=LIMIT)
+    with TestClient(app) as client:
+        client.parsed = parsed
+        yield client
+
+
+def multipart(size: int):
+    boundary = "limit-test"
+    body = (
+        f"--{boundary}\r\n"
+        'Content-Disposition: form-data; name="file"; filename="a.png"\r\n'
+        "Content-Type: image/png\r\n\r\n"
+    ).encode() + b"x" * size + f"\r\n--{boundary}--\r\n".encode()
+    return body, {"Content-Type": f"multipart/form-data; boundary={boundary}"}
+
+
+def chunked(body: bytes, chunk_size: int = 1024):
+    # A generator body is sent with Transfer-Encoding: chunked and no Content-Length
+    for start in range(0, len(body), chunk_size):
+        yield body[start:start + chunk_size]
+
+
+def test_uploads_under_the_limit_pass(client):
+    body, headers = multipart(1000)
+    assert client.post("/upload", content=body, headers=headers).json() == {"size": 1000}
+    assert client.post("/upload", content=chunked(body), headers=headers).json() == {"size": 1000}
+
+
+def test_content_length_over_the_limit_is_rejected_unread(client):
+    body, headers = multipart(LIMIT * 2)
+    response = client.post("/upload", content=body, headers=headers)
+    assert response.status_code == 413
+    assert client.parsed == []
+
+
+def test_streamed_body_over_the_limit_is_cut_off(client):
+    body, headers = multipart(LIMIT * 2)
+    response = client.post("/upload", content=chunked(body), headers=headers)
+    assert response.status_code == 413
+    assert client.parsed == []
+
+
+def test_other_paths_are_not_limited(client):
+    body, headers = multipart(LIMIT * 2)
+    assert client.post("/other", content=body, headers=headers).json() == {"size": LIMIT * 2}
@@ -4,7 +4,7 @@ import ImageGallery from './components/ImageGallery';
 import InputPanel from './components/InputPanel';
 import OutputPanel from './components/OutputPanel';
 import ApiKeyModal from './components/ApiKeyModal';
-import { generateVideo, getJobs } from './services/api';
+import { generateVideo, getJobs, subscribeToJobEvents } from './services/api';
 
 function App() {
   const [jobs, setJobs] = useState([]);
@@ -21,12 +21,35 @@ function App() {
     document.documentElement.setAttribute('data-theme', theme);
   }, [theme]);
 
-  // Load jobs on mount and poll for updates
+  // Load jobs on mount and apply pushed updates from the server
   useEffect(() => {
-    loadJobs();
-    // Poll for job updates every 10 seconds
-    const interval = setInterval(loadJobs, 10000);
-    return () => clearInterval(interval);
+    const events = subscribeToJobEvents();
+
+    // (Re)load the full list whenever the stream (re)connects or asks for a resync
+    events.onopen = loadJobs;
+    events.addEventListener('resync', loadJobs);
+
+    events.addEventListener('created', (event) => {
+      const job = JSON.parse(event.data);
+      setJobs(prevJobs => [job, ...prevJobs.filter(j => j.id !== job.id)]);
+    });
+
+    events.addEventListener('updated', (event) => {
+      const changes = JSON.parse(event.data);
+      setJobs(prevJobs => {
+        const updated = prevJobs.map(job => (job.id === changes.id ? { ...job, ...changes } : job));
+        const job = updated.find(j => j.id === changes.id);
+        // Keep most recent activity first
+        return job ? [job, ...updated.filter(j => j.id !== changes.id)] : updated;
+      });
+    });
+
+    events.addEventListener('deleted', (event) => {
+      const { id } = JSON.parse(event.data);
+      setJobs(prevJobs => prevJobs.filter(job => job.id !== id));
+    });
+
+    return () => events.close();
   }, []);
 
   const loadJobs = async () => {
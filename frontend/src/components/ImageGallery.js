@@ -15,7 +15,7 @@ const ImageGallery = forwardRef(({ selectedImage, onImageSelect, theme, onToggle
   // Expose addImage method to parent
   useImperativeHandle(ref, () => ({
     addImage: (newImage) => {
-      setCustomImages(prev => [newImage, ...prev]);
+      setCustomImages(prev => [newImage, ...prev.filter(img => img.id !== newImage.id)]);
       onImageSelect(newImage);
     }
   }), [onImageSelect]);
@@ -57,7 +57,7 @@ const ImageGallery = forwardRef(({ selectedImage, onImageSelect, theme, onToggle
 
       if (response.ok) {
         const newImage = await response.json();
-        setCustomImages(prev => [newImage, ...prev]);
+        setCustomImages(prev => [newImage, ...prev.filter(img => img.id !== newImage.id)]);
         onImageSelect(newImage);
       } else {
         const errorText = await response.text();
@@ -142,8 +142,9 @@ const ImageGallery = forwardRef(({ selectedImage, onImageSelect, theme, onToggle
               onClick={() => handleImageClick(image)}
             >
               <img
-                src={`http://localhost:8000${image.url}`}
+                src={`http://localhost:8000${image.thumbnailUrl || image.url}`}
                 alt={`Custom ${image.id}`}
+                loading="lazy"
               />
               <button
                 ref={el => menuButtonRefs.current[image.id] = el}
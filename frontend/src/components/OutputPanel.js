@@ -133,6 +133,7 @@ function OutputPanel({
   const getStatusBadge = (status) => {
     const statusMap = {
       pending: { label: 'Pending', className: 'status-pending' },
+      queued: { label: 'Queued', className: 'status-pending' },
       uploading: { label: 'Uploading', className: 'status-uploading' },
       generating: { label: 'Generating', className: 'status-generating' },
       downloading: { label: 'Downloading', className: 'status-downloading' },
@@ -302,6 +303,7 @@ function OutputPanel({
                     loop
                     crossOrigin="anonymous"
                     className="embed-video-player"
+                    poster={selectedJob.thumbnailUrl ? `http://localhost:8000${selectedJob.thumbnailUrl}` : undefined}
                   >
                     <source src={`http://localhost:8000${selectedJob.videoUrl}`} type="video/mp4" />
                     Your browser does not support the video tag.
@@ -363,6 +365,7 @@ function OutputPanel({
                     loop
                     crossOrigin="anonymous"
                     className="embed-video-player"
+                    poster={selectedJob.thumbnailUrl ? `http://localhost:8000${selectedJob.thumbnailUrl}` : undefined}
                   >
                     <source src={`http://localhost:8000${selectedJob.videoUrl}`} type="video/mp4" />
                     Your browser does not support the video tag.
@@ -438,7 +441,17 @@ function OutputPanel({
                   >
                     <div className="list-item-thumbnail">
                       {job.status === 'completed' && job.thumbnailUrl ? (
-                        <img src={`http://localhost:8000${job.thumbnailUrl}`} alt="Thumbnail" />
+                        <img
+                          src={`http://localhost:8000${job.thumbnails?.small || job.thumbnailUrl}`}
+                          alt="Thumbnail"
+                          loading="lazy"
+                          onMouseEnter={(e) => {
+                            if (job.previewUrl) e.currentTarget.src = `http://localhost:8000${job.previewUrl}`;
+                          }}
+                          onMouseLeave={(e) => {
+                            e.currentTarget.src = `http://localhost:8000${job.thumbnails?.small || job.thumbnailUrl}`;
+                          }}
+                        />
                       ) : (
                         <div className="thumbnail-placeholder">
                           {getStatusBadge(job.status)}
@@ -450,6 +463,11 @@ function OutputPanel({
                       <div className="list-item-prompt">{job.prompt.substring(0, 80)}...</div>
                       <div className="list-item-meta">
                         {getStatusBadge(job.status)}
+                        {job.status === 'queued' && job.estimatedStartAt && (
+                          <span className="list-item-date">
+                            Starts ~{new Date(`${job.estimatedStartAt}Z`).toLocaleTimeString()}
+                          </span>
+                        )}
                         {job.cost && (
                           <span className="list-item-cost">${job.cost.toFixed(2)}</span>
                         )}
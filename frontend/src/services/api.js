@@ -15,6 +15,17 @@ export const generateVideo = async (formData) => {
   return response.data;
 };
 
+// Batch of variants: { items: [...] } or { sweep: { prompts, customImageIds, durations, ... } }
+export const generateBatch = async (batch) => {
+  const response = await api.post('/api/generate/batch', batch);
+  return response.data;
+};
+
+export const getBatch = async (batchId) => {
+  const response = await api.get(`/api/generate/batch/${batchId}`);
+  return response.data;
+};
+
 export const uploadCustomImage = async (file) => {
   const formData = new FormData();
   formData.append('file', file);
@@ -34,6 +45,9 @@ export const getJobs = async () => {
   return response.data;
 };
 
+// Server-Sent Events stream of job changes (created / updated / deleted / resync)
+export const subscribeToJobEvents = () => new EventSource(`${API_URL}/api/jobs/stream`);
+
 export const getJob = async (jobId) => {
   const response = await api.get(`/api/jobs/${jobId}`);
   return response.data;
@@ -49,6 +63,12 @@ export const checkJobStatus = async (jobId) => {
   return response.data;
 };
 
+// Checks every active job when jobIds is omitted
+export const checkJobStatuses = async (jobIds) => {
+  const response = await api.post('/api/jobs/check-status', jobIds ? { jobIds } : {});
+  return response.data;
+};
+
 // Environment API
 export const getKieApiKey = async () => {
   const response = await api.get('/api/env/kie-api-key');